@@ -6,6 +6,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .utils.executors import shutdown_executors
+from .utils.uploads import UploadLimitMiddleware
+from .storage.audit_log import close_audit_log
+from .storage.storage import migrate_audit_logs
+
 # Import route modules
 from .routes import (
     upload,
@@ -14,6 +19,7 @@ from .routes import (
     redact_text,
     redact_multiple,
     redact_box,
+    redact_batch,
     chat,
     suggest,
     tags,
@@ -22,10 +28,19 @@ from .routes import (
     archive_routes,
     download,
     history,
+    documents,
+    jobs,
+    bulk,
 )
 
 app = FastAPI(title="Document Redaction System")
 
+# ---------------------------------------------------------
+# Upload size limits, enforced while the body arrives
+# (added first: CORS wraps it, so a 413 gets CORS headers)
+# ---------------------------------------------------------
+app.add_middleware(UploadLimitMiddleware)
+
 # ---------------------------------------------------------
 # CORS
 # ---------------------------------------------------------
@@ -46,6 +61,7 @@ app.include_router(save.router)
 app.include_router(redact_text.router)
 app.include_router(redact_multiple.router)
 app.include_router(redact_box.router)
+app.include_router(redact_batch.router)
 app.include_router(chat.router)
 app.include_router(suggest.router)
 app.include_router(tags.router)
@@ -54,6 +70,29 @@ app.include_router(redact_auto.router)
 app.include_router(archive_routes.router)
 app.include_router(download.router)
 app.include_router(history.router)
+app.include_router(documents.router)
+app.include_router(jobs.router)
+app.include_router(bulk.router)
+
+
+# ---------------------------------------------------------
+# Startup: convert old audit.json logs to audit.jsonl
+# ---------------------------------------------------------
+@app.on_event("startup")
+def migrate_audit():
+    migrated = migrate_audit_logs()
+    if migrated:
+        print(f"[INFO] Migrated {migrated} audit logs to JSONL")
+
+
+# ---------------------------------------------------------
+# Shutdown: let worker pools finish queued work,
+# then flush pending audit entries
+# ---------------------------------------------------------
+@app.on_event("shutdown")
+def stop_executors():
+    shutdown_executors()
+    close_audit_log()
 
 
 # ---------------------------------------------------------
@@ -3,54 +3,73 @@
 # Path: backend/app/routes/archive_routes.py
 # ---------------------------------------------------------
 # Routes for generating and listing monthly/yearly archives.
+# Archives are built by background jobs (services/jobs.py).
 # ---------------------------------------------------------
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse, JSONResponse
 
-from ..storage.storage import (
-    archive_month,
-    archive_year,
-    list_archives
-)
+from ..storage.storage import list_archives, find_download
+from ..services.jobs import wait_job, get_job
+from .jobs import queue_job
 
 router = APIRouter()
 
 
+async def _job_response(kind: str, params: dict, wait: bool):
+    """
+    202 + job state, or (wait=true) the finished ZIP.
+    """
+    job = await queue_job(kind, params)
+    if not wait:
+        return JSONResponse(job, status_code=202)
+
+    job = await wait_job(job["job_id"])
+    if job["status"] != "done":
+        raise HTTPException(status_code=500, detail=f"Failed to create archive: {job['error'] or job['status']}")
+
+    archive = job["result"]["archive"]
+    return FileResponse(find_download(archive), filename=archive)
+
+
 # ---------------------------------------------------------
-# Create Monthly Archive
+# Create Monthly Archive (background job)
 # ---------------------------------------------------------
 @router.post("/archive/month")
-async def create_month_archive(year: int, month: int):
+async def create_month_archive(year: int, month: int, wait: bool = False):
     """
-    Create a ZIP archive for a specific month.
+    Start a ZIP archive job for a specific month.
     Example: January 2026 -> archive_month(2026, 1)
+    Poll GET /jobs/{job_id}; wait=true blocks and
+    returns the ZIP as before.
     """
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="month must be 1-12")
 
-    try:
-        zip_path = archive_month(year, month)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create monthly archive: {e}")
-
-    return FileResponse(zip_path, filename=zip_path.name)
+    return await _job_response("archive_month", {"year": year, "month": month}, wait)
 
 
 # ---------------------------------------------------------
-# Create Yearly Archive
+# Create Yearly Archive (background job)
 # ---------------------------------------------------------
 @router.post("/archive/year")
-async def create_year_archive(year: int):
+async def create_year_archive(year: int, wait: bool = False):
     """
-    Create a ZIP archive for a specific year.
+    Start a ZIP archive job for a specific year.
     Example: 2026 -> archive_year(2026)
     """
+    return await _job_response("archive_year", {"year": year}, wait)
 
-    try:
-        zip_path = archive_year(year)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create yearly archive: {e}")
 
-    return FileResponse(zip_path, filename=zip_path.name)
+# ---------------------------------------------------------
+# Archive job status / progress (same as GET /jobs/{job_id})
+# ---------------------------------------------------------
+@router.get("/archive/jobs/{job_id}")
+async def archive_job_status(job_id: str):
+    job = get_job(job_id, with_result=True)
+    if job is None or not job["kind"].startswith("archive_"):
+        raise HTTPException(status_code=404, detail="Archive job not found")
+    return job
 
 
 # ---------------------------------------------------------
@@ -71,4 +90,4 @@ async def list_all_archives():
         "archives": archives,
         "total": len(archives),
         "status": "success"
-    })
\ No newline at end of file
+    })
@@ -0,0 +1,101 @@
+# ---------------------------------------------------------
+# File: bulk.py
+# Path: backend/app/routes/bulk.py
+# ---------------------------------------------------------
+# Bulk ingestion + auto-redaction (see bulk_service.py):
+#   POST /bulk                    many PDFs and/or ZIPs -> 202 + job
+#   GET  /bulk/{bulk_id}          manifest (or job status)
+#   GET  /bulk/{bulk_id}/download redacted PDFs + manifest,
+#                                 streamed as one ZIP
+# ---------------------------------------------------------
+
+import shutil
+from typing import List
+
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ..services.bulk_service import (
+    bulk_folder,
+    new_bulk_id,
+    store_input,
+    load_manifest,
+    bulk_zip_entries,
+    record_job,
+    recorded_job,
+)
+from ..services.jobs import get_job
+from ..storage.storage import stream_zip
+from ..utils.executors import run_blocking
+from ..utils.uploads import spool_upload
+from .jobs import queue_job
+
+router = APIRouter()
+
+
+@router.post("/bulk")
+async def bulk_upload(
+    files: List[UploadFile] = File(...),
+    redact: bool = Form(True),
+    save_original: bool = Form(False),
+    save_audit: bool = Form(False)
+):
+    """
+    Upload many PDFs (or ZIPs of PDFs) at once. Each one is
+    extracted, auto-redacted (redact=true) and exported in
+    the background; poll GET /bulk/{bulk_id}.
+    """
+    bulk_id = new_bulk_id()
+
+    try:
+        for index, file in enumerate(files):
+            upload = await spool_upload(file)
+            await run_blocking("io", store_input, bulk_id, index, upload)
+
+        options = {"redact": redact, "save_original": save_original, "save_audit": save_audit}
+        job = await queue_job("bulk", {"bulk_id": bulk_id, "options": options})
+        await run_blocking("io", record_job, bulk_id, job["job_id"])
+    except Exception:
+        # 413 from an upload, 429 from the job queue, ...:
+        # no job will ever read the stored inputs
+        await run_blocking("io", shutil.rmtree, bulk_folder(bulk_id), ignore_errors=True)
+        raise
+
+    return JSONResponse({
+        "bulk_id": bulk_id,
+        "files": len(files),
+        "status_url": f"/bulk/{bulk_id}",
+        "job": job,
+    }, status_code=202)
+
+
+async def _bulk_job(bulk_id: str):
+    job_id = await run_blocking("io", recorded_job, bulk_id)
+    return get_job(job_id) if job_id is not None else None
+
+
+@router.get("/bulk/{bulk_id}")
+async def bulk_status(bulk_id: str):
+    manifest = await run_blocking("io", load_manifest, bulk_id)
+    if manifest is not None:
+        return manifest
+
+    job = await _bulk_job(bulk_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk batch not found")
+    return {"bulk_id": bulk_id, "job": job}
+
+
+@router.get("/bulk/{bulk_id}/download")
+async def bulk_download(bulk_id: str):
+    manifest = await run_blocking("io", load_manifest, bulk_id)
+    if manifest is None:
+        if await _bulk_job(bulk_id) is None:
+            raise HTTPException(status_code=404, detail="Bulk batch not found")
+        raise HTTPException(status_code=409, detail="Bulk batch is not finished")
+
+    return StreamingResponse(
+        stream_zip(bulk_zip_entries(bulk_id, manifest)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="bulk_{bulk_id}.zip"'},
+    )
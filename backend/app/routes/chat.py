@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from ..services.chat_service import chat_with_doc
+from ..utils.executors import run_blocking
 
 router = APIRouter()
 
@@ -10,4 +11,4 @@ class ChatRequest(BaseModel):
 
 @router.post("/chat")
 async def chat_route(data: ChatRequest):
-    return chat_with_doc(data.doc_id, data.message)
\ No newline at end of file
+    return await run_blocking("llm", chat_with_doc, data.doc_id, data.message)
\ No newline at end of file
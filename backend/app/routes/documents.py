@@ -0,0 +1,63 @@
+# ---------------------------------------------------------
+# File: documents.py
+# Path: backend/app/routes/documents.py
+# ---------------------------------------------------------
+# Catalog queries: list stored documents and look up one
+# document's metadata, versions, tags and labels without
+# walking the storage folders. POST /documents/{doc_id}/close
+# releases an open document (memory, working files).
+# ---------------------------------------------------------
+
+from fastapi import APIRouter, HTTPException
+
+from ..storage.storage import CATALOG, list_documents
+from ..services.upload_service import release_document
+from ..utils.executors import run_blocking
+
+router = APIRouter()
+
+
+@router.get("/documents")
+async def list_documents_route(
+    tag: str | None = None,
+    label: str | None = None,
+    year: int | None = None,
+    month: int | None = None,
+    include_archived: bool = False,
+    limit: int = 100,
+    offset: int = 0,
+):
+    """
+    Stored documents, newest first. Filter by tag, label
+    (e.g. EMAIL) or activity year/month.
+    """
+    documents = await run_blocking(
+        "io", list_documents,
+        tag=tag, label=label, year=year, month=month,
+        include_archived=include_archived,
+        limit=min(max(limit, 1), 1000), offset=max(offset, 0),
+    )
+    return {"documents": documents, "count": len(documents)}
+
+
+@router.get("/documents/{doc_id}")
+async def get_document_route(doc_id: str):
+    doc = await run_blocking("io", CATALOG.get_document, doc_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    doc["versions"] = await run_blocking("io", CATALOG.get_versions, doc_id)
+    doc["tags"] = await run_blocking("io", CATALOG.get_tags, doc_id, "tag")
+    doc["labels"] = await run_blocking("io", CATALOG.get_tags, doc_id, "label")
+    return doc
+
+
+@router.post("/documents/{doc_id}/close")
+async def close_document_route(doc_id: str):
+    """
+    Done with a document: free its in-memory state and working
+    files. Stored originals, versions and logs are kept.
+    """
+    if not await run_blocking("io", release_document, doc_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"doc_id": doc_id, "closed": True}
@@ -8,29 +8,17 @@
 # - version history PDFs (e.g., original_invoice_redacted_v001.pdf)
 # - monthly archives (e.g., January2026.zip)
 # - yearly archives (e.g., 2026.zip)
+#
+# Versions live in the chunk store and are rebuilt on the fly.
 # ---------------------------------------------------------
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from pathlib import Path
+from fastapi.responses import FileResponse, Response
 
-router = APIRouter()
-
-# ---------------------------------------------------------
-# Storage paths
-# ---------------------------------------------------------
-
-# Root storage directory
-# storage/
-STORAGE_ROOT = Path("storage")
+from ..storage.storage import open_download
+from ..utils.executors import run_blocking
 
-# Monthly archives
-# storage/archives/months/January2026.zip
-ARCHIVE_MONTHS = STORAGE_ROOT / "archives" / "months"
-
-# Yearly archives
-# storage/archives/years/2026.zip
-ARCHIVE_YEARS = STORAGE_ROOT / "archives" / "years"
+router = APIRouter()
 
 
 @router.get("/download/{filename}")
@@ -42,35 +30,21 @@ async def download_file(filename: str):
     - version history PDFs
     - monthly archives
     - yearly archives
-    """
 
-    # ---------------------------------------------------------
-    # 1. Search inside each document folder
-    #    storage/<doc_id>/<filename>
-    # ---------------------------------------------------------
-    for doc_folder in STORAGE_ROOT.iterdir():
-        if doc_folder.is_dir() and doc_folder.name != "archives":
-            candidate = doc_folder / filename
-            if candidate.exists():
-                return FileResponse(candidate, filename=filename)
+    Files are found through the storage download index
+    (filename -> path) instead of scanning every folder.
+    """
 
-    # ---------------------------------------------------------
-    # 2. Search monthly archives
-    #    storage/archives/months/<filename>
-    # ---------------------------------------------------------
-    candidate = ARCHIVE_MONTHS / filename
-    if candidate.exists():
-        return FileResponse(candidate, filename=filename)
+    # Versions are rebuilt from chunks (sha256 check, compaction)
+    found = await run_blocking("pdf", open_download, filename)
+    if found is None:
+        raise HTTPException(status_code=404, detail="File not found")
 
-    # ---------------------------------------------------------
-    # 3. Search yearly archives
-    #    storage/archives/years/<filename>
-    # ---------------------------------------------------------
-    candidate = ARCHIVE_YEARS / filename
-    if candidate.exists():
-        return FileResponse(candidate, filename=filename)
+    if isinstance(found, bytes):
+        return Response(
+            found,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
 
-    # ---------------------------------------------------------
-    # 4. Not found
-    # ---------------------------------------------------------
-    raise HTTPException(status_code=404, detail="File not found")
\ No newline at end of file
+    return FileResponse(found, filename=filename)
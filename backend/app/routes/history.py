@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from ..state.memory import DOC_VERSIONS
-from ..storage.storage import get_audit_log, load_pdf_bytes, save_pdf_version
+from ..storage.storage import get_audit_log, load_pdf_bytes, save_pdf_version, read_version, version_dedup_stats, CATALOG
 from ..storage.storage import ensure_doc_folder  # if not already imported
+from ..utils.executors import run_blocking
 from pathlib import Path
 
 router = APIRouter()
@@ -28,11 +29,13 @@ async def undo_last_redaction(data: UndoRequest):
 
     # Last version is current, second last is previous
     previous_version = Path(versions[-2])
-    if not previous_version.exists():
+    try:
+        # Chunk reassembly, sha256 check and compaction
+        pdf_bytes = await run_blocking("pdf", read_version, previous_version)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Previous version file not found")
 
-    pdf_bytes = previous_version.read_bytes()
-    save_pdf_version(data.doc_id, pdf_bytes)
+    await run_blocking("io", save_pdf_version, data.doc_id, pdf_bytes)
 
     return {
         "doc_id": data.doc_id,
@@ -42,13 +45,24 @@ async def undo_last_redaction(data: UndoRequest):
 
 @router.post("/history/versions")
 async def list_versions(data: HistoryRequest):
-    versions = DOC_VERSIONS.get(data.doc_id, [])
+    versions = DOC_VERSIONS.get(data.doc_id)
+    if not versions:
+        # Not in memory (e.g. after a restart): ask the catalog
+        versions = [v["path"] for v in CATALOG.get_versions(data.doc_id)]
     return {
         "doc_id": data.doc_id,
         "versions": versions,
         "count": len(versions),
+        "dedup": version_dedup_stats(data.doc_id),
     }
 
+@router.get("/history/dedup")
+async def dedup_stats():
+    """
+    Version store totals: logical vs stored bytes.
+    """
+    return version_dedup_stats()
+
 @router.post("/history/audit")
 async def list_audit(data: HistoryRequest):
     log = get_audit_log(data.doc_id)
@@ -64,13 +78,13 @@ async def revert_to_version(data: RevertRequest):
     Revert a document to a specific saved version.
     """
     version_file = Path(data.version_path)
-    if not version_file.exists():
+    try:
+        pdf_bytes = await run_blocking("pdf", read_version, version_file)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Version file not found")
 
-    pdf_bytes = version_file.read_bytes()
-
     # Save as a new version (so revert itself is tracked)
-    save_pdf_version(data.doc_id, pdf_bytes)
+    await run_blocking("io", save_pdf_version, data.doc_id, pdf_bytes)
 
     return {
         "doc_id": data.doc_id,
@@ -0,0 +1,108 @@
+# ---------------------------------------------------------
+# File: jobs.py
+# Path: backend/app/routes/jobs.py
+# ---------------------------------------------------------
+# Background job API (see services/jobs.py):
+#   POST /jobs                   submit {"kind", "params"}
+#   GET  /jobs                   list (kind/status filters)
+#   GET  /jobs/{job_id}          status + progress
+#   GET  /jobs/{job_id}/result   result of a finished job
+#   POST /jobs/{job_id}/cancel   cancel / request stop
+# ---------------------------------------------------------
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import Any, Dict
+
+from ..services.jobs import (
+    JobQueueFull,
+    cancel_job,
+    get_job,
+    list_jobs,
+    submit_job,
+)
+from ..utils.executors import run_blocking
+
+router = APIRouter()
+
+# Kinds that can be submitted with JSON params
+# (extract_text is submitted by POST /upload?background)
+SUBMITTABLE = {
+    "suggest": {"doc_id"},
+    "redact_multiple": {"doc_id", "items"},
+    "archive_month": {"year", "month"},
+    "archive_year": {"year"},
+}
+
+
+class JobRequest(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
+
+def _submit(kind: str, params: dict, payload: dict) -> dict:
+    try:
+        return submit_job(kind, params, **payload)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Job queue full: {e}")
+
+
+async def queue_job(kind: str, params: dict, **payload) -> dict:
+    """
+    Submit a job and return its state (429 when the queue
+    is full). Submitting appends to the job log (fsync), so
+    it runs on the "io" pool.
+    """
+    return await run_blocking("io", _submit, kind, params, payload)
+
+
+@router.post("/jobs")
+async def create_job(data: JobRequest):
+    required = SUBMITTABLE.get(data.kind)
+    if required is None:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {data.kind}")
+
+    if set(data.params) != required:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{data.kind} takes params: {', '.join(sorted(required))}",
+        )
+
+    return JSONResponse(await queue_job(data.kind, data.params), status_code=202)
+
+
+@router.get("/jobs")
+async def get_jobs(kind: str = None, status: str = None, limit: int = 100):
+    jobs = list_jobs(kind, status, limit)
+    return {"jobs": jobs, "count": len(jobs)}
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    job = get_job(job_id, with_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Job failed: {job['error']}")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+
+    return {"job_id": job_id, "kind": job["kind"], "result": job["result"]}
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel(job_id: str):
+    job = await run_blocking("io", cancel_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
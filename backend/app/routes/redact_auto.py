@@ -4,12 +4,14 @@
 # Uses suggestions + span-based blackout redaction
 # ---------------------------------------------------------
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
 from pydantic import BaseModel
 from typing import Dict, Any
 
 from ..services.redaction_suggestion_service import suggest_redactions
 from ..services.multiple_redaction_service import redact_multiple
+from ..storage.storage import save_tags
+from ..utils.executors import run_blocking
 
 router = APIRouter()
 
@@ -19,12 +21,13 @@ class AutoRedactRequest(BaseModel):
 
 
 @router.post("/redact/auto")
-async def auto_redact_route(data: AutoRedactRequest) -> Dict[str, Any]:
+async def auto_redact_route(data: AutoRedactRequest, if_match: str | None = Header(None)) -> Dict[str, Any]:
     """
     Auto‑redact all suggested spans (ML + PII).
     Uses the same span-based blackout redaction as /redact/multiple.
+    If-Match: version the client last saw (412 if it changed).
     """
-    result = suggest_redactions(data.doc_id)
+    result = await run_blocking("ner", suggest_redactions, data.doc_id)
 
     if "error" in result:
         return result
@@ -39,11 +42,17 @@ async def auto_redact_route(data: AutoRedactRequest) -> Dict[str, Any]:
             "status": "no_suggestions"
         }
 
-    redact_result = redact_multiple(data.doc_id, spans)
+    redact_result = await run_blocking("pdf", redact_multiple, data.doc_id, spans, if_match=if_match)
+
+    # Record which kinds of data were redacted (catalog labels)
+    labels = sorted({s.get("label") for s in spans if s.get("label")})
+    if labels:
+        await run_blocking("io", save_tags, data.doc_id, labels, "label")
 
     return {
         "doc_id": data.doc_id,
         "applied": redact_result.get("total_hits", 0),
         "total_suggestions": len(spans),
-        "status": redact_result.get("status", "success")
+        "status": redact_result.get("status", "success"),
+        "version": redact_result.get("version")
     }
@@ -0,0 +1,52 @@
+# ---------------------------------------------------------
+# File: redact_batch.py
+# Route: POST /redact/batch
+# Mixed redaction operations applied in one PDF update
+# (one version + one audit entry for the whole batch)
+# ---------------------------------------------------------
+
+from fastapi import APIRouter, Header
+from pydantic import BaseModel
+from typing import List, Literal, Dict, Any
+
+from ..services.batch_redaction_service import redact_batch
+from ..utils.executors import run_blocking
+
+router = APIRouter()
+
+
+class BatchOperation(BaseModel):
+    type: Literal["box", "term", "span", "label"]
+
+    # box (normalized 0–1 page coordinates)
+    page: int | None = None
+    x: float | None = None
+    y: float | None = None
+    w: float | None = None
+    h: float | None = None
+
+    # term
+    text: str | None = None
+
+    # span (DOC_TEXT offsets)
+    start: int | None = None
+    end: int | None = None
+
+    # label (every suggested span with this label)
+    label: str | None = None
+
+
+class BatchRedactRequest(BaseModel):
+    doc_id: str
+    operations: List[BatchOperation]
+
+
+@router.post("/redact/batch")
+async def redact_batch_route(data: BatchRedactRequest, if_match: str | None = Header(None)) -> Dict[str, Any]:
+    """
+    Validate all operations, then apply them together.
+    Nothing is applied if any operation is invalid (400), or
+    if the document changed since the If-Match version (412).
+    """
+    operations = [op.dict() for op in data.operations]
+    return await run_blocking("pdf", redact_batch, data.doc_id, operations, if_match=if_match)
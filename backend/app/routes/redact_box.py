@@ -1,6 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
 from pydantic import BaseModel
 from ..services.box_redaction_service import redact_box
+from ..utils.executors import run_blocking
 
 router = APIRouter()
 
@@ -13,5 +14,8 @@ class BoxRedactRequest(BaseModel):
     h: float
 
 @router.post("/redact/box")
-async def redact_box_route(data: BoxRedactRequest):
-    return redact_box(data.doc_id, data.page, data.x, data.y, data.w, data.h)
\ No newline at end of file
+async def redact_box_route(data: BoxRedactRequest, if_match: str | None = Header(None)):
+    # If-Match: version the client last saw (412 if it changed since)
+    return await run_blocking(
+        "pdf", redact_box, data.doc_id, data.page, data.x, data.y, data.w, data.h, if_match=if_match
+    )
\ No newline at end of file
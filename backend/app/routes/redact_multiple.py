@@ -4,11 +4,12 @@
 # Uses span-based blackout redaction (layout-preserving)
 # ---------------------------------------------------------
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
 from pydantic import BaseModel
 from typing import List, Dict, Any
 
 from ..services.multiple_redaction_service import redact_multiple
+from ..utils.executors import run_blocking
 
 router = APIRouter()
 
@@ -26,18 +27,20 @@ class MultipleRedactRequest(BaseModel):
 
 
 @router.post("/redact/multiple")
-async def redact_multiple_route(data: MultipleRedactRequest) -> Dict[str, Any]:
+async def redact_multiple_route(data: MultipleRedactRequest, if_match: str | None = Header(None)) -> Dict[str, Any]:
     """
     Apply redaction for selected spans.
     Spans come from the suggestions panel (ML + PII).
+    If-Match: version the client last saw (412 if it changed).
     """
     spans_payload = [s.dict() for s in data.spans]
 
-    result = redact_multiple(data.doc_id, spans_payload)
+    result = await run_blocking("pdf", redact_multiple, data.doc_id, spans_payload, if_match=if_match)
 
     return {
         "doc_id": data.doc_id,
         "applied": result.get("total_hits", 0),
         "total_selected": len(spans_payload),
-        "status": result.get("status", "success")
+        "status": result.get("status", "success"),
+        "version": result.get("version")
     }
@@ -6,8 +6,8 @@ from fastapi.responses import JSONResponse
 
 from ..services.redaction_suggestion_service import suggest_redactions
 from ..state.memory_helpers import get_text
-from ..services.pdf_service import get_pdf_bytes
-import fitz
+from ..services.layout_index import get_layout
+from ..utils.executors import run_blocking
 
 router = APIRouter()
 
@@ -22,16 +22,18 @@ async def suggest_route(data: SuggestRequest):
     if not text:
         raise HTTPException(status_code=404, detail="Document not found or no text extracted")
 
-    result = suggest_redactions(data.doc_id)
+    result = await run_blocking("ner", suggest_redactions, data.doc_id)
 
     if "error" in result:
         return result
 
     suggestions = result.get("suggestions", [])
 
-    # Load PDF to compute page + coordinates for each suggestion
-    pdf_bytes = get_pdf_bytes(data.doc_id)
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    # Page + coordinates for each suggestion come straight from
+    # its (start, end) offsets via the layout index
+    layout = await run_blocking("pdf", get_layout, data.doc_id)
+    if layout is None:
+        raise HTTPException(status_code=404, detail="Document not found")
 
     formatted = []
 
@@ -43,23 +45,22 @@ async def suggest_route(data: SuggestRequest):
 
         page_num = None
         norm_x = norm_y = norm_w = norm_h = None
-
-        if s_text:
-            # Find first occurrence of this text in the PDF
-            for i, page in enumerate(doc):
-                rects = page.search_for(s_text)
-                if rects:
-                    r = rects[0]
-                    page_rect = page.rect
-
-                    # Normalize to 0–1
-                    norm_x = (r.x0 - page_rect.x0) / page_rect.width
-                    norm_y = (r.y0 - page_rect.y0) / page_rect.height
-                    norm_w = r.width / page_rect.width
-                    norm_h = r.height / page_rect.height
-
-                    page_num = i + 1  # 1-based
-                    break
+        rects = []
+
+        if s_text and s_start is not None and s_end is not None:
+            # Exact boxes for this span (one per line if it wraps)
+            for page_index, page_rects in layout.span_rects(s_start, s_end).items():
+                page_layout = layout.pages[page_index]
+                for r in page_rects:
+                    # Normalized to 0–1
+                    norm = page_layout.normalized_rect(r)
+                    rects.append({"page": page_index + 1, **norm})
+
+        if rects:
+            # First line of the span drives the highlight/jump
+            first = rects[0]
+            page_num = first["page"]  # 1-based
+            norm_x, norm_y, norm_w, norm_h = first["x"], first["y"], first["w"], first["h"]
 
         formatted.append({
             "text": s_text,
@@ -71,10 +72,9 @@ async def suggest_route(data: SuggestRequest):
             "y": norm_y,
             "w": norm_w,
             "h": norm_h,
+            "rects": rects,
         })
 
-    doc.close()
-
     return JSONResponse({
         "doc_id": data.doc_id,
         "suggestions": formatted,
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 from pydantic import BaseModel
 from ..services.multiple_redaction_service import redact_multiple
+from ..utils.executors import run_blocking
 
 router = APIRouter()
 
@@ -9,16 +10,17 @@ class RedactTextRequest(BaseModel):
     target_text: str
 
 @router.post("/redact/text")
-async def redact_text_route(data: RedactTextRequest):
+async def redact_text_route(data: RedactTextRequest, if_match: str | None = Header(None)):
     if not data.target_text.strip():
         raise HTTPException(status_code=400, detail="target_text is empty")
 
     # Use the same engine as multiple redaction
-    result = redact_multiple(data.doc_id, [data.target_text])
+    result = await run_blocking("pdf", redact_multiple, data.doc_id, [data.target_text], if_match=if_match)
 
     return {
         "doc_id": data.doc_id,
         "target_text": data.target_text,
         "status": result.get("status", "success"),
-        "total_hits": result.get("total_hits", 0)
+        "total_hits": result.get("total_hits", 0),
+        "version": result.get("version")
     }
@@ -1,20 +1,27 @@
-from fastapi import APIRouter, Response
-from ..services.pdf_service import get_pdf_bytes
+from fastapi import APIRouter, Request
+from ..services.incremental_pdf import export_pdf_source
+from ..utils.executors import run_blocking
+from ..utils.http_cache import document_response
 from ..state.memory import DOC_ORIGINAL_NAME
 
 router = APIRouter()
 
 @router.get("/save/{doc_id}")
-async def save_pdf(doc_id: str):
-    pdf_bytes = get_pdf_bytes(doc_id)
+async def save_pdf(request: Request, doc_id: str):
+    # Compacted: no unredacted object versions left in the file
+    etag, source = await run_blocking("pdf", export_pdf_source, doc_id)
+
     original = DOC_ORIGINAL_NAME.get(doc_id, "document.pdf")
     base = original.rsplit(".", 1)[0]
     filename = f"{base}_redacted.pdf"
 
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
+    # ETag / Range / streaming: see utils/http_cache.py
+    return document_response(
+        request,
+        source,
+        etag,
         headers={
-            "Content-Disposition": f'attachment; filename="{filename}"'
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "private, no-cache"
         }
-    )
\ No newline at end of file
+    )
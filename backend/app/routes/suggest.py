@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from ..services.suggest_service import suggest_for_doc
+from ..utils.executors import run_blocking
 
 router = APIRouter()
 
@@ -9,4 +10,4 @@ class SuggestRequest(BaseModel):
 
 @router.post("/suggest")
 async def suggest_route(data: SuggestRequest):
-    return suggest_for_doc(data.doc_id)
\ No newline at end of file
+    return await run_blocking("llm", suggest_for_doc, data.doc_id)
\ No newline at end of file
@@ -5,16 +5,14 @@
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import JSONResponse
+from pathlib import Path
 import uuid
 
-from ..storage.storage import save_original_pdf, log_action
-from ..utils.pdf_utils import extract_text_from_pdf
-from ..state.memory_helpers import (
-    set_original_name,
-    set_text,
-    set_pdf_bytes,
-    set_options
-)
+from ..services.upload_service import ingest_upload
+from ..utils.executors import run_blocking
+from ..utils.pdf_utils import is_image_file
+from ..utils.uploads import spool_upload, upload_path
+from .jobs import queue_job
 
 router = APIRouter()
 
@@ -23,58 +21,53 @@ router = APIRouter()
 async def upload_pdf(
     file: UploadFile = File(...),
     save_original: bool = Form(False),
-    save_audit: bool = Form(False)
+    save_audit: bool = Form(False),
+    background: bool = Form(False)
 ):
     """
-    Upload a PDF, extract text, optionally save original, and return doc_id.
+    Upload a PDF (or a PNG/JPEG/TIFF image, converted to a
+    PDF and OCR'd), extract text + page layout index,
+    optionally save original, and return doc_id.
+    background=true returns 202 with an "extract_text" job
+    right after the upload; the document is usable once
+    the job is done.
     """
 
-    if not file.filename.lower().endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    is_image = is_image_file(file.filename or "")
+    if not file.filename.lower().endswith(".pdf") and not is_image:
+        raise HTTPException(status_code=400, detail="Only PDF, PNG, JPEG and TIFF files are supported")
 
     # Generate unique document ID
     doc_id = str(uuid.uuid4())
 
-    # Read PDF bytes
-    pdf_bytes = await file.read()
+    # Stream the upload (size limit + SHA-256); large files
+    # stay on disk and are parsed from there
+    upload = await spool_upload(file)
+    suffix = Path(file.filename).suffix.lower() if is_image else ".pdf"
+    source = upload.keep_as(upload_path(doc_id, suffix))
 
-    # Extract text
+    if background:
+        params = {
+            "doc_id": doc_id,
+            "filename": file.filename,
+            "save_original": save_original,
+            "save_audit": save_audit,
+            "sha256": upload.sha256,
+        }
+        try:
+            job = await queue_job("extract_text", params, source=source)
+        except HTTPException:
+            upload.discard()
+            raise
+        return JSONResponse({"doc_id": doc_id, "filename": file.filename, "job": job}, status_code=202)
+
+    # Extract text + layout index in a single pass, store the document
     try:
-        extracted_text = extract_text_from_pdf(pdf_bytes)
+        result = await run_blocking(
+            "pdf", ingest_upload, doc_id, file.filename, source, save_original, save_audit, upload.sha256
+        )
     except Exception as e:
+        upload.discard()
         raise HTTPException(status_code=500, detail=f"Failed to extract text: {e}")
 
-    # Store original filename
-    set_original_name(doc_id, file.filename)
-
-    # Store extracted text
-    set_text(doc_id, extracted_text)
-
-    # Store PDF bytes
-    set_pdf_bytes(doc_id, pdf_bytes)
-
-    # Store checkbox options
-    set_options(doc_id, {
-        "save_original": save_original,
-        "save_audit": save_audit,
-        "save_versions": True,      # default ON
-        "save_redacted": True       # default ON
-    })
-
-    # Save original PDF (optional)
-    if save_original:
-        save_original_pdf(doc_id, file.filename, pdf_bytes)
-
-    # Log audit (optional)
-    if save_audit:
-        log_action(doc_id, "upload", {"filename": file.filename})
-
-    return JSONResponse({
-        "doc_id": doc_id,
-        "filename": file.filename,
-        "text_length": len(extracted_text),
-        "options": {
-            "save_original": save_original,
-            "save_audit": save_audit
-        }
-    })
\ No newline at end of file
+    return JSONResponse(result)
\ No newline at end of file
@@ -1,13 +1,90 @@
-from fastapi import APIRouter, Response
-from ..services.pdf_service import get_pdf_bytes
+from fastapi import APIRouter, Request, Response
+from ..services.incremental_pdf import export_pdf_source
+from ..services.page_render_service import RENDER_CACHE, page_info, render_page, render_variant, THUMBNAIL_WIDTH
+from ..state.memory import DOC_PDF_BYTES
+from ..utils.executors import run_blocking
+from ..utils.http_cache import document_response, etag_matches
 
 router = APIRouter()
 
 @router.get("/view/{doc_id}")
-async def view_pdf(doc_id: str):
-    pdf_bytes = get_pdf_bytes(doc_id)
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={"Cache-Control": "no-store"}
-    )
\ No newline at end of file
+async def view_pdf(request: Request, doc_id: str):
+    """
+    Current working PDF, compacted first when it has pending
+    incremental updates (they keep the unredacted objects).
+    Revalidated with If-None-Match (304) and fetched in parts
+    with Range (206); streamed from disk when it is a file.
+    """
+    etag, source = await run_blocking("pdf", export_pdf_source, doc_id)
+    return document_response(
+        request,
+        source,
+        etag,
+        headers={"Cache-Control": "private, no-cache"}
+    )
+
+
+# ---------------------------------------------------------
+# Page images (lazy viewer)
+# ---------------------------------------------------------
+@router.get("/view/{doc_id}/pages")
+async def view_pages(doc_id: str):
+    """
+    Page count, sizes and page versions of the current PDF.
+    """
+    return await run_blocking("pdf", page_info, doc_id)
+
+
+def _image_headers(doc_id: str, variant: str, version: int) -> dict:
+    # Same page version + variant -> same image
+    etag = f'"{doc_id}-{variant}-v{version}"'
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "X-Page-Version": str(version)}
+
+
+def _not_modified(request: Request, doc_id: str, page: int, variant: str):
+    """
+    304 when the client already has this page version, checked
+    before anything is rendered; None otherwise.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match or doc_id not in DOC_PDF_BYTES:
+        return None
+    headers = _image_headers(doc_id, variant, RENDER_CACHE.page_version(doc_id, page))
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def _image_response(doc_id: str, data: bytes, media_type: str, version: int, variant: str):
+    return Response(content=data, media_type=media_type, headers=_image_headers(doc_id, variant, version))
+
+
+@router.get("/view/{doc_id}/page/{page}")
+async def view_page(request: Request, doc_id: str, page: int, zoom: float = 1.0, format: str = "png"):
+    """
+    One page (0-based) rendered at `zoom` (1.0 = 72 dpi),
+    PNG or JPEG.
+    """
+    _, size = render_variant(zoom)
+    variant = f"p{page}-z{size:g}.{format}"
+    cached = _not_modified(request, doc_id, page, variant)
+    if cached is not None:
+        return cached
+
+    data, media_type, version = await run_blocking("pdf", render_page, doc_id, page, zoom, format)
+    return _image_response(doc_id, data, media_type, version, variant)
+
+
+@router.get("/view/{doc_id}/thumbnail/{page}")
+async def view_thumbnail(request: Request, doc_id: str, page: int, width: int = THUMBNAIL_WIDTH, format: str = "png"):
+    """
+    Thumbnail of one page, `width` pixels wide.
+    """
+    _, size = render_variant(thumbnail_width=width)
+    variant = f"t{page}-w{size:g}.{format}"
+    cached = _not_modified(request, doc_id, page, variant)
+    if cached is not None:
+        return cached
+
+    data, media_type, version = await run_blocking("pdf", render_page, doc_id, page, 1.0, format, width)
+    return _image_response(doc_id, data, media_type, version, variant)
@@ -0,0 +1,237 @@
+# ---------------------------------------------------------
+# File: batch_redaction_service.py
+# Path: backend/app/services/batch_redaction_service.py
+# ---------------------------------------------------------
+# Several redactions of one document in one transaction.
+#
+# A review session is typically a mix of boxes, terms and
+# suggestion spans. Done one call at a time, each of them
+# updates the PDF (and may write a version). A batch:
+# 1. validates every operation and resolves it to page
+#    rectangles against the current layout index
+#    (nothing is applied if any operation is invalid)
+# 2. applies all rectangles in one update of the PDF and
+#    masks the redacted text spans in DOC_TEXT (█)
+# 3. writes one version and one audit entry
+#
+# Operations:
+#   {"type": "box",   "page": 0, "x": .., "y": .., "w": .., "h": ..}
+#   {"type": "term",  "text": "John Doe"}
+#   {"type": "span",  "start": 120, "end": 128}
+#   {"type": "label", "label": "EMAIL"}   (every suggested span
+#                                          with that label)
+# ---------------------------------------------------------
+
+import math
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+from fastapi import HTTPException
+
+from ..state.memory import DOC_TEXT, DOC_PDF_BYTES, DOC_OPTIONS, DOC_VERSIONS
+from ..storage.storage import save_tags, log_action
+from .pdf_service import document_mutation
+from .layout_index import get_layout, advance_layout
+from .redaction_engine import normalize_term, find_rects_per_term
+from .incremental_pdf import apply_page_redactions, save_snapshot
+from .redaction_suggestion_service import suggest_redactions
+
+OPERATION_TYPES = ("box", "term", "span", "label")
+
+
+def _invalid(index: int, message: str):
+    raise HTTPException(status_code=400, detail=f"Operation {index}: {message}")
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _box_rects(layout, index: int, op: dict) -> Dict[int, List[fitz.Rect]]:
+    page_number = op.get("page")
+    if not _is_int(page_number) or not 0 <= page_number < len(layout.pages):
+        _invalid(index, "invalid page number")
+
+    page = layout.pages[page_number]
+    try:
+        x, y, w, h = (float(op[k]) for k in ("x", "y", "w", "h"))
+    except (KeyError, TypeError, ValueError):
+        _invalid(index, "box needs numeric x, y, w, h")
+    if not all(math.isfinite(v) for v in (x, y, w, h)):
+        _invalid(index, "box needs numeric x, y, w, h")
+
+    x0 = x * page.width
+    y0 = y * page.height
+    return {page_number: [fitz.Rect(x0, y0, x0 + w * page.width, y0 + h * page.height)]}
+
+
+def _span_rects(layout, index: int, op: dict, text_length: int) -> Dict[int, List[fitz.Rect]]:
+    start, end = op.get("start"), op.get("end")
+    if not (_is_int(start) and _is_int(end)) or start < 0 or end > text_length or start >= end:
+        _invalid(index, "invalid span")
+    return layout.span_rects(start, end)
+
+
+def _label_spans(doc_id: str, labels: List[str]) -> Dict[str, List[dict]]:
+    """
+    Suggested spans per requested label (suggestions are
+    cached per text + model, so this is usually a lookup).
+    """
+    if not labels:
+        return {}
+
+    result = suggest_redactions(doc_id)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=f"Label operations unavailable: {result['error']}")
+
+    spans: Dict[str, List[dict]] = {label: [] for label in labels}
+    for span in result.get("suggestions", []):
+        if span.get("label") in spans:
+            spans[span["label"]].append(span)
+    return spans
+
+
+def _mask_text(text: str, spans: List[Tuple[int, int]]) -> str:
+    """
+    Replace every span with █ (like apply_text_redaction),
+    in one pass over the text.
+    """
+    pieces, position = [], 0
+    for start, end in sorted(spans):
+        start = max(start, position)
+        if start >= end:
+            continue
+        pieces.append(text[position:start])
+        pieces.append("█" * (end - start))
+        position = end
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+def _merge(target: Dict[int, List[fitz.Rect]], page_rects: Dict[int, List[fitz.Rect]]):
+    for page_number, rects in page_rects.items():
+        target.setdefault(page_number, []).extend(rects)
+
+
+@document_mutation
+def redact_batch(doc_id: str, operations: List[dict]):
+    """
+    Apply a list of mixed operations in one PDF update.
+    Returns one result per operation (same order).
+    """
+    if not operations:
+        raise HTTPException(status_code=400, detail="No redaction operations provided")
+
+    for index, op in enumerate(operations):
+        if op.get("type") not in OPERATION_TYPES:
+            _invalid(index, f"unknown type {op.get('type')!r}")
+
+    if doc_id not in DOC_PDF_BYTES:
+        raise HTTPException(status_code=404, detail="Document not found")
+    layout = get_layout(doc_id)
+    text_length = len(DOC_TEXT.get(doc_id) or "")
+
+    # ---------------------------------------------------------
+    # 1. Resolve every operation (validation, no changes yet)
+    # ---------------------------------------------------------
+    resolved: List[Dict[int, List[fitz.Rect]]] = [{} for _ in operations]
+    hits = [0] * len(operations)
+    # DOC_TEXT offsets behind term / span / label rectangles
+    text_spans: List[Tuple[int, int]] = []
+
+    # Terms: one matcher pass for all of them
+    term_ops = {}
+    for index, op in enumerate(operations):
+        if op["type"] == "term":
+            term = normalize_term(op.get("text") or "")
+            if not term:
+                _invalid(index, "empty term")
+            term_ops.setdefault(term, []).append(index)
+
+    if term_ops:
+        terms = list(term_ops)
+        per_term, term_hits, term_spans = find_rects_per_term(layout, terms)
+        text_spans.extend(term_spans)
+        for term_index, term in enumerate(terms):
+            for index in term_ops[term]:
+                resolved[index] = per_term[term_index]
+                hits[index] = term_hits[term_index]
+
+    labels = sorted({op.get("label") for op in operations if op["type"] == "label"} - {None})
+    label_spans = _label_spans(doc_id, labels)
+
+    for index, op in enumerate(operations):
+        kind = op["type"]
+        if kind == "box":
+            resolved[index] = _box_rects(layout, index, op)
+            hits[index] = 1
+        elif kind == "span":
+            resolved[index] = _span_rects(layout, index, op, text_length)
+            hits[index] = sum(len(r) for r in resolved[index].values())
+            if resolved[index]:
+                text_spans.append((op["start"], op["end"]))
+        elif kind == "label":
+            if not op.get("label"):
+                _invalid(index, "missing label")
+            spans = label_spans[op["label"]]
+            for span in spans:
+                span_rects = layout.span_rects(span["start"], span["end"])
+                if span_rects:
+                    _merge(resolved[index], span_rects)
+                    text_spans.append((span["start"], span["end"]))
+            hits[index] = len(spans)
+
+    # ---------------------------------------------------------
+    # 2. One update of the PDF for all operations
+    # ---------------------------------------------------------
+    page_rects: Dict[int, List[fitz.Rect]] = {}
+    for rects in resolved:
+        _merge(page_rects, rects)
+
+    if page_rects:
+        apply_page_redactions(doc_id, page_rects, len(layout.pages))
+        advance_layout(doc_id, layout, page_rects)
+        if text_spans and DOC_TEXT.get(doc_id):
+            DOC_TEXT[doc_id] = _mask_text(DOC_TEXT[doc_id], text_spans)
+
+    results = [
+        {
+            "index": index,
+            "type": op["type"],
+            "hits": hits[index],
+            "pages": sorted(resolved[index]),
+            "status": "applied" if resolved[index] else "no_match",
+        }
+        for index, op in enumerate(operations)
+    ]
+
+    # ---------------------------------------------------------
+    # 3. One version + one audit entry
+    # ---------------------------------------------------------
+    options = DOC_OPTIONS.get(doc_id, {})
+    version_path = None
+
+    if page_rects and options.get("save_versions", True):
+        version_path = save_snapshot(doc_id)
+        DOC_VERSIONS.setdefault(doc_id, []).append(version_path)
+
+    if labels:
+        save_tags(doc_id, labels, "label")
+
+    if options.get("save_audit", False):
+        log_action(doc_id, "batch_redaction", {
+            "operations": len(operations),
+            "pages": sorted(page_rects),
+            "results": results,
+            "version_path": version_path,
+        })
+
+    return {
+        "doc_id": doc_id,
+        "status": "success",
+        "total_operations": len(operations),
+        "total_hits": sum(hits),
+        "pages_changed": len(page_rects),
+        "version_path": version_path,
+        "results": results,
+    }
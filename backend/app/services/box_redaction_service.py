@@ -5,26 +5,30 @@
 
 import fitz
 from fastapi import HTTPException
-from .pdf_service import get_pdf_bytes, update_pdf_bytes
+from ..state.memory import DOC_PDF_BYTES
+from .pdf_service import document_mutation
+from .layout_index import get_layout, advance_layout
+from .incremental_pdf import apply_page_redactions
 
 
+@document_mutation
 def redact_box(doc_id: str, page_number: int, x: float, y: float, w: float, h: float):
     """
     x, y, w, h are normalized (0–1)
     """
 
-    pdf_bytes = get_pdf_bytes(doc_id)
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    if doc_id not in DOC_PDF_BYTES:
+        raise HTTPException(status_code=404, detail="Document not found")
+    layout = get_layout(doc_id)
 
-    if page_number < 0 or page_number >= len(doc):
+    if page_number < 0 or page_number >= len(layout.pages):
         raise HTTPException(status_code=400, detail="Invalid page number")
 
-    page = doc[page_number]
+    # Page size from the layout index (no need to parse the PDF)
+    page_width = layout.pages[page_number].width
+    page_height = layout.pages[page_number].height
 
     # Convert normalized coords to absolute PDF coords
-    page_width = page.rect.width
-    page_height = page.rect.height
-
     abs_x = x * page_width
     abs_y = y * page_height
     abs_w = w * page_width
@@ -32,13 +36,9 @@ def redact_box(doc_id: str, page_number: int, x: float, y: float, w: float, h: f
 
     rect = fitz.Rect(abs_x, abs_y, abs_x + abs_w, abs_y + abs_h)
 
-    page.add_redact_annot(rect, fill=(0, 0, 0))
-    page.apply_redactions()
-
-    new_bytes = doc.tobytes()
-    doc.close()
-
-    update_pdf_bytes(doc_id, new_bytes)
+    # Only the changed page is appended to the working copy
+    apply_page_redactions(doc_id, {page_number: [rect]}, len(layout.pages))
+    advance_layout(doc_id, layout, {page_number: [rect]})
 
     return {
         "status": "success",
@@ -0,0 +1,283 @@
+# ---------------------------------------------------------
+# File: bulk_service.py
+# Path: backend/app/services/bulk_service.py
+# ---------------------------------------------------------
+# Bulk ingestion + auto-redaction of many PDFs.
+#
+# POST /bulk stores the uploaded files (PDFs and/or ZIPs of
+# PDFs) under storage/bulk/<bulk_id>/inputs and submits one
+# "bulk" job. The job reads the inputs one PDF at a time and
+# fans each document out to the "bulk" pool:
+#     extract (layout index) -> suggest -> redact -> export
+# At most BULK_MAX_IN_FLIGHT documents are read/processed at
+# once (back-pressure), so memory stays bounded however big
+# the batch is.
+#
+# Every document is registered like a normal upload (its
+# doc_id is in the manifest). Redacted PDFs are written to
+# storage/bulk/<bulk_id>/output, together with
+# manifest.json; GET /bulk/{bulk_id}/download streams them
+# as one ZIP. The batch's job_id is kept next to them, so
+# status polls look the job up directly.
+# ---------------------------------------------------------
+
+import json
+import os
+import shutil
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from ..storage.storage import BASE_DIR, save_tags, file_zip_entry
+from ..utils.executors import get_executor, executor_workers
+from ..utils.uploads import UPLOAD_MAX_BYTES
+from .upload_service import ingest_pdf
+from .redaction_suggestion_service import suggest_redactions
+from .multiple_redaction_service import redact_multiple
+from .incremental_pdf import export_pdf_bytes
+
+BULK_ROOT = BASE_DIR / "bulk"
+BULK_ROOT.mkdir(exist_ok=True)
+
+# Documents being read/processed at the same time
+# (default: two per "bulk" worker)
+BULK_MAX_IN_FLIGHT = int(os.environ.get("BULK_MAX_IN_FLIGHT", 0)) or None
+
+MANIFEST_NAME = "manifest.json"
+JOB_ID_NAME = "job_id"
+
+def bulk_folder(bulk_id: str) -> Path:
+    return BULK_ROOT / bulk_id
+
+
+def new_bulk_id() -> str:
+    bulk_id = str(uuid.uuid4())
+    (bulk_folder(bulk_id) / "inputs").mkdir(parents=True)
+    return bulk_id
+
+
+def store_input(bulk_id: str, index: int, upload) -> Path:
+    """
+    Put one received upload (utils/uploads.SpooledUpload)
+    into the batch's input folder.
+    """
+    path = bulk_folder(bulk_id) / "inputs" / f"{index:05d}_{Path(upload.filename).name}"
+    content = upload.keep_as(path)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    return path
+
+
+# ---------------------------------------------------------
+# Inputs (read lazily, one PDF at a time)
+# ---------------------------------------------------------
+def _input_names(path: Path) -> List[str]:
+    if path.suffix.lower() == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            return [
+                info.filename for info in zf.infolist()
+                if not info.is_dir()
+                and info.filename.lower().endswith(".pdf")
+                and not info.filename.startswith("__MACOSX/")
+            ]
+    return [path.name]
+
+
+def _iter_inputs(paths: List[Path]) -> Iterator[Tuple[str, bytes | None, str | None]]:
+    """
+    (name, pdf_bytes, error) for every PDF in the inputs.
+    """
+    for path in paths:
+        original = path.name.split("_", 1)[1]
+        suffix = path.suffix.lower()
+
+        if suffix == ".zip":
+            try:
+                zf = zipfile.ZipFile(path)
+            except zipfile.BadZipFile:
+                yield original, None, "Not a valid ZIP file"
+                continue
+            with zf:
+                for name in _input_names(path):
+                    # Same per-file limit as a direct upload; reads
+                    # stop at the declared size
+                    if zf.getinfo(name).file_size > UPLOAD_MAX_BYTES:
+                        yield Path(name).name, None, f"File exceeds the upload limit of {UPLOAD_MAX_BYTES} bytes"
+                        continue
+                    yield Path(name).name, zf.read(name), None
+        elif suffix == ".pdf":
+            yield original, path.read_bytes(), None
+        else:
+            yield original, None, "Only PDF and ZIP files are supported"
+
+
+def count_inputs(paths: List[Path]) -> int:
+    total = 0
+    for path in paths:
+        try:
+            total += len(_input_names(path))
+        except zipfile.BadZipFile:
+            total += 1
+    return total
+
+
+# ---------------------------------------------------------
+# One document
+# ---------------------------------------------------------
+def _output_name(name: str, index: int) -> str:
+    stem = Path(name).stem
+    return f"{index:05d}_{stem}_redacted.pdf"
+
+
+def process_document(bulk_id: str, index: int, name: str, pdf_bytes: bytes, options: dict) -> dict:
+    """
+    extract -> suggest -> redact -> export for one PDF.
+    Errors are reported in the manifest item, never raised.
+    """
+    doc_id = str(uuid.uuid4())
+    item = {
+        "index": index,
+        "name": name,
+        "doc_id": doc_id,
+        "status": "done",
+        "stage": "extract",
+        "text_length": 0,
+        "suggestions": 0,
+        "applied": 0,
+        "output": None,
+        "error": None,
+    }
+    started = time.perf_counter()
+
+    try:
+        info = ingest_pdf(doc_id, name, pdf_bytes, options.get("save_original", False), options.get("save_audit", False))
+        item["text_length"] = info["text_length"]
+
+        if options.get("redact", True):
+            item["stage"] = "suggest"
+            result = suggest_redactions(doc_id)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            spans = result.get("suggestions", []) or []
+            item["suggestions"] = len(spans)
+
+            item["stage"] = "redact"
+            if spans:
+                item["applied"] = redact_multiple(doc_id, spans).get("total_hits", 0)
+                labels = sorted({s.get("label") for s in spans if s.get("label")})
+                if labels:
+                    save_tags(doc_id, labels, "label")
+
+        item["stage"] = "export"
+        output = _output_name(name, index)
+        with open(bulk_folder(bulk_id) / "output" / output, "wb") as f:
+            f.write(export_pdf_bytes(doc_id))
+        item["output"] = output
+        item["stage"] = "done"
+    except Exception as e:
+        detail = getattr(e, "detail", None) or str(e)
+        item.update(status="failed", error=str(detail))
+
+    item["seconds"] = round(time.perf_counter() - started, 3)
+    return item
+
+
+# ---------------------------------------------------------
+# Whole batch (runs as a job, see services/jobs.py)
+# ---------------------------------------------------------
+def run_bulk(progress, bulk_id: str, options: dict) -> dict:
+    folder = bulk_folder(bulk_id)
+    (folder / "output").mkdir(exist_ok=True)
+    inputs = sorted((folder / "inputs").iterdir())
+
+    total = count_inputs(inputs)
+    items: List[dict] = []
+    progress(0.0, documents_done=0, documents_total=total)
+
+    pool = get_executor("bulk")
+    window = BULK_MAX_IN_FLIGHT or 2 * executor_workers("bulk")
+    pending = set()
+
+    def collect(futures):
+        for future in futures:
+            items.append(future.result())
+        progress(len(items) / total if total else 1.0, documents_done=len(items), documents_total=total)
+
+    started = time.perf_counter()
+    try:
+        for index, (name, pdf_bytes, error) in enumerate(_iter_inputs(inputs)):
+            if error is not None:
+                items.append({"index": index, "name": name, "doc_id": None, "status": "failed", "error": error})
+                continue
+
+            if pool is None:
+                items.append(process_document(bulk_id, index, name, pdf_bytes, options))
+                progress(len(items) / total, documents_done=len(items), documents_total=total)
+                continue
+
+            # Back-pressure: don't read the next PDF until a slot is free
+            while len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+            pending.add(pool.submit(process_document, bulk_id, index, name, pdf_bytes, options))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    finally:
+        # Cancelled: let submitted documents finish, drop the rest
+        for future in pending:
+            future.cancel()
+        shutil.rmtree(folder / "inputs", ignore_errors=True)
+
+    items.sort(key=lambda item: item["index"])
+    manifest = {
+        "bulk_id": bulk_id,
+        "total": len(items),
+        "done": sum(1 for i in items if i["status"] == "done"),
+        "failed": sum(1 for i in items if i["status"] == "failed"),
+        "seconds": round(time.perf_counter() - started, 3),
+        "options": options,
+        "download_url": f"/bulk/{bulk_id}/download",
+        "items": items,
+    }
+
+    tmp_path = folder / (MANIFEST_NAME + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, folder / MANIFEST_NAME)
+    return manifest
+
+
+def record_job(bulk_id: str, job_id: str):
+    (bulk_folder(bulk_id) / JOB_ID_NAME).write_text(job_id, encoding="utf-8")
+
+
+def recorded_job(bulk_id: str) -> str | None:
+    path = bulk_folder(bulk_id) / JOB_ID_NAME
+    if not path.is_file():
+        return None
+    return path.read_text(encoding="utf-8").strip()
+
+
+def load_manifest(bulk_id: str) -> dict | None:
+    path = bulk_folder(bulk_id) / MANIFEST_NAME
+    if not path.is_file():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def bulk_zip_entries(bulk_id: str, manifest: dict):
+    """
+    stream_zip() entries: the manifest + every redacted PDF.
+    """
+    folder = bulk_folder(bulk_id)
+    yield file_zip_entry(folder / MANIFEST_NAME, MANIFEST_NAME)
+    for item in manifest["items"]:
+        if item.get("output"):
+            path = folder / "output" / item["output"]
+            if path.is_file():
+                yield file_zip_entry(path, item["output"])
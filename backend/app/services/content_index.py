@@ -0,0 +1,113 @@
+# ---------------------------------------------------------
+# File: content_index.py
+# Path: backend/app/services/content_index.py
+# ---------------------------------------------------------
+# Upload deduplication by content hash.
+#
+# The same PDF is often uploaded by several reviewers. The
+# first upload of a file (by SHA-256) records what was
+# extracted from it; later uploads of the same bytes reuse:
+# - the PDF itself (same bytes object / uploaded file; the
+#   incremental working copy is per document, created on
+#   the first redaction)
+# - DOC_TEXT and the layout index (shared, copied on the
+#   first redaction, see layout_index.advance_layout)
+# - suggestions, through the text-keyed suggestion cache
+# Each upload still gets its own doc_id.
+#
+# The index is an LRU bounded by entry count and by bytes:
+# entries pin their PDF bytes and layout outside the
+# document store budget, so they are counted here.
+# ---------------------------------------------------------
+
+import os
+import threading
+from collections import OrderedDict
+
+# Set UPLOAD_DEDUP=0 to extract every upload again
+UPLOAD_DEDUP = os.environ.get("UPLOAD_DEDUP", "1") != "0"
+
+# Max distinct files remembered
+UPLOAD_DEDUP_MAX_ENTRIES = int(os.environ.get("UPLOAD_DEDUP_MAX_ENTRIES", 64))
+
+# Max bytes pinned by remembered files (PDF bytes + layout)
+UPLOAD_DEDUP_MAX_BYTES = int(os.environ.get("UPLOAD_DEDUP_MAX_BYTES", 128 * 1024 * 1024))
+
+
+class ContentEntry:
+    def __init__(self, sha256: str, source, layout):
+        self.sha256 = sha256
+        self.source = source  # PDF bytes or uploaded file path
+        self.layout = layout  # shared DocumentLayout (shared=True)
+        self.uploads = 1
+        # Uploaded files on disk cost only their layout
+        in_memory = len(source) if isinstance(source, (bytes, bytearray)) else 0
+        self.size = layout.approx_size() + in_memory
+
+
+class ContentIndex:
+    """
+    LRU of sha256 -> ContentEntry, bounded by entry count
+    and total size. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, ContentEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sha256: str) -> ContentEntry | None:
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is None:
+                self.misses += 1
+                return None
+            # A spooled file may have been removed since
+            if not isinstance(entry.source, (bytes, bytearray)) and not os.path.exists(entry.source):
+                self._forget(sha256)
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry.uploads += 1
+            self._entries.move_to_end(sha256)
+            return entry
+
+    def put(self, sha256: str, source, layout) -> ContentEntry:
+        layout.shared = True
+        with self._lock:
+            entry = ContentEntry(sha256, source, layout)
+            if sha256 in self._entries:
+                self._forget(sha256)
+            # An entry bigger than the whole budget isn't kept
+            if entry.size > self.max_bytes:
+                return entry
+            self._entries[sha256] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._forget(next(iter(self._entries)))
+            return entry
+
+    def _forget(self, sha256: str):
+        entry = self._entries.pop(sha256)
+        self._bytes -= entry.size
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "max_bytes": self.max_bytes,
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+            }
+
+
+CONTENT_INDEX = ContentIndex(UPLOAD_DEDUP_MAX_ENTRIES, UPLOAD_DEDUP_MAX_BYTES)
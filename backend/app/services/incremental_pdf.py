@@ -0,0 +1,273 @@
+# ---------------------------------------------------------
+# File: incremental_pdf.py
+# Path: backend/app/services/incremental_pdf.py
+# ---------------------------------------------------------
+# Incremental-update mode for redactions.
+#
+# A full save (doc.tobytes()) re-serializes every object of
+# the PDF, so each redaction of a large scanned document
+# costs the whole file. Instead, each document gets a
+# working file on disk (storage/working/<doc_id>.pdf):
+# a redaction opens it, changes the affected pages and
+# appends only the changed objects (saveIncr). DOC_PDF_BYTES
+# is then backed by that file and read on the next access.
+#
+# Incremental updates keep the previous object versions in
+# the file, i.e. the unredacted content is still in there.
+# So:
+# - the working copy is periodically compacted (full,
+#   garbage-collected rewrite) after PDF_COMPACT_EVERY
+#   updates or once updates exceed PDF_COMPACT_RATIO of
+#   the base size
+# - anything exported (/view, /save, final outputs) goes
+#   through export_pdf_bytes() / export_pdf_source(), which
+#   compact first if there are pending updates
+# - saved versions are snapshots of the working copy as it
+#   is (save_snapshot(), no compaction per redaction): the
+#   previous snapshot plus the bytes appended since, so only
+#   the tail is read and stored (the first snapshot after a
+#   full write stores the whole file once); the version
+#   store compacts them when they are read back
+# - the viewer doesn't reload /view after a redaction, it
+#   re-fetches the touched pages as images (page versions,
+#   page_render_service.py), so a click doesn't compact
+#
+# Sharded redactions of large documents (parallel_redaction)
+# rewrite the file anyway and replace the working copy.
+# ---------------------------------------------------------
+
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+
+from ..state.memory import DOCUMENT_STORE, DOC_REVISION, DOC_WORKING_COPY, DOC_PDF_WRITES
+from ..storage.storage import save_version, append_version, version_is_stored
+from ..state.doc_locks import document_lock
+from ..utils.executors import executor_workers
+from .pdf_service import get_pdf_bytes, get_pdf_source, pdf_etag, update_pdf_bytes, update_pdf_file
+from .parallel_redaction import PARALLEL_MIN_PAGES, redact_pages, _apply
+
+
+# Set PDF_INCREMENTAL=0 to always do full rewrites
+PDF_INCREMENTAL = os.environ.get("PDF_INCREMENTAL", "1") != "0"
+
+# Compact after this many incremental updates ...
+PDF_COMPACT_EVERY = int(os.environ.get("PDF_COMPACT_EVERY", 25))
+# ... or once the appended bytes exceed this share of the base file
+PDF_COMPACT_RATIO = float(os.environ.get("PDF_COMPACT_RATIO", 0.5))
+
+# Working files don't survive a restart (state is in memory)
+PDF_WORKING_DIR = Path(os.environ.get("PDF_WORKING_DIR", "storage/working"))
+shutil.rmtree(PDF_WORKING_DIR, ignore_errors=True)
+PDF_WORKING_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class WorkingCopy:
+    """
+    On-disk working file of one document and its update
+    counters since the last full write.
+    """
+
+    def __init__(self, doc_id: str, pdf_bytes: bytes, revision: int):
+        self.path = PDF_WORKING_DIR / f"{doc_id}.pdf"
+        self.revision = revision
+        self._write_base(pdf_bytes)
+
+    def _write_base(self, pdf_bytes: bytes):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, self.path)
+
+        self.base_size = len(pdf_bytes)
+        self.updates = 0
+        self.appended = 0
+        # Last version saved from this file: (path, manifest,
+        # sha256 state, bytes covered); see save_snapshot()
+        self.snapshot = None
+
+    @property
+    def dirty(self) -> bool:
+        return self.updates > 0
+
+    def needs_compaction(self) -> bool:
+        return (
+            self.updates >= PDF_COMPACT_EVERY
+            or self.appended > self.base_size * PDF_COMPACT_RATIO
+        )
+
+
+def _working_copy(doc_id: str) -> WorkingCopy:
+    """
+    Working copy matching the current revision; (re)created
+    from DOC_PDF_BYTES when missing or stale (e.g. after a
+    revert or a sharded rewrite).
+    """
+    revision = DOC_REVISION.get(doc_id, 0)
+    working = DOC_WORKING_COPY.get(doc_id)
+
+    if working is None or working.revision != revision or not working.path.exists():
+        working = WorkingCopy(doc_id, get_pdf_bytes(doc_id), revision)
+        DOC_WORKING_COPY[doc_id] = working
+
+    return working
+
+
+# ---------------------------------------------------------
+# Apply
+# ---------------------------------------------------------
+def apply_page_redactions(doc_id: str, page_rects: Dict[int, List[fitz.Rect]], page_count: int):
+    """
+    Apply blackout rectangles (page_index -> rects) to the
+    document and commit them (update_pdf_bytes). Returns
+    the number of bytes written for this update. Callers that
+    computed page_rects from the current state should hold
+    the document lock (pdf_service.document_mutation).
+    """
+    with document_lock(doc_id):
+        return _apply_page_redactions(doc_id, page_rects, page_count)
+
+
+def _apply_page_redactions(doc_id: str, page_rects: Dict[int, List[fitz.Rect]], page_count: int) -> int:
+    plain = {p: [tuple(fitz.Rect(r)) for r in rects] for p, rects in page_rects.items()}
+    sharded = page_count >= PARALLEL_MIN_PAGES and len(plain) > 1 and executor_workers("shard") > 1
+
+    if not PDF_INCREMENTAL or sharded:
+        new_bytes = redact_pages(get_pdf_bytes(doc_id), plain, page_count)
+        update_pdf_bytes(doc_id, new_bytes, pages=plain)
+        return len(new_bytes)
+
+    working = _working_copy(doc_id)
+    size = working.path.stat().st_size
+
+    doc = fitz.open(working.path)
+    try:
+        _apply(doc, plain)
+        doc.saveIncr()
+    finally:
+        doc.close()
+
+    appended = working.path.stat().st_size - size
+
+    update_pdf_file(doc_id, working.path, pages=plain)
+    working.revision = DOC_REVISION.get(doc_id, 0)
+    working.updates += 1
+    working.appended += appended
+
+    if working.needs_compaction():
+        compact(doc_id)
+
+    return appended
+
+
+# ---------------------------------------------------------
+# Compaction / export
+# ---------------------------------------------------------
+def compact(doc_id: str) -> bytes:
+    """
+    Full rewrite of the working copy without superseded or
+    unused objects. Content doesn't change, so the revision
+    stays the same.
+    """
+    with document_lock(doc_id):
+        return _compact(doc_id)
+
+
+def _compact(doc_id: str) -> bytes:
+    working = _working_copy(doc_id)
+
+    t0 = time.perf_counter()
+    doc = fitz.open(working.path)
+    try:
+        data = doc.tobytes(garbage=1)
+    finally:
+        doc.close()
+
+    updates = working.updates
+    working._write_base(data)
+    # Backed by the rewritten file, not another in-memory copy
+    DOCUMENT_STORE.attach_file(doc_id, "pdf_bytes", working.path)
+    DOC_PDF_WRITES[doc_id] = DOC_PDF_WRITES.get(doc_id, 0) + 1
+
+    print(
+        f"[INFO] Compacted {doc_id}: {updates} updates, "
+        f"{len(data)} bytes in {time.perf_counter() - t0:.3f}s"
+    )
+    return data
+
+
+def compact_pending(doc_id: str) -> bytes | None:
+    """
+    Compact if the working copy has pending incremental
+    updates. Returns the new bytes, or None when the working
+    PDF was already safe to hand out.
+    """
+    with document_lock(doc_id):
+        working = DOC_WORKING_COPY.get(doc_id)
+        if working is not None and working.dirty and working.revision == DOC_REVISION.get(doc_id, 0):
+            return _compact(doc_id)
+        return None
+
+
+def export_pdf_source(doc_id: str):
+    """
+    (ETag, source) of the PDF to hand out, compacted first if
+    needed: source is the bytes, or (open file, size) for a
+    file on disk. ETag, size and file handle are all taken
+    under the document lock, so a redaction or compaction
+    replacing the file afterwards can't mix two versions;
+    the caller closes the handle (http_cache does).
+    """
+    with document_lock(doc_id):
+        compact_pending(doc_id)
+        source = get_pdf_source(doc_id)
+        if not isinstance(source, (bytes, bytearray)):
+            path, size = source
+            source = open(path, "rb"), size
+        return pdf_etag(doc_id), source
+
+
+def save_snapshot(doc_id: str) -> str:
+    """
+    Save the current working PDF as a version, without
+    compacting, and return its path. With pending incremental
+    updates only the bytes appended since the previous
+    snapshot of the working file are read and stored; the
+    version is marked incremental (compacted when read back).
+    """
+    with document_lock(doc_id):
+        working = DOC_WORKING_COPY.get(doc_id)
+        if working is None or not working.dirty or working.revision != DOC_REVISION.get(doc_id, 0):
+            return save_version(doc_id, get_pdf_bytes(doc_id))
+
+        size = working.path.stat().st_size
+        last = working.snapshot
+        if last is not None and version_is_stored(last[0]):
+            _, prefix, digest, start = last
+            digest = digest.copy()
+        else:
+            prefix, digest, start = [], hashlib.sha256(), 0
+
+        with open(working.path, "rb") as f:
+            f.seek(start)
+            tail = f.read(size - start)
+        digest.update(tail)
+
+        path, manifest = append_version(doc_id, prefix, tail, digest.hexdigest(), incremental=True)
+        working.snapshot = (path, manifest, digest, size)
+        return path
+
+
+def export_pdf_bytes(doc_id: str) -> bytes:
+    """
+    PDF bytes safe to hand out: no earlier (unredacted)
+    object versions from incremental updates.
+    """
+    data = compact_pending(doc_id)
+    return data if data is not None else get_pdf_bytes(doc_id)
+
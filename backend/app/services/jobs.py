@@ -0,0 +1,368 @@
+# ---------------------------------------------------------
+# File: jobs.py
+# Path: backend/app/services/jobs.py
+# ---------------------------------------------------------
+# Background jobs for long-running work.
+#
+# Requests that can outlive a proxy timeout (NER on a big
+# document, archiving, extracting a large upload) are
+# submitted as jobs instead:
+#
+#     job = submit_job("suggest", {"doc_id": doc_id})
+#     -> 202 {"job_id": ..., "status": "queued"}
+#
+# - jobs run on the bounded "job" pool (EXECUTOR_JOB);
+#   at most JOB_MAX_QUEUED may wait for a worker. With an
+#   inline pool a job runs in the submitting thread, except
+#   on the event loop (it gets a thread of its own there)
+# - status/progress/result are polled through /jobs
+# - a queued job is cancelled immediately; a running job
+#   stops at its next progress report (jobs that don't
+#   report progress run to completion)
+# - every state change is persisted (storage/job_log.py);
+#   jobs still queued or running when the server stopped
+#   come back as "interrupted"
+#
+# Job kinds are plain functions registered with @job_kind;
+# they receive a progress callback plus the job params.
+# ---------------------------------------------------------
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from fastapi import HTTPException
+
+from ..storage.job_log import JobLog, FINISHED
+from ..storage.storage import BASE_DIR, archive_month, archive_year
+from ..utils.executors import get_executor
+from .multiple_redaction_service import redact_multiple
+from .redaction_suggestion_service import suggest_redactions
+from .upload_service import ingest_upload, release_documents
+from .bulk_service import run_bulk
+
+# Max jobs waiting for a worker (submissions beyond fail)
+JOB_MAX_QUEUED = int(os.environ.get("JOB_MAX_QUEUED", 100))
+
+# Progress is persisted at most this often per job (seconds)
+JOB_PROGRESS_PERSIST_SECONDS = float(os.environ.get("JOB_PROGRESS_PERSIST_SECONDS", 1.0))
+
+
+class JobCancelled(Exception):
+    """
+    Raised from the progress callback of a cancelled job.
+    """
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+# kind -> fn(progress, **params)
+JOB_KINDS: Dict[str, Callable] = {}
+
+
+def job_kind(name: str):
+    def register(fn):
+        JOB_KINDS[name] = fn
+        return fn
+    return register
+
+
+JOB_LOG = JobLog(BASE_DIR / "jobs.jsonl")
+
+# job_id -> job state (see _new_job)
+JOBS: Dict[str, dict] = {}
+
+_lock = threading.Lock()
+_futures: Dict[str, Future] = {}
+_cancel_requested = set()
+_last_persist: Dict[str, float] = {}
+
+
+def _new_job(kind: str, params: dict) -> dict:
+    return {
+        "job_id": str(uuid.uuid4()),
+        "kind": kind,
+        "params": params,
+        "status": "queued",
+        "progress": 0.0,
+        "details": {},
+        "result": None,
+        "error": None,
+        "cancel_requested": False,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+    }
+
+
+def _load():
+    """
+    Restore job state from the log. Unfinished jobs can't be
+    resumed (their inputs lived in memory).
+    """
+    for job_id, job in JOB_LOG.load().items():
+        if job["status"] not in FINISHED:
+            job.update(
+                status="interrupted",
+                error="Server restarted before the job finished",
+                finished_at=time.time(),
+            )
+            JOB_LOG.append(job)
+        JOBS[job_id] = job
+
+
+_load()
+
+
+# ---------------------------------------------------------
+# Persistence (call with _lock held)
+# ---------------------------------------------------------
+def _persist(job: dict):
+    JOB_LOG.append(job)
+    _last_persist[job["job_id"]] = time.monotonic()
+
+    if JOB_LOG.needs_compaction(len(JOBS)):
+        for job_id in JOB_LOG.compact(list(JOBS.values())):
+            JOBS.pop(job_id, None)
+            _last_persist.pop(job_id, None)
+
+
+def _finish(job: dict, status: str, **fields):
+    job.update(status=status, finished_at=time.time(), **fields)
+    _futures.pop(job["job_id"], None)
+    _cancel_requested.discard(job["job_id"])
+    _persist(job)
+
+
+# ---------------------------------------------------------
+# Running
+# ---------------------------------------------------------
+def _run(job_id: str, fn: Callable, params: dict):
+    with _lock:
+        job = JOBS[job_id]
+        if job["status"] != "queued":
+            return  # cancelled while waiting
+        job.update(status="running", started_at=time.time())
+        _persist(job)
+
+    def progress(fraction: float | None = None, **details):
+        with _lock:
+            if job_id in _cancel_requested:
+                raise JobCancelled()
+            if fraction is not None:
+                job["progress"] = fraction
+            job["details"].update(details)
+            if time.monotonic() - _last_persist.get(job_id, 0) >= JOB_PROGRESS_PERSIST_SECONDS:
+                _persist(job)
+
+    try:
+        result = fn(progress, **params)
+    except JobCancelled:
+        with _lock:
+            _finish(job, "cancelled")
+        return
+    except HTTPException as e:
+        with _lock:
+            _finish(job, "failed", error=str(e.detail))
+        return
+    except Exception as e:
+        print(f"[WARN] Job {job_id} ({job['kind']}) failed: {e}")
+        with _lock:
+            _finish(job, "failed", error=str(e))
+        return
+
+    with _lock:
+        _finish(job, "done", progress=1.0, result=result)
+
+
+_fallback_pool: ThreadPoolExecutor | None = None
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _loop_fallback() -> ThreadPoolExecutor:
+    # Inline jobs submitted from a coroutine: one worker, so
+    # they still run one at a time, just not on the loop
+    global _fallback_pool
+    with _lock:
+        if _fallback_pool is None:
+            _fallback_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-inline")
+        return _fallback_pool
+
+
+def submit_job(kind: str, params: dict, **payload) -> dict:
+    """
+    Queue a job of a registered kind. params are persisted
+    with the job (JSON); payload is passed to the job too but
+    kept in memory only (e.g. uploaded bytes).
+    Returns the job state.
+    """
+    fn = JOB_KINDS.get(kind)
+    if fn is None:
+        raise KeyError(f"Unknown job kind: {kind}")
+
+    with _lock:
+        queued = sum(1 for j in JOBS.values() if j["status"] == "queued")
+        if queued >= JOB_MAX_QUEUED:
+            raise JobQueueFull(f"{queued} jobs already queued")
+
+        job = _new_job(kind, params)
+        JOBS[job["job_id"]] = job
+        _persist(job)
+        snapshot = _public(job)
+
+    pool = get_executor("job")
+    if pool is None and _on_event_loop():
+        pool = _loop_fallback()
+    if pool is None:
+        _run(job["job_id"], fn, {**params, **payload})
+        return get_job(job["job_id"])
+
+    future = pool.submit(_run, job["job_id"], fn, {**params, **payload})
+    with _lock:
+        if not future.done():
+            _futures[job["job_id"]] = future
+    return snapshot
+
+
+def cancel_job(job_id: str) -> dict | None:
+    """
+    Cancel a queued job, or ask a running one to stop.
+    """
+    with _lock:
+        job = JOBS.get(job_id)
+        if job is None:
+            return None
+        if job["status"] == "queued":
+            future = _futures.get(job_id)
+            if future is not None:
+                future.cancel()
+            _finish(job, "cancelled")
+        elif job["status"] == "running":
+            _cancel_requested.add(job_id)
+            job["cancel_requested"] = True
+            _persist(job)
+        return _public(job)
+
+
+async def wait_job(job_id: str) -> dict | None:
+    """
+    Await a job submitted with submit_job().
+    """
+    with _lock:
+        future = _futures.get(job_id)
+    if future is not None and not future.cancelled():
+        await asyncio.wrap_future(future)
+        with _lock:
+            _futures.pop(job_id, None)
+    return get_job(job_id, with_result=True)
+
+
+# ---------------------------------------------------------
+# Queries
+# ---------------------------------------------------------
+def _public(job: dict, with_result: bool = False) -> dict:
+    snapshot = {k: v for k, v in job.items() if k != "result"}
+    snapshot["details"] = dict(job["details"])
+    if with_result:
+        snapshot["result"] = job["result"]
+    return snapshot
+
+
+def get_job(job_id: str, with_result: bool = False) -> dict | None:
+    with _lock:
+        job = JOBS.get(job_id)
+        return _public(job, with_result) if job is not None else None
+
+
+def list_jobs(kind: str = None, status: str = None, limit: int = 100) -> List[dict]:
+    """
+    Jobs newest first, optionally filtered.
+    """
+    with _lock:
+        jobs = [
+            _public(j) for j in JOBS.values()
+            if (kind is None or j["kind"] == kind) and (status is None or j["status"] == status)
+        ]
+    jobs.sort(key=lambda j: j["created_at"], reverse=True)
+    return jobs[:limit]
+
+
+# ---------------------------------------------------------
+# Submittable work
+# ---------------------------------------------------------
+@job_kind("suggest")
+def _suggest_job(progress, doc_id: str):
+    result = suggest_redactions(doc_id)
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+
+@job_kind("redact_multiple")
+def _redact_multiple_job(progress, doc_id: str, items: list):
+    return redact_multiple(doc_id, items)
+
+
+@job_kind("extract_text")
+def _extract_text_job(progress, doc_id: str, filename: str, source,
+                      save_original: bool = False, save_audit: bool = False, sha256: str = None):
+    return ingest_upload(doc_id, filename, source, save_original, save_audit, sha256)
+
+
+@job_kind("bulk")
+def _bulk_job(progress, bulk_id: str, options: dict):
+    return run_bulk(progress, bulk_id, options)
+
+
+# One archive at a time: jobs for overlapping periods would
+# select (and delete) the same folders
+_archive_lock = threading.Lock()
+
+
+def _archive_progress(progress):
+    def report(files_done, files_total, bytes_done, bytes_total):
+        progress(
+            (bytes_done / bytes_total) if bytes_total else 1.0,
+            files_done=files_done,
+            files_total=files_total,
+            bytes_done=bytes_done,
+            bytes_total=bytes_total,
+        )
+    return report
+
+
+def _archive_result(zip_path: str) -> dict:
+    name = Path(zip_path).name
+    return {"archive": name, "download_url": f"/download/{name}"}
+
+
+@job_kind("archive_month")
+def _archive_month_job(progress, year: int, month: int):
+    with _archive_lock:
+        progress()  # cancelled while waiting for the lock?
+        return _archive_result(archive_month(
+            year, month, progress=_archive_progress(progress), on_removed=release_documents,
+        ))
+
+
+@job_kind("archive_year")
+def _archive_year_job(progress, year: int):
+    with _archive_lock:
+        progress()
+        return _archive_result(archive_year(
+            year, progress=_archive_progress(progress), on_removed=release_documents,
+        ))
@@ -0,0 +1,445 @@
+# ---------------------------------------------------------
+# File: layout_index.py
+# Path: backend/app/services/layout_index.py
+# ---------------------------------------------------------
+# Per-document page layout index.
+#
+# Built once at upload from the same pass that extracts
+# DOC_TEXT. For every page it keeps:
+# - the page text and its offset inside DOC_TEXT
+# - the bounding box + line of every character
+# - words (with offsets and boxes)
+# - a normalized search string for the redaction engine
+#
+# The index is keyed by document revision (DOC_REVISION).
+# Redactions done through the services advance it in place
+# (redacted characters are masked) instead of reparsing the
+# PDF, so DOC_TEXT offsets stay valid across versions.
+#
+# Scanned pages (no text layer) are OCR'd while the index
+# is built (ocr_service.py); their words go through the same
+# structures, so DOC_TEXT offsets, search and redaction
+# don't care where the text came from.
+#
+# Uploads of identical files share one index (see
+# content_index.py). A shared index is copied on the first
+# redaction of a document (copy-on-write), so masking never
+# leaks into the other documents.
+# ---------------------------------------------------------
+
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+
+import copy
+
+import fitz  # PyMuPDF
+
+from ..state.memory import DOC_LAYOUT, DOC_REVISION, DOC_PDF_BYTES
+from .ocr_service import needs_ocr, ocr_pages
+
+
+# Placeholder used in the search string for redacted characters.
+# Terms never contain it, so masked text can't match again.
+MASK_CHAR = "\x00"
+
+# How far ahead to look when aligning a layout char to page text
+ALIGN_WINDOW = 8
+
+
+# ---------------------------------------------------------
+# One page
+# ---------------------------------------------------------
+class PageLayout:
+    """
+    Layout of one page. Offsets are local to the page text;
+    add text_start to get an offset into DOC_TEXT.
+    """
+
+    def __init__(self, number: int, page: fitz.Page, text_start: int):
+        self.number = number
+        self.width = page.rect.width
+        self.height = page.rect.height
+        self.origin = (page.rect.x0, page.rect.y0)
+        self.text_start = text_start
+        self.text = page.get_text()
+        # Text came from OCR (from_ocr) instead of the text layer
+        self.ocr = False
+
+        # text[i] <-> char_rects[i], char_lines[i]
+        self.char_rects: List[Tuple[float, float, float, float] | None] = [None] * len(self.text)
+        self.char_lines: List[int] = [-1] * len(self.text)
+        self.redacted = bytearray(len(self.text))
+
+        self._align_chars(page)
+        self.words = self._build_words()
+        self._build_search_text()
+
+    @classmethod
+    def from_ocr(cls, number: int, page: fitz.Page, text_start: int, lines) -> "PageLayout":
+        """
+        Layout of a scanned page from OCR output: lines of
+        (x0, y0, x1, y1, word) in page coordinates. Text is the
+        words joined by spaces, one line per "\n"; each word box
+        is split evenly over its characters.
+        """
+        self = cls.__new__(cls)
+        self.number = number
+        self.width = page.rect.width
+        self.height = page.rect.height
+        self.origin = (page.rect.x0, page.rect.y0)
+        self.text_start = text_start
+        self.ocr = True
+
+        chars: List[str] = []
+        self.char_rects = []
+        self.char_lines = []
+
+        for line_no, line in enumerate(lines):
+            for i, (x0, y0, x1, y1, word) in enumerate(line):
+                if i:
+                    chars.append(" ")
+                    self.char_rects.append(None)
+                    self.char_lines.append(-1)
+                step = (x1 - x0) / len(word)
+                for j, ch in enumerate(word):
+                    chars.append(ch)
+                    self.char_rects.append((x0 + j * step, y0, x0 + (j + 1) * step, y1))
+                    self.char_lines.append(line_no)
+            chars.append("\n")
+            self.char_rects.append(None)
+            self.char_lines.append(-1)
+
+        self.text = "".join(chars)
+        self.redacted = bytearray(len(self.text))
+        self.words = self._build_words()
+        self._build_search_text()
+        return self
+
+    @property
+    def text_end(self) -> int:
+        return self.text_start + len(self.text)
+
+    # -----------------------------------------
+    # Build
+    # -----------------------------------------
+    def _align_chars(self, page: fitz.Page):
+        """
+        Walk rawdict characters in reading order and pin each
+        one to its position in get_text() output.
+        """
+        text = self.text
+        cursor = 0
+        line_no = 0
+
+        raw = page.get_text("rawdict")
+        for block in raw.get("blocks", []):
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    for c in span.get("chars", []):
+                        pos = text.find(c["c"], cursor, cursor + ALIGN_WINDOW)
+                        if pos == -1:
+                            continue
+                        if not c["c"].isspace():
+                            self.char_rects[pos] = tuple(c["bbox"])
+                            self.char_lines[pos] = line_no
+                        cursor = pos + 1
+                line_no += 1
+
+    def _build_words(self):
+        """
+        Words as (x0, y0, x1, y1, word, start, end), local offsets.
+        """
+        words = []
+        start = None
+
+        for i in range(len(self.text) + 1):
+            boxed = i < len(self.text) and self.char_rects[i] is not None
+            same_line = boxed and start is not None and self.char_lines[i] == self.char_lines[start]
+
+            if start is not None and not same_line:
+                words.append(self._word(start, i))
+                start = None
+            if boxed and start is None:
+                start = i
+
+        return words
+
+    def _word(self, start: int, end: int):
+        rect = fitz.Rect(self.char_rects[start])
+        for i in range(start + 1, end):
+            rect |= self.char_rects[i]
+        return (rect.x0, rect.y0, rect.x1, rect.y1, self.text[start:end], start, end)
+
+    def _build_search_text(self):
+        """
+        Casefolded text with whitespace runs collapsed to one
+        space (same rules as redaction_engine.normalize_term).
+        search_map[i] is the local text offset of search_text[i].
+        """
+        chars: List[str] = []
+        mapping: List[int] = []
+
+        for i, ch in enumerate(self.text):
+            if ch.isspace():
+                if chars and chars[-1] != " ":
+                    chars.append(" ")
+                    mapping.append(i)
+                continue
+            if self.redacted[i]:
+                chars.append(MASK_CHAR)
+                mapping.append(i)
+                continue
+            for folded in ch.casefold():
+                chars.append(folded)
+                mapping.append(i)
+
+        self.search_text = "".join(chars)
+        self.search_map = mapping
+
+    # -----------------------------------------
+    # Lookups
+    # -----------------------------------------
+    def rects_for_offsets(self, start: int, end: int) -> List[fitz.Rect]:
+        """
+        Boxes covering text[start:end], one rectangle per line.
+        """
+        result: List[fitz.Rect] = []
+        current = None
+        current_line = None
+
+        for i in range(max(start, 0), min(end, len(self.text))):
+            box = self.char_rects[i]
+            if box is None:
+                continue
+            if current is None or self.char_lines[i] != current_line:
+                if current is not None:
+                    result.append(current)
+                current = fitz.Rect(box)
+                current_line = self.char_lines[i]
+            else:
+                current |= box
+
+        if current is not None:
+            result.append(current)
+
+        return result
+
+    def search_span_to_offsets(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Convert a [start, end) range in search_text into local
+        text offsets.
+        """
+        return self.search_map[start], self.search_map[end - 1] + 1
+
+    def normalized_rect(self, rect: fitz.Rect) -> Dict[str, float]:
+        """
+        Normalize a rectangle to 0–1 page coordinates
+        (same convention as /redact/box and the viewer).
+        """
+        x0, y0 = self.origin
+        return {
+            "x": (rect.x0 - x0) / self.width,
+            "y": (rect.y0 - y0) / self.height,
+            "w": rect.width / self.width,
+            "h": rect.height / self.height,
+        }
+
+    # -----------------------------------------
+    # Updates
+    # -----------------------------------------
+    def copy(self) -> "PageLayout":
+        """
+        Copy with its own redaction mask. Boxes, lines and words
+        never change after the build and stay shared; the
+        search text is rebuilt (not mutated) on update.
+        """
+        page = copy.copy(self)
+        page.redacted = bytearray(self.redacted)
+        return page
+
+    def mark_redacted(self, rects: List[fitz.Rect]) -> int:
+        """
+        Mask every character whose centre falls inside one of
+        the given rectangles (what apply_redactions removes).
+        Returns the number of newly masked characters.
+        """
+        masked = 0
+        boxes = [tuple(fitz.Rect(r)) for r in rects]
+
+        for i, box in enumerate(self.char_rects):
+            if box is None or self.redacted[i]:
+                continue
+            cx = (box[0] + box[2]) / 2
+            cy = (box[1] + box[3]) / 2
+            for x0, y0, x1, y1 in boxes:
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    self.redacted[i] = 1
+                    masked += 1
+                    break
+
+        if masked:
+            self._build_search_text()
+        return masked
+
+
+# ---------------------------------------------------------
+# Whole document
+# ---------------------------------------------------------
+class DocumentLayout:
+    """
+    Layout index for a whole document.
+    text == "\\n".join(page.text for page in pages), i.e. the
+    same string extract_text_from_pdf() returns, plus the OCR
+    text of scanned pages.
+    """
+
+    def __init__(self, pages: List[PageLayout], version: int = 0):
+        self.pages = pages
+        self.version = version
+        self.text = "\n".join(p.text for p in pages)
+        self._starts = [p.text_start for p in pages]
+        # Referenced by several documents: copy before updating
+        self.shared = False
+        # Per-page OCR timing (ocr_service.ocr_pages), if any
+        self.ocr_stats = None
+
+    def copy(self) -> "DocumentLayout":
+        layout = copy.copy(self)
+        layout.pages = [page.copy() for page in self.pages]
+        layout.shared = False
+        return layout
+
+    def approx_size(self) -> int:
+        """
+        Rough memory footprint, used by the document store budget
+        (per character: box tuple, line number, mask, search text).
+        """
+        return len(self.text) * 160
+
+    def page_for_offset(self, offset: int) -> PageLayout | None:
+        i = bisect_right(self._starts, offset) - 1
+        if i < 0:
+            return None
+        page = self.pages[i]
+        return page if offset < page.text_end else None
+
+    # -----------------------------------------
+    # DOC_TEXT span -> page coordinates
+    # -----------------------------------------
+    def span_rects(self, start: int, end: int) -> Dict[int, List[fitz.Rect]]:
+        """
+        Map DOC_TEXT[start:end] to the exact boxes covering it:
+        page_index -> one rectangle per line. Spans that wrap
+        across lines (or pages) yield several rectangles.
+        Cost is O(log pages + span length).
+        """
+        result: Dict[int, List[fitz.Rect]] = {}
+        i = max(bisect_right(self._starts, start) - 1, 0)
+
+        while i < len(self.pages) and self.pages[i].text_start < end:
+            page = self.pages[i]
+            rects = page.rects_for_offsets(start - page.text_start, end - page.text_start)
+            if rects:
+                result[page.number] = rects
+            i += 1
+
+        return result
+
+    def span_quads(self, start: int, end: int) -> List[Tuple[int, List[fitz.Quad]]]:
+        """
+        Same as span_rects(), as (page_index, quads) pairs in
+        reading order.
+        """
+        return [
+            (page_index, [r.quad for r in rects])
+            for page_index, rects in self.span_rects(start, end).items()
+        ]
+
+    def mark_redacted(self, page_rects: Dict[int, List[fitz.Rect]]) -> int:
+        return sum(
+            self.pages[i].mark_redacted(rects)
+            for i, rects in page_rects.items()
+        )
+
+
+def build_layout_from_doc(doc: fitz.Document, version: int = 0) -> DocumentLayout:
+    """
+    Index every page from its text layer, then OCR the pages
+    that have none (in parallel) and use those results instead.
+    """
+    pages = [PageLayout(number, page, 0) for number, page in enumerate(doc)]
+
+    scanned = [p.number for p in pages if needs_ocr(doc[p.number], p.text)]
+    ocr_lines, ocr_stats = ocr_pages(doc, scanned)
+    for number, lines in ocr_lines.items():
+        pages[number] = PageLayout.from_ocr(number, doc[number], 0, lines)
+
+    offset = 0
+    for layout in pages:
+        layout.text_start = offset
+        offset = layout.text_end + 1  # "\n" between pages
+
+    layout = DocumentLayout(pages, version)
+    if scanned:
+        layout.ocr_stats = ocr_stats
+    return layout
+
+
+def build_layout(source, version: int = 0) -> DocumentLayout:
+    """
+    Open the PDF once and build its layout index. source is
+    the PDF bytes or the path of a PDF file.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        doc = fitz.open(stream=source, filetype="pdf")
+    else:
+        doc = fitz.open(source, filetype="pdf")
+    try:
+        return build_layout_from_doc(doc, version)
+    finally:
+        doc.close()
+
+
+# ---------------------------------------------------------
+# Per-document access (keyed by revision)
+# ---------------------------------------------------------
+def set_layout(doc_id: str, layout: DocumentLayout):
+    layout.version = DOC_REVISION.get(doc_id, 0)
+    DOC_LAYOUT[doc_id] = layout
+
+
+def get_layout(doc_id: str) -> DocumentLayout | None:
+    """
+    Return the layout index for the current revision of a
+    document. Rebuilt from the working PDF only when the
+    stored index is missing or belongs to another revision
+    (e.g. after a revert).
+    """
+    revision = DOC_REVISION.get(doc_id, 0)
+    layout = DOC_LAYOUT.get(doc_id)
+
+    if layout is not None and layout.version == revision:
+        return layout
+
+    pdf_bytes = DOC_PDF_BYTES.get(doc_id)
+    if pdf_bytes is None:
+        return None
+
+    layout = build_layout(pdf_bytes, revision)
+    DOC_LAYOUT[doc_id] = layout
+    return layout
+
+
+def advance_layout(doc_id: str, layout: DocumentLayout, page_rects: Dict[int, List[fitz.Rect]]) -> DocumentLayout:
+    """
+    After a redaction has been committed (update_pdf_bytes),
+    mask the redacted characters and move the index to the
+    new revision without reparsing the PDF. A shared index
+    is copied first; the document's own index is returned.
+    """
+    if layout.shared:
+        layout = layout.copy()
+    layout.mark_redacted(page_rects)
+    layout.version = DOC_REVISION.get(doc_id, 0)
+    DOC_LAYOUT[doc_id] = layout
+    return layout
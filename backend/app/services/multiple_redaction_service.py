@@ -3,13 +3,19 @@
 # Unified redaction engine:
 # - Accepts either spans OR plain text terms
 # - Applies blackout rectangles using PyMuPDF
+# - All terms are matched in one pass per page against
+#   the layout index (see redaction_engine.py)
 # ---------------------------------------------------------
 
-import fitz
 from fastapi import HTTPException
-from .pdf_service import get_pdf_bytes, update_pdf_bytes
+from ..state.memory import DOC_PDF_BYTES
+from .pdf_service import document_mutation
+from .layout_index import get_layout, advance_layout
+from .redaction_engine import unique_terms, find_term_rects
+from .incremental_pdf import apply_page_redactions
 
 
+@document_mutation
 def redact_multiple(doc_id: str, items: list):
     """
     Accepts either:
@@ -22,11 +28,6 @@ def redact_multiple(doc_id: str, items: list):
     if not items:
         raise HTTPException(status_code=400, detail="No redaction items provided")
 
-    pdf_bytes = get_pdf_bytes(doc_id)
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-
-    total_hits = 0
-
     # Normalize input into a list of strings to search for
     terms = []
 
@@ -44,29 +45,27 @@ def redact_multiple(doc_id: str, items: list):
     if not terms:
         raise HTTPException(status_code=400, detail="No valid redaction terms found")
 
-    # ---------------------------------------------------------
-    # Apply blackout rectangles for each term
-    # ---------------------------------------------------------
-    for term in terms:
-        for page in doc:
-            matches = page.search_for(term)
-            for rect in matches:
-                page.add_redact_annot(rect, fill=(0, 0, 0))
-                total_hits += 1
+    terms = unique_terms(terms)
 
-            if matches:
-                page.apply_redactions()
+    if doc_id not in DOC_PDF_BYTES:
+        raise HTTPException(status_code=404, detail="Document not found")
+    layout = get_layout(doc_id)
 
     # ---------------------------------------------------------
-    # Save updated PDF
+    # Match all terms at once (index lookup, no PDF parsing)
     # ---------------------------------------------------------
-    new_bytes = doc.tobytes()
-    doc.close()
+    page_rects, hits = find_term_rects(layout, terms)
 
-    update_pdf_bytes(doc_id, new_bytes)
+    # ---------------------------------------------------------
+    # Apply once per touched page + save updated PDF
+    # (incremental update; page-sharded for large documents)
+    # ---------------------------------------------------------
+    if page_rects:
+        apply_page_redactions(doc_id, page_rects, len(layout.pages))
+        advance_layout(doc_id, layout, page_rects)
 
     return {
         "status": "success",
         "total_terms": len(terms),
-        "total_hits": total_hits
+        "total_hits": sum(hits)
     }
@@ -0,0 +1,270 @@
+# ---------------------------------------------------------
+# File: ocr_service.py
+# Path: backend/app/services/ocr_service.py
+# ---------------------------------------------------------
+# OCR stage for scanned pages.
+#
+# Scanned CoAs have no text layer, so page.get_text() is
+# empty and suggestions / redaction find nothing. While the
+# layout index is built (layout_index.build_layout_from_doc),
+# pages without text but with images are:
+# 1. rasterized (grayscale, OCR_DPI) in the calling thread
+# 2. looked up in the OCR cache by a hash of the rendered
+#    pixels (+ dpi, language)
+# 3. OCR'd with Tesseract on the "ocr" process pool, pages
+#    in parallel; at most OCR_MAX_IN_FLIGHT pages are
+#    rendered and waiting at a time (the next page is only
+#    rasterized once a slot frees up, like bulk_service)
+# The word boxes come back in page coordinates, grouped per
+# line, and become a PageLayout like native text
+# (PageLayout.from_ocr), so offsets, search and redaction
+# work the same on scanned pages.
+#
+# Tesseract (pytesseract + the tesseract binary) is
+# optional: without it, OCR is skipped with a warning.
+#
+# NOTE: ocr_words() runs in worker processes; keep this
+# module free of imports that touch in-memory document state.
+# ---------------------------------------------------------
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+
+from ..utils.executors import get_executor, executor_workers
+
+# Set OCR_ENABLED=0 to never OCR
+OCR_ENABLED = os.environ.get("OCR_ENABLED", "1") != "0"
+
+# Rasterization resolution for OCR
+OCR_DPI = int(os.environ.get("OCR_DPI", 300))
+
+# Tesseract language(s), e.g. "eng+fra"
+OCR_LANG = os.environ.get("OCR_LANG", "eng")
+
+# Pages with fewer non-space characters than this (and at
+# least one image) are OCR'd
+OCR_MIN_CHARS = int(os.environ.get("OCR_MIN_CHARS", 1))
+
+# Words below this Tesseract confidence are dropped
+OCR_MIN_CONFIDENCE = float(os.environ.get("OCR_MIN_CONFIDENCE", 30))
+
+# Rendered pages sent to the pool but not OCR'd yet
+# (0: twice the "ocr" workers); bounds pixmap memory
+OCR_MAX_IN_FLIGHT = int(os.environ.get("OCR_MAX_IN_FLIGHT", 0)) or None
+
+# Cached OCR results (pages)
+OCR_CACHE_MAX_PAGES = int(os.environ.get("OCR_CACHE_MAX_PAGES", 2048))
+
+# (x0, y0, x1, y1, word) in page coordinates
+Word = Tuple[float, float, float, float, str]
+
+
+# ---------------------------------------------------------
+# Worker (process pool)
+# ---------------------------------------------------------
+def ocr_words(samples: bytes, width: int, height: int, stride: int, scale: float, origin: Tuple[float, float], lang: str):
+    """
+    OCR one grayscale page image. Returns (lines, seconds):
+    lines is a list of lines, each a list of Words, with
+    pixel boxes converted to page coordinates.
+    """
+    import pytesseract
+    from PIL import Image
+
+    started = time.perf_counter()
+    image = Image.frombytes("L", (width, height), samples, "raw", "L", stride)
+    data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+
+    lines: Dict[Tuple[int, int, int], List[Word]] = {}
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        if not word or float(data["conf"][i]) < OCR_MIN_CONFIDENCE:
+            continue
+        x0 = origin[0] + data["left"][i] * scale
+        y0 = origin[1] + data["top"][i] * scale
+        x1 = x0 + data["width"][i] * scale
+        y1 = y0 + data["height"][i] * scale
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append((x0, y0, x1, y1, word))
+
+    # Reading order: Tesseract's block / paragraph / line numbering
+    ordered = [lines[key] for key in sorted(lines)]
+    return ordered, time.perf_counter() - started
+
+
+# ---------------------------------------------------------
+# Availability
+# ---------------------------------------------------------
+_available = None
+_available_lock = threading.Lock()
+
+
+def ocr_available() -> bool:
+    global _available
+    with _available_lock:
+        if _available is None:
+            try:
+                import pytesseract
+                pytesseract.get_tesseract_version()
+                _available = True
+            except Exception as e:
+                print(f"[WARN] OCR unavailable (scanned pages stay without text): {e}")
+                _available = False
+        return _available
+
+
+# ---------------------------------------------------------
+# Cache (page image hash -> lines)
+# ---------------------------------------------------------
+class OcrCache:
+    """
+    LRU of (page hash, dpi, lang) -> lines. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            lines = self._entries.get(key)
+            if lines is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return lines
+
+    def put(self, key: tuple, lines: list):
+        with self._lock:
+            self._entries[key] = lines
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+            }
+
+
+OCR_CACHE = OcrCache(OCR_CACHE_MAX_PAGES)
+
+
+# ---------------------------------------------------------
+# Document stage
+# ---------------------------------------------------------
+def needs_ocr(page: fitz.Page, native_text: str) -> bool:
+    if len("".join(native_text.split())) >= OCR_MIN_CHARS:
+        return False
+    return bool(page.get_images(full=False))
+
+
+def ocr_pages(doc: fitz.Document, page_numbers: List[int], dpi: int = None, lang: str = None):
+    """
+    OCR the given pages of an open document.
+    Returns (page_number -> lines, stats) where stats has
+    per-page timing (render / OCR ms, words, cache hit).
+    Pages are OCR'd in parallel on the "ocr" pool, rendered
+    only as slots in the in-flight window free up; cached
+    pages are not sent at all.
+    """
+    dpi = dpi or OCR_DPI
+    lang = lang or OCR_LANG
+    started = time.perf_counter()
+
+    results: Dict[int, list] = {}
+    timings: Dict[int, dict] = {}
+    if not page_numbers or not OCR_ENABLED or not ocr_available():
+        # Pages stay as they are (no text)
+        return results, {"pages": [], "seconds": 0.0, "skipped": list(page_numbers)}
+
+    pool = get_executor("ocr")
+    window = OCR_MAX_IN_FLIGHT or 2 * executor_workers("ocr")
+    pending = {}  # future -> (page number, cache key)
+    submitted = 0
+    scale = 72.0 / dpi
+
+    def finish(number, key, run):
+        try:
+            lines, seconds = run()
+        except Exception as e:
+            print(f"[WARN] OCR failed on page {number}: {e}")
+            timings[number].update(ocr_ms=None, error=str(e))
+            return
+        OCR_CACHE.put(key, lines)
+        results[number] = lines
+        timings[number]["ocr_ms"] = round(seconds * 1000, 1)
+
+    def collect(futures):
+        for future in futures:
+            number, key = pending.pop(future)
+            finish(number, key, future.result)
+
+    try:
+        for number in page_numbers:
+            # Back-pressure: don't render the next page until a slot is free
+            while len(pending) >= window:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+            page = doc[number]
+
+            t0 = time.perf_counter()
+            pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+            key = (hashlib.sha256(pix.samples_mv).hexdigest(), dpi, lang)
+            timing = {"page": number, "render_ms": round((time.perf_counter() - t0) * 1000, 1)}
+            timings[number] = timing
+
+            cached = OCR_CACHE.get(key)
+            if cached is not None:
+                results[number] = cached
+                timing.update(cached=True, ocr_ms=0.0)
+                continue
+
+            args = (pix.samples, pix.width, pix.height, pix.stride, scale, (page.rect.x0, page.rect.y0), lang)
+            del pix
+            timing["cached"] = False
+            submitted += 1
+            if pool is None:
+                finish(number, key, lambda: ocr_words(*args))
+            else:
+                pending[pool.submit(ocr_words, *args)] = (number, key)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    finally:
+        # Failed midway: drop pages not started yet
+        for future in pending:
+            future.cancel()
+
+    for number, lines in results.items():
+        timings[number]["words"] = sum(len(line) for line in lines)
+
+    stats = {
+        "pages": [timings[n] for n in sorted(timings)],
+        "seconds": round(time.perf_counter() - started, 3),
+        "skipped": [],
+    }
+    print(
+        f"[INFO] OCR: {len(timings)} pages ({len(timings) - submitted} cached) "
+        f"in {stats['seconds']:.2f}s at {dpi} dpi"
+    )
+    return results, stats
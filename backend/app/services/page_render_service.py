@@ -0,0 +1,267 @@
+# ---------------------------------------------------------
+# File: page_render_service.py
+# Path: backend/app/services/page_render_service.py
+# ---------------------------------------------------------
+# Page images for the viewer (GET /view/{doc_id}/page/...).
+#
+# /view/{doc_id} ships the whole PDF; for large scans the
+# viewer renders pages on demand instead, as images at the
+# zoom it needs (or small thumbnails).
+#
+# Renders are cached in an LRU bounded by bytes, keyed by
+#     (doc_id, page, page version, kind, size, format)
+# where the page version is the document revision at which
+# that page last changed. A redaction bumps the version of
+# the pages it touched only (update_pdf_bytes(..., pages)),
+# so cached renders of every other page stay valid; a change
+# without page information invalidates the whole document.
+#
+# The PDF is opened from its file when it has one (upload or
+# working copy) instead of being loaded into memory; page
+# sizes for the viewer come from the layout index.
+# ---------------------------------------------------------
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Set, Tuple
+
+import fitz  # PyMuPDF
+from fastapi import HTTPException
+
+from ..state.memory import DOCUMENT_STORE, DOC_PDF_BYTES, DOC_REVISION
+from ..state.doc_locks import document_lock
+from .layout_index import get_layout
+
+# Memory for cached renders (bytes)
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Accepted zoom range (1.0 = 72 dpi)
+RENDER_MIN_ZOOM = 0.1
+RENDER_MAX_ZOOM = float(os.environ.get("RENDER_MAX_ZOOM", 4.0))
+
+# Largest image rendered (pixels); bigger requests are scaled down
+RENDER_MAX_PIXELS = int(os.environ.get("RENDER_MAX_PIXELS", 40_000_000))
+
+# Default thumbnail width (pixels)
+THUMBNAIL_WIDTH = int(os.environ.get("THUMBNAIL_WIDTH", 160))
+
+RENDER_FORMATS = {"png": "image/png", "jpeg": "image/jpeg"}
+
+RenderKey = Tuple[str, int, int, str, float, str]
+
+
+class RenderCache:
+    """
+    Byte-bounded LRU of rendered page images plus the page
+    versions of every document. Thread-safe.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[RenderKey, bytes]" = OrderedDict()
+        # doc_id -> keys cached for it (for invalidation)
+        self._doc_keys: Dict[str, Set[RenderKey]] = {}
+        # doc_id -> revision of the last whole-document change
+        self._base: Dict[str, int] = {}
+        # doc_id -> {page: revision of its last change}
+        self._pages: Dict[str, Dict[int, int]] = {}
+        self._lock = threading.Lock()
+
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def page_version(self, doc_id: str, page: int) -> int:
+        with self._lock:
+            base = self._base.get(doc_id, 0)
+            return max(base, self._pages.get(doc_id, {}).get(page, base))
+
+    def get(self, key: RenderKey) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: RenderKey, data: bytes):
+        with self._lock:
+            doc_id, page, version = key[:3]
+            base = self._base.get(doc_id, 0)
+            current = max(base, self._pages.get(doc_id, {}).get(page, base))
+            if version != current or len(data) > self.max_bytes or key in self._entries:
+                return  # page changed while rendering, or too big
+
+            self._entries[key] = data
+            self._doc_keys.setdefault(doc_id, set()).add(key)
+            self.used_bytes += len(data)
+
+            while self.used_bytes > self.max_bytes:
+                old_key, old = self._entries.popitem(last=False)
+                self._forget(old_key, old)
+                self.evictions += 1
+
+    def invalidate(self, doc_id: str, revision: int, pages: Iterable[int] | None = None):
+        """
+        Pages changed at `revision` (None: all of them). Their
+        cached renders are dropped right away.
+        """
+        with self._lock:
+            if pages is None:
+                self._base[doc_id] = revision
+                self._pages.pop(doc_id, None)
+                stale = list(self._doc_keys.get(doc_id, ()))
+            else:
+                changed = set(pages)
+                versions = self._pages.setdefault(doc_id, {})
+                for page in changed:
+                    versions[page] = revision
+                stale = [k for k in self._doc_keys.get(doc_id, ()) if k[1] in changed]
+
+            for key in stale:
+                self._forget(key, self._entries.pop(key))
+
+    def drop(self, doc_id: str):
+        """
+        Forget a document (renders and page versions).
+        """
+        with self._lock:
+            for key in list(self._doc_keys.get(doc_id, ())):
+                self._forget(key, self._entries.pop(key))
+            self._base.pop(doc_id, None)
+            self._pages.pop(doc_id, None)
+
+    def _forget(self, key: RenderKey, data: bytes):
+        self.used_bytes -= len(data)
+        keys = self._doc_keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._doc_keys[key[0]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_bytes": self.max_bytes,
+                "used_bytes": self.used_bytes,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+            }
+
+
+RENDER_CACHE = RenderCache(RENDER_CACHE_MAX_BYTES)
+
+
+def invalidate_renders(doc_id: str, pages: Iterable[int] | None = None):
+    """
+    Called when the working PDF changes; pages (0-based) are
+    the ones that changed, None when unknown.
+    """
+    RENDER_CACHE.invalidate(doc_id, DOC_REVISION.get(doc_id, 0), pages)
+
+
+# ---------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------
+def _open(doc_id: str) -> fitz.Document:
+    """
+    Open the working PDF, from its file when it has one.
+    Opened under the document lock: the xref is read then,
+    and later updates only append to the file or replace it
+    (os.replace), so the open document stays consistent.
+    """
+    if doc_id not in DOC_PDF_BYTES:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    with document_lock(doc_id):
+        attached = DOCUMENT_STORE.attached_file(doc_id, "pdf_bytes")
+        if attached is not None:
+            return fitz.open(attached[0], filetype="pdf")
+        return fitz.open(stream=DOC_PDF_BYTES[doc_id], filetype="pdf")
+
+
+def page_info(doc_id: str) -> dict:
+    """
+    Page count, sizes (points) and page versions, so the
+    viewer can lay out the document and load pages lazily.
+    Sizes come from the layout index (no PDF parsing).
+    """
+    layout = get_layout(doc_id) if doc_id in DOC_PDF_BYTES else None
+    if layout is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    pages = [
+        {
+            "page": number,
+            "width": page.width,
+            "height": page.height,
+            "version": RENDER_CACHE.page_version(doc_id, number),
+        }
+        for number, page in enumerate(layout.pages)
+    ]
+    return {"doc_id": doc_id, "revision": DOC_REVISION.get(doc_id, 0), "pages": pages}
+
+
+def render_variant(zoom: float = 1.0, thumbnail_width: int | None = None) -> Tuple[str, float]:
+    """
+    (kind, size) of the image a request asks for, clamped and
+    rounded: requests that render the same image get the
+    same variant (zoom=1 and zoom=1.0, zoom=9 and zoom=4).
+    """
+    if thumbnail_width is not None:
+        return "thumb", float(max(16, min(thumbnail_width, 1024)))
+    return "page", round(float(min(max(zoom, RENDER_MIN_ZOOM), RENDER_MAX_ZOOM)), 2)
+
+
+def render_page(
+    doc_id: str,
+    page_number: int,
+    zoom: float = 1.0,
+    fmt: str = "png",
+    thumbnail_width: int | None = None,
+) -> Tuple[bytes, str, int]:
+    """
+    Render one page (0-based, like /redact/box) at `zoom`, or
+    as a thumbnail `thumbnail_width` pixels wide. Returns
+    (image bytes, media type, page version). Cached; blocking
+    (PyMuPDF).
+    """
+    if fmt not in RENDER_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+
+    kind, size = render_variant(zoom, thumbnail_width)
+
+    # Version first: a redaction landing meanwhile makes put() skip
+    version = RENDER_CACHE.page_version(doc_id, page_number)
+    key = (doc_id, page_number, version, kind, size, fmt)
+
+    data = RENDER_CACHE.get(key)
+    if data is not None:
+        return data, RENDER_FORMATS[fmt], version
+
+    doc = _open(doc_id)
+    try:
+        if page_number < 0 or page_number >= len(doc):
+            raise HTTPException(status_code=400, detail="Invalid page number")
+        page = doc[page_number]
+
+        scale = size / page.rect.width if kind == "thumb" else size
+        pixels = page.rect.width * page.rect.height * scale * scale
+        if pixels > RENDER_MAX_PIXELS:
+            scale *= (RENDER_MAX_PIXELS / pixels) ** 0.5
+
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+        data = pix.tobytes("jpeg", jpg_quality=85) if fmt == "jpeg" else pix.tobytes("png")
+    finally:
+        doc.close()
+
+    RENDER_CACHE.put(key, data)
+    return data, RENDER_FORMATS[fmt], version
@@ -0,0 +1,192 @@
+# ---------------------------------------------------------
+# File: parallel_redaction.py
+# Path: backend/app/services/parallel_redaction.py
+# ---------------------------------------------------------
+# Page-sharded redaction for large PDFs.
+#
+# Matching already happens on the layout index, so what is
+# left per request is apply_redactions() + serialization.
+# For big documents that work is split into contiguous page
+# shards: shards with redactions run in worker processes,
+# untouched shards are copied from the original, and the
+# pieces are merged back into one PDF.
+#
+# The mode is chosen from the page count (redact_pages).
+# Both modes apply the same rectangles, so hit counts and
+# page content are identical.
+#
+# Merging with insert_pdf only carries pages (plus metadata
+# and outline, restored by hand). Documents with anything
+# else at document level that points into pages (forms,
+# page labels, name trees / embedded files, structure tree,
+# XMP, optional content) or with page annotations such as
+# links that may cross shards are redacted serially instead
+# (structure_loss()).
+#
+# NOTE: this module is imported by worker processes; keep
+# it free of imports that touch in-memory document state.
+# ---------------------------------------------------------
+
+import os
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+
+from ..utils.executors import get_executor, executor_workers
+
+
+# Documents with at least this many pages use sharded mode
+PARALLEL_MIN_PAGES = int(os.environ.get("PARALLEL_REDACTION_MIN_PAGES", 200))
+
+RectTuple = Tuple[float, float, float, float]
+
+
+# ---------------------------------------------------------
+# Serial path
+# ---------------------------------------------------------
+def _apply(doc: fitz.Document, page_rects: Dict[int, List[RectTuple]], offset: int = 0):
+    """
+    Blackout + apply once per touched page. page_rects uses
+    original page numbers; offset maps them into `doc`.
+    """
+    for page_index, rects in page_rects.items():
+        page = doc[page_index - offset]
+        for rect in rects:
+            page.add_redact_annot(fitz.Rect(rect), fill=(0, 0, 0))
+        page.apply_redactions()
+
+
+def redact_pages_serial(pdf_bytes: bytes, page_rects: Dict[int, List[RectTuple]]) -> bytes:
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        _apply(doc, page_rects)
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+# ---------------------------------------------------------
+# Sharded path
+# ---------------------------------------------------------
+# Catalog entries a shard merge would drop or break
+_CATALOG_KEYS = (
+    "AcroForm", "PageLabels", "Names", "Dests", "StructTreeRoot",
+    "Metadata", "OCProperties", "OpenAction",
+)
+
+
+def structure_loss(doc: fitz.Document) -> str | None:
+    """
+    What a shard merge would lose from `doc` (e.g.
+    "AcroForm", "annotations on page 3"), or None when it is
+    safe. Reads the catalog and page dictionaries only.
+    """
+    catalog = doc.pdf_catalog()
+    for key in _CATALOG_KEYS:
+        if doc.xref_get_key(catalog, key)[0] != "null":
+            return key
+
+    for number in range(len(doc)):
+        if doc.xref_get_key(doc.page_xref(number), "Annots")[0] != "null":
+            return f"annotations on page {number}"
+    return None
+
+
+def _redact_shard(pdf_bytes: bytes, start: int, stop: int, page_rects: Dict[int, List[RectTuple]]) -> bytes:
+    """
+    Worker: keep pages [start, stop), redact them, return the
+    shard as a standalone PDF.
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        doc.select(list(range(start, stop)))
+        _apply(doc, page_rects, offset=start)
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def plan_shards(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Split [0, page_count) into at most `workers` contiguous ranges.
+    """
+    workers = max(1, min(workers, page_count))
+    size, extra = divmod(page_count, workers)
+
+    shards = []
+    start = 0
+    for i in range(workers):
+        stop = start + size + (1 if i < extra else 0)
+        shards.append((start, stop))
+        start = stop
+    return shards
+
+
+def redact_pages_sharded(pdf_bytes: bytes, page_rects: Dict[int, List[RectTuple]], workers: int) -> bytes:
+    original = fitz.open(stream=pdf_bytes, filetype="pdf")
+    pool = get_executor("shard")
+
+    try:
+        loss = structure_loss(original)
+        if loss is not None:
+            print(f"[INFO] Sharded redaction would drop {loss}; redacting serially")
+            _apply(original, page_rects)
+            return original.tobytes()
+
+        shards = plan_shards(len(original), workers)
+
+        # Submit only shards that contain redactions
+        futures = {}
+        for start, stop in shards:
+            shard_rects = {p: r for p, r in page_rects.items() if start <= p < stop}
+            if not shard_rects:
+                continue
+            if pool is None:
+                futures[start] = _redact_shard(pdf_bytes, start, stop, shard_rects)
+            else:
+                futures[start] = pool.submit(_redact_shard, pdf_bytes, start, stop, shard_rects)
+
+        # Merge in page order
+        merged = fitz.open()
+        for start, stop in shards:
+            result = futures.get(start)
+            if result is None:
+                merged.insert_pdf(original, from_page=start, to_page=stop - 1)
+                continue
+
+            shard_bytes = result if isinstance(result, bytes) else result.result()
+            shard = fitz.open(stream=shard_bytes, filetype="pdf")
+            merged.insert_pdf(shard)
+            shard.close()
+
+        # Document-level data insert_pdf doesn't carry over
+        merged.set_metadata(original.metadata or {})
+        toc = original.get_toc(simple=False)
+        if toc:
+            merged.set_toc(toc)
+
+        # Shards each carry their own copy of shared resources
+        # (fonts, images); garbage=4 merges the duplicates back
+        data = merged.tobytes(garbage=4, deflate=True)
+        merged.close()
+        return data
+    finally:
+        original.close()
+
+
+# ---------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------
+def redact_pages(pdf_bytes: bytes, page_rects: Dict[int, List[fitz.Rect]], page_count: int) -> bytes:
+    """
+    Apply blackout rectangles (page_index -> rects) and return
+    the new PDF bytes. Large documents with redactions on more
+    than one page are processed in page shards.
+    """
+    plain = {p: [tuple(fitz.Rect(r)) for r in rects] for p, rects in page_rects.items()}
+
+    workers = executor_workers("shard")
+    if page_count >= PARALLEL_MIN_PAGES and len(plain) > 1 and workers > 1:
+        return redact_pages_sharded(pdf_bytes, plain, workers)
+
+    return redact_pages_serial(pdf_bytes, plain)
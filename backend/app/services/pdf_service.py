@@ -1,16 +1,28 @@
+import functools
 import uuid
 import fitz
 from fastapi import UploadFile, HTTPException
-from ..state.memory import DOC_PDF_BYTES, DOC_ORIGINAL_NAME
+from ..state.memory import DOCUMENT_STORE, DOC_PDF_BYTES, DOC_ORIGINAL_NAME, DOC_REVISION, DOC_PDF_WRITES
+from ..state.doc_locks import document_lock
 from ..utils.rag_utils import ingest_document
+from ..utils.uploads import spool_upload, upload_path
+from ..utils.executors import run_blocking
+from .suggestion_cache import invalidate_suggestions
+from .page_render_service import invalidate_renders
 
 
 def generate_doc_id() -> str:
     return str(uuid.uuid4())
 
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+def extract_text_from_pdf(source) -> str:
+    """
+    source: PDF bytes or the path of a PDF file.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        doc = fitz.open(stream=source, filetype="pdf")
+    else:
+        doc = fitz.open(source, filetype="pdf")
     text = "\n".join(page.get_text() for page in doc)
     doc.close()
     return text
@@ -22,17 +34,19 @@ async def load_pdf_into_memory(file: UploadFile):
     if not filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
-    pdf_bytes = await file.read()
-    if not pdf_bytes:
-        raise HTTPException(status_code=400, detail="Empty file")
+    upload = await spool_upload(file)
 
     doc_id = generate_doc_id()
+    source = upload.keep_as(upload_path(doc_id))
 
-    DOC_PDF_BYTES[doc_id] = pdf_bytes
+    if upload.on_disk:
+        DOCUMENT_STORE.attach_file(doc_id, "pdf_bytes", source)
+    else:
+        DOC_PDF_BYTES[doc_id] = source
     DOC_ORIGINAL_NAME[doc_id] = filename
 
     try:
-        text = extract_text_from_pdf(pdf_bytes)
+        text = await run_blocking("pdf", extract_text_from_pdf, source)
         ingest_document(doc_id, text)
     except Exception as e:
         print(f"[WARN] RAG ingestion failed for {doc_id}: {e}")
@@ -46,5 +60,104 @@ def get_pdf_bytes(doc_id: str) -> bytes:
     return DOC_PDF_BYTES[doc_id]
 
 
-def update_pdf_bytes(doc_id: str, new_bytes: bytes):
-    DOC_PDF_BYTES[doc_id] = new_bytes
\ No newline at end of file
+def get_pdf_source(doc_id: str):
+    """
+    The current working PDF without loading it: (path, size)
+    when it is a file on disk (upload or working copy; the
+    PDF is its first `size` bytes), else the bytes.
+    """
+    attached = DOCUMENT_STORE.attached_file(doc_id, "pdf_bytes")
+    if attached is not None:
+        return attached
+    return get_pdf_bytes(doc_id)
+
+
+def pdf_etag(doc_id: str) -> str:
+    """
+    Strong ETag of the current working PDF bytes: changes with
+    every revision and every rewrite of the same revision.
+    """
+    return f'"{doc_id}-{DOC_REVISION.get(doc_id, 0)}.{DOC_PDF_WRITES.get(doc_id, 0)}"'
+
+
+# ---------------------------------------------------------
+# Versioning + write serialization
+# ---------------------------------------------------------
+# The document version is its revision (DOC_REVISION).
+# Clients send the version they last saw as If-Match, either
+# the number or the ETag of /view (whose revision part is
+# compared; the write counter also changes on compaction,
+# which keeps the content). "*" matches any version.
+# ---------------------------------------------------------
+def _if_match_versions(if_match: str):
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag == "*":
+            return None
+        tag = tag.rsplit("-", 1)[-1].split(".", 1)[0]
+        if not tag.isdigit():
+            raise HTTPException(status_code=400, detail=f"Invalid If-Match value: {if_match}")
+        versions.append(int(tag))
+    return versions
+
+
+def check_version(doc_id: str, if_match: str | None):
+    """
+    412 when If-Match names another version than the current
+    one. Call with the document lock held.
+    """
+    if not if_match:
+        return
+    versions = _if_match_versions(if_match)
+    current = DOC_REVISION.get(doc_id, 0)
+    if versions is not None and current not in versions:
+        raise HTTPException(
+            status_code=412,
+            detail=f"Document was modified (current version {current})",
+            headers={"ETag": pdf_etag(doc_id)},
+        )
+
+
+def document_mutation(fn):
+    """
+    Decorator for services that change a document (first
+    argument: doc_id). Runs them under the document's lock,
+    checks the optional if_match= keyword first, and adds the
+    resulting "version" to dict results.
+    """
+    @functools.wraps(fn)
+    def wrapper(doc_id: str, *args, if_match: str | None = None, **kwargs):
+        with document_lock(doc_id):
+            check_version(doc_id, if_match)
+            result = fn(doc_id, *args, **kwargs)
+            if isinstance(result, dict):
+                result["version"] = DOC_REVISION.get(doc_id, 0)
+            return result
+    return wrapper
+
+
+def update_pdf_bytes(doc_id: str, new_bytes: bytes, pages=None):
+    """
+    Commit a new working PDF. pages: 0-based indexes of the
+    pages that changed (None: unknown / all), so only their
+    cached renders are dropped.
+    """
+    DOC_PDF_BYTES[doc_id] = new_bytes
+    DOC_REVISION[doc_id] = DOC_REVISION.get(doc_id, 0) + 1
+    DOC_PDF_WRITES[doc_id] = DOC_PDF_WRITES.get(doc_id, 0) + 1
+    invalidate_suggestions(doc_id)
+    invalidate_renders(doc_id, pages)
+
+
+def update_pdf_file(doc_id: str, path, pages=None):
+    """
+    Same as update_pdf_bytes() when the new PDF is a file on
+    disk (incremental working copy): it is read lazily on the
+    next access instead of being copied into memory now.
+    """
+    DOCUMENT_STORE.attach_file(doc_id, "pdf_bytes", path)
+    DOC_REVISION[doc_id] = DOC_REVISION.get(doc_id, 0) + 1
+    DOC_PDF_WRITES[doc_id] = DOC_PDF_WRITES.get(doc_id, 0) + 1
+    invalidate_suggestions(doc_id)
+    invalidate_renders(doc_id, pages)
@@ -3,24 +3,32 @@ import re
 # -----------------------------------------
 # PII PATTERNS (Regex)
 # -----------------------------------------
+# Listed in priority order: when two patterns match at the
+# same position, the first one that also passes validation
+# wins.
 PII_PATTERNS = {
     # Email
     "EMAIL": r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
 
-    # Phone numbers (international-ish)
-    "PHONE": r"\+?\d[\d\-\s]{7,}\d",
-
-    # Credit card numbers (13–16 digits)
-    "CREDIT_CARD": r"\b(?:\d[ -]*?){13,16}\b",
-
     # US SSN
     "SSN": r"\b\d{3}-\d{2}-\d{4}\b",
 
+    # Credit card numbers (13–16 digits, optional space/dash groups)
+    # No nested lazy quantifier: each repetition consumes a digit.
+    "CREDIT_CARD": r"\b\d(?:[ -]?\d){12,15}\b",
+
+    # Canadian Health Card (OHIP)
+    "HEALTH_CARD": r"\b\d{4}\s?\d{3}\s?\d{3}\b",
+
+    # Phone numbers (international-ish): 10–15 digits with
+    # single space/dash separators, never across a line break
+    "PHONE": r"\+?\d(?:[ \-]?\d){9,14}(?!\d)",
+
     # Dates (01/02/2024, 1-2-24, etc.)
     "DATE": r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b",
 
     # Addresses (simple heuristic)
-    "ADDRESS": r"\b\d+\s+[A-Za-z0-9'\.\-]+\s+(Street|St|Road|Rd|Avenue|Ave|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b",
+    "ADDRESS": r"\b\d+\s+[A-Za-z0-9'\.\-]+\s+(?:Street|St|Road|Rd|Avenue|Ave|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b",
 
     # Driver license / ID
     "LICENSE": r"\b(?:DL|Driver.?s License|License No\.?)[:\s]*[A-Za-z0-9\-]{5,}\b",
@@ -28,29 +36,136 @@ PII_PATTERNS = {
     # Passport numbers
     "PASSPORT": r"\b[A-Z]{1,2}\d{6,9}\b",
 
-    # Canadian Health Card (OHIP)
-    "HEALTH_CARD": r"\b\d{4}\s?\d{3}\s?\d{3}\b",
-
     # Canadian Postal Code
     "POSTAL_CODE": r"\b[A-Za-z]\d[A-Za-z]\s?\d[A-Za-z]\d\b",
 }
 
+# Compiled once at import
+PII_LABELS = list(PII_PATTERNS)
+PII_REGEXES = {label: re.compile(pattern) for label, pattern in PII_PATTERNS.items()}
+
+# Characters that can continue a token; PII never starts in the
+# middle of one, so the scanner only tries at token starts
+_TOKEN_CHARS = r"A-Za-z0-9._%+\-"
+
+# One alternation over all patterns: a single left-to-right scan
+# finds the next candidate of any label.
+PII_SCANNER = re.compile(
+    rf"(?<![{_TOKEN_CHARS}])(?:"
+    + "|".join(f"(?P<{label}>{pattern})" for label, pattern in PII_PATTERNS.items())
+    + ")"
+)
+
+
+# -----------------------------------------
+# Validators (prune false positives)
+# -----------------------------------------
+def _digits(value: str) -> str:
+    return "".join(ch for ch in value if ch.isdigit())
+
+
+def luhn_valid(digits: str) -> bool:
+    """
+    Luhn mod-10 check (credit cards, OHIP health numbers).
+    """
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = int(ch)
+        if i % 2 == 1:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def _valid_credit_card(value: str) -> bool:
+    digits = _digits(value)
+    return 13 <= len(digits) <= 16 and luhn_valid(digits)
+
+
+def _valid_health_card(value: str) -> bool:
+    # OHIP: 10 digits, last one is a Luhn check digit
+    digits = _digits(value)
+    return len(digits) == 10 and luhn_valid(digits)
+
+
+def _valid_ssn(value: str) -> bool:
+    area, group, serial = value.split("-")
+    return (
+        area not in ("000", "666")
+        and not area.startswith("9")
+        and group != "00"
+        and serial != "0000"
+    )
+
+
+def _valid_phone(value: str) -> bool:
+    # E.164 allows up to 15 digits; fewer than 10 is usually
+    # a lot/batch number or a measurement on a CoA
+    return 10 <= len(_digits(value)) <= 15
+
+
+def _valid_date(value: str) -> bool:
+    first, second, _ = re.split(r"[/-]", value)
+    a, b = int(first), int(second)
+    return (1 <= a <= 12 and 1 <= b <= 31) or (1 <= a <= 31 and 1 <= b <= 12)
+
+
+PII_VALIDATORS = {
+    "SSN": _valid_ssn,
+    "CREDIT_CARD": _valid_credit_card,
+    "HEALTH_CARD": _valid_health_card,
+    "PHONE": _valid_phone,
+    "DATE": _valid_date,
+}
+
+
+def _accept(label: str, value: str) -> bool:
+    validator = PII_VALIDATORS.get(label)
+    return validator is None or validator(value)
+
+
 # -----------------------------------------
 # Detect PII in text
 # -----------------------------------------
 def detect_pii(text: str):
+    """
+    Single pass over the text with the combined scanner.
+    A candidate that fails validation falls back to the
+    lower-priority patterns at the same position; if none
+    passes, the scan resumes after the rejected candidate
+    (keeps long digit runs linear instead of quadratic).
+    """
     suggestions = []
+    pos = 0
+
+    while True:
+        match = PII_SCANNER.search(text, pos)
+        if match is None:
+            break
+
+        start = match.start()
+        label = match.lastgroup
+        found = match if _accept(label, match.group()) else None
+
+        if found is None:
+            for other in PII_LABELS[PII_LABELS.index(label) + 1:]:
+                candidate = PII_REGEXES[other].match(text, start)
+                if candidate and candidate.end() > start and _accept(other, candidate.group()):
+                    found, label = candidate, other
+                    break
+
+        if found is None:
+            pos = max(match.end(), start + 1)
+            continue
+
+        suggestions.append({
+            "text": found.group(),
+            "start": found.start(),
+            "end": found.end(),
+            "label": label
+        })
+        pos = max(found.end(), start + 1)
 
-    for label, pattern in PII_PATTERNS.items():
-        try:
-            for match in re.finditer(pattern, text):
-                suggestions.append({
-                    "text": match.group(),
-                    "start": match.start(),
-                    "end": match.end(),
-                    "label": label
-                })
-        except Exception as e:
-            print(f"[WARN] Regex failed for {label}: {e}")
-
-    return suggestions
\ No newline at end of file
+    return suggestions
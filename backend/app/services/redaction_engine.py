@@ -0,0 +1,164 @@
+# ---------------------------------------------------------
+# File: redaction_engine.py
+# Path: backend/app/services/redaction_engine.py
+# ---------------------------------------------------------
+# Single-pass multi-term matching + redaction engine.
+#
+# Instead of calling page.search_for() once per term per
+# page, all terms are matched together with an Aho-Corasick
+# automaton over the page layout index (layout_index.py).
+# The resulting page rectangles are applied by
+# incremental_pdf.apply_page_redactions(), once per page.
+#
+# Matching follows page.search_for() semantics:
+# - case-insensitive
+# - any run of whitespace / line breaks matches one space
+# ---------------------------------------------------------
+
+from collections import deque
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+
+from .layout_index import DocumentLayout
+
+
+# ---------------------------------------------------------
+# Text normalization (shared by terms and page text)
+# ---------------------------------------------------------
+def normalize_term(term: str) -> str:
+    """
+    Casefold and collapse whitespace so terms compare the
+    same way page text does.
+    """
+    return " ".join(term.split()).casefold()
+
+
+# ---------------------------------------------------------
+# Multi-pattern automaton (Aho-Corasick)
+# ---------------------------------------------------------
+class TermMatcher:
+    """
+    Aho-Corasick automaton over normalized terms.
+    find_all(text) reports every (start, end, term_index) in
+    a single left-to-right scan of the text.
+    """
+
+    def __init__(self, terms: List[str]):
+        self.terms = terms
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._lengths: List[int] = []
+
+        for index, term in enumerate(terms):
+            self._add(normalize_term(term), index)
+
+        self._build_failure_links()
+
+    def _add(self, term: str, index: int):
+        self._lengths.append(len(term))
+        if not term:
+            return
+
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+
+        self._out[state].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str):
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        state = 0
+
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for index in out[state]:
+                yield pos + 1 - lengths[index], pos + 1, index
+
+
+# ---------------------------------------------------------
+# Matching + redaction
+# ---------------------------------------------------------
+def find_term_rects(layout: DocumentLayout, terms: List[str]) -> Tuple[Dict[int, List[fitz.Rect]], List[int]]:
+    """
+    Match all terms on all pages in one pass per page,
+    using the layout index instead of re-reading the PDF.
+
+    Returns:
+    - page_index -> list of rectangles to black out
+    - hits per term (same order as terms)
+    """
+    matcher = TermMatcher(terms)
+    hits = [0] * len(terms)
+    page_rects: Dict[int, List[fitz.Rect]] = {}
+
+    for page in layout.pages:
+        for start, end, term_index in matcher.find_all(page.search_text):
+            rects = page.rects_for_offsets(*page.search_span_to_offsets(start, end))
+            if not rects:
+                continue
+            page_rects.setdefault(page.number, []).extend(rects)
+            hits[term_index] += 1
+
+    return page_rects, hits
+
+
+def find_rects_per_term(
+    layout: DocumentLayout, terms: List[str]
+) -> Tuple[List[Dict[int, List[fitz.Rect]]], List[int], List[Tuple[int, int]]]:
+    """
+    Same single pass as find_term_rects(), with the
+    rectangles kept apart per term (page_index -> rects for
+    each term, same order as terms), hits per term and the
+    (start, end) document text offsets of every hit.
+    """
+    matcher = TermMatcher(terms)
+    hits = [0] * len(terms)
+    per_term: List[Dict[int, List[fitz.Rect]]] = [{} for _ in terms]
+    spans: List[Tuple[int, int]] = []
+
+    for page in layout.pages:
+        for start, end, term_index in matcher.find_all(page.search_text):
+            local_start, local_end = page.search_span_to_offsets(start, end)
+            rects = page.rects_for_offsets(local_start, local_end)
+            if not rects:
+                continue
+            per_term[term_index].setdefault(page.number, []).extend(rects)
+            hits[term_index] += 1
+            spans.append((page.text_start + local_start, page.text_start + local_end))
+
+    return per_term, hits, spans
+
+
+def unique_terms(terms: List[str]) -> List[str]:
+    """
+    Drop empty terms and duplicates (after normalization).
+    """
+    return list({normalize_term(t): t for t in terms if normalize_term(t)}.values())
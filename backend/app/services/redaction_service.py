@@ -3,15 +3,20 @@
 # Safe layout-preserving text redaction
 # ---------------------------------------------------------
 
-import fitz  # PyMuPDF
-from ..state.memory import DOC_TEXT, DOC_OPTIONS, DOC_VERSIONS
-from ..services.pdf_service import get_pdf_bytes, update_pdf_bytes
-from ..storage.storage import save_version, log_action
+from fastapi import HTTPException
 
+from ..state.memory import DOC_TEXT, DOC_PDF_BYTES, DOC_OPTIONS, DOC_VERSIONS
+from ..services.pdf_service import document_mutation
+from ..services.layout_index import get_layout, advance_layout
+from ..services.incremental_pdf import apply_page_redactions, save_snapshot
+from ..storage.storage import log_action
 
+
+@document_mutation
 def apply_text_redaction(doc_id: str, start: int, end: int):
     """
-    Redact text by blacking out the matching text on the PDF.
+    Redact DOC_TEXT[start:end] by blacking out exactly that span
+    on the PDF (not other occurrences of the same string).
     This version preserves layout, background, fonts, and structure.
     """
 
@@ -26,38 +31,37 @@ def apply_text_redaction(doc_id: str, start: int, end: int):
     if start < 0 or end > len(text) or start >= end:
         raise ValueError("Invalid redaction span")
 
-    # Extract the exact substring to search for in the PDF
-    target_text = text[start:end]
-
-    # ---------------------------------------------------------
-    # 2. Update in-memory text (replace with █)
-    # ---------------------------------------------------------
-    redacted_segment = "█" * (end - start)
-    new_text = text[:start] + redacted_segment + text[end:]
-    DOC_TEXT[doc_id] = new_text
-
     # ---------------------------------------------------------
-    # 3. Apply blackout redaction directly on the PDF
+    # 2. Resolve the span to page boxes (layout index)
     # ---------------------------------------------------------
-    original_pdf_bytes = get_pdf_bytes(doc_id)
-    doc = fitz.open(stream=original_pdf_bytes, filetype="pdf")
+    if doc_id not in DOC_PDF_BYTES:
+        raise HTTPException(status_code=404, detail="Document not found")
+    layout = get_layout(doc_id)
 
-    total_hits = 0
+    page_rects = layout.span_rects(start, end)
+    total_hits = sum(len(rects) for rects in page_rects.values())
 
-    for page in doc:
-        matches = page.search_for(target_text)
-        for inst in matches:
-            page.add_redact_annot(inst, fill=(0, 0, 0))
-            total_hits += 1
-
-        if matches:
-            page.apply_redactions()
+    # Nothing on the page (e.g. only whitespace): no change
+    if not page_rects:
+        return {
+            "doc_id": doc_id,
+            "start": start,
+            "end": end,
+            "hits": 0,
+            "version_path": None,
+            "status": "no_match"
+        }
 
-    new_pdf_bytes = doc.tobytes()
-    doc.close()
+    # ---------------------------------------------------------
+    # 3. Apply blackout redaction directly on the PDF, then
+    #    update the in-memory text (replace with █)
+    # ---------------------------------------------------------
+    # Update the PDF (incremental) + advance the layout index
+    apply_page_redactions(doc_id, page_rects, len(layout.pages))
+    advance_layout(doc_id, layout, page_rects)
 
-    # Update in-memory PDF
-    update_pdf_bytes(doc_id, new_pdf_bytes)
+    redacted_segment = "█" * (end - start)
+    DOC_TEXT[doc_id] = text[:start] + redacted_segment + text[end:]
 
     # ---------------------------------------------------------
     # 4. Optional: save version to disk
@@ -66,7 +70,9 @@ def apply_text_redaction(doc_id: str, start: int, end: int):
     version_path = None
 
     if options.get("save_versions", True):
-        version_path = save_version(doc_id, new_pdf_bytes)
+        # Store only the bytes appended since the last snapshot;
+        # the version store compacts it when it is read back
+        version_path = save_snapshot(doc_id)
         DOC_VERSIONS.setdefault(doc_id, []).append(version_path)
 
     # ---------------------------------------------------------
@@ -1,9 +1,26 @@
+import hashlib
+import os
+import time
+
 import spacy
-from ..state.memory import DOC_TEXT
-from .pii_service import detect_pii
+from ..state.memory import DOC_TEXT, DOC_LAYOUT
+from .pii_service import detect_pii, PII_PATTERNS
+from .suggestion_cache import SUGGESTION_CACHE, suggestion_key
 
 MODEL_PATH = "backend/app/redaction_model/model-best"
 
+# -----------------------------------------
+# Chunked inference settings
+# -----------------------------------------
+# Characters per chunk (well below spaCy's max_length)
+NER_CHUNK_CHARS = int(os.environ.get("NER_CHUNK_CHARS", 20000))
+# Context added on each side of a chunk so entities that cross
+# a chunk boundary are still seen whole
+NER_CHUNK_OVERLAP = int(os.environ.get("NER_CHUNK_OVERLAP", 300))
+# nlp.pipe() batching / worker processes
+NER_BATCH_SIZE = int(os.environ.get("NER_BATCH_SIZE", 8))
+NER_N_PROCESS = int(os.environ.get("NER_N_PROCESS", 1))
+
 try:
     nlp = spacy.load(MODEL_PATH)
     print(f"[INFO] Loaded redaction model from {MODEL_PATH}")
@@ -12,6 +29,124 @@ except Exception as e:
     nlp = None
 
 
+def _model_id() -> str:
+    """
+    Identity of the loaded model + PII rules, part of the
+    suggestion cache key.
+    """
+    meta = getattr(nlp, "meta", {}) or {}
+    rules = hashlib.sha256(repr(sorted(PII_PATTERNS.items())).encode("utf-8")).hexdigest()[:12]
+    return f"{MODEL_PATH}:{meta.get('name')}:{meta.get('version')}:{rules}"
+
+
+MODEL_ID = _model_id()
+
+
+# -----------------------------------------
+# Chunking
+# -----------------------------------------
+def _best_break(text: str, start: int, limit: int, page_starts) -> int:
+    """
+    Pick where a chunk that starts at `start` should end (<= limit):
+    last page boundary, else paragraph, else line, else space.
+    """
+    pages = [p for p in page_starts if start < p <= limit]
+    if pages:
+        return pages[-1]
+
+    for sep in ("\n\n", "\n", " "):
+        cut = text.rfind(sep, start + 1, limit)
+        if cut != -1:
+            return cut + len(sep)
+
+    return limit
+
+
+def chunk_text(text: str, max_chars: int, overlap: int, page_starts=()):
+    """
+    Split text into chunks for NER.
+
+    Returns (window_start, window_text, own_start, own_end):
+    - [own_start, own_end) partitions the text (no gaps/overlap)
+    - the window adds `overlap` characters of context each side
+    """
+    chunks = []
+    start = 0
+    n = len(text)
+
+    while start < n:
+        end = n if n - start <= max_chars else _best_break(text, start, start + max_chars, page_starts)
+
+        window_start = max(0, start - overlap)
+        window_end = min(n, end + overlap)
+
+        # Don't start/stop the context window in the middle of a word
+        if window_start > 0:
+            space = text.find(" ", window_start, start)
+            window_start = space + 1 if space != -1 else start
+        if window_end < n:
+            space = text.rfind(" ", end, window_end)
+            window_end = space if space != -1 else end
+
+        chunks.append((window_start, text[window_start:window_end], start, end))
+        start = end
+
+    return chunks
+
+
+def run_ner(text: str, page_starts=()):
+    """
+    Run the spaCy model over long text in chunks with nlp.pipe().
+    Entity offsets are mapped back to global offsets; entities in
+    the overlap are kept only by the chunk that owns their start.
+
+    Returns (entities, metrics).
+    """
+    chunks = chunk_text(text, NER_CHUNK_CHARS, NER_CHUNK_OVERLAP, page_starts)
+
+    t0 = time.perf_counter()
+    tokens = 0
+    seen = set()
+    entities = []
+
+    docs = nlp.pipe(
+        ((window_text, (window_start, own_start, own_end))
+         for window_start, window_text, own_start, own_end in chunks),
+        as_tuples=True,
+        batch_size=NER_BATCH_SIZE,
+        n_process=NER_N_PROCESS,
+    )
+
+    for doc, (window_start, own_start, own_end) in docs:
+        tokens += len(doc)
+        for ent in doc.ents:
+            start = window_start + ent.start_char
+            end = window_start + ent.end_char
+            if not (own_start <= start < own_end):
+                continue
+
+            key = (start, end, ent.label_)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            entities.append({
+                "text": ent.text,
+                "start": start,
+                "end": end,
+                "label": ent.label_ or "SENSITIVE"
+            })
+
+    elapsed = time.perf_counter() - t0
+    metrics = {
+        "chunks": len(chunks),
+        "tokens": tokens,
+        "seconds": round(elapsed, 4),
+        "tokens_per_sec": round(tokens / elapsed, 1) if elapsed > 0 else None,
+    }
+    return entities, metrics
+
+
 def suggest_redactions(doc_id: str):
     """
     Returns ML + PII hybrid suggestions in unified span format:
@@ -30,20 +165,36 @@ def suggest_redactions(doc_id: str):
     if not text:
         return {"error": "Document text not found"}
 
+    cache_key = suggestion_key(text, MODEL_ID)
+    cached = SUGGESTION_CACHE.get(doc_id, cache_key)
+    if cached is not None:
+        suggestions, metrics = cached
+        return {
+            "doc_id": doc_id,
+            "suggestions": [dict(s) for s in suggestions],
+            "total": len(suggestions),
+            "metrics": metrics,
+            "cached": True
+        }
+
     suggestions = []
+    metrics = None
 
     # -----------------------------------------
-    # 1. ML MODEL (spaCy NER)
+    # 1. ML MODEL (spaCy NER, chunked)
     # -----------------------------------------
     try:
-        doc = nlp(text)
-        for ent in doc.ents:
-            suggestions.append({
-                "text": ent.text,
-                "start": ent.start_char,
-                "end": ent.end_char,
-                "label": ent.label_ or "SENSITIVE"
-            })
+        # Prefer page boundaries from the layout index as chunk breaks
+        layout = DOC_LAYOUT.get(doc_id)
+        page_starts = [p.text_start for p in layout.pages[1:]] if layout is not None else []
+
+        entities, metrics = run_ner(text, page_starts)
+        suggestions.extend(entities)
+
+        print(
+            f"[INFO] NER {doc_id}: {metrics['tokens']} tokens in {metrics['chunks']} chunks, "
+            f"{metrics['tokens_per_sec']} tokens/sec"
+        )
     except Exception as e:
         print(f"[WARN] ML model failed: {e}")
 
@@ -71,8 +222,14 @@ def suggest_redactions(doc_id: str):
     # -----------------------------------------
     suggestions.sort(key=lambda x: x["start"])
 
+    # Don't cache a result the model failed to contribute to
+    if metrics is not None:
+        SUGGESTION_CACHE.put(doc_id, cache_key, [dict(s) for s in suggestions], metrics)
+
     return {
         "doc_id": doc_id,
         "suggestions": suggestions,
-        "total": len(suggestions)
+        "total": len(suggestions),
+        "metrics": metrics,
+        "cached": False
     }
\ No newline at end of file
@@ -0,0 +1,118 @@
+# ---------------------------------------------------------
+# File: suggestion_cache.py
+# Path: backend/app/services/suggestion_cache.py
+# ---------------------------------------------------------
+# Cache for redaction suggestions (/redact/suggest and
+# /redact/auto).
+#
+# Entries are keyed by a hash of the document text plus the
+# identity of the loaded model, so:
+# - the same text is only run through NER + PII once
+# - a text redaction (which rewrites DOC_TEXT) or a model
+#   change produces a new key
+# - any other redaction drops the document's entry
+#   (update_pdf_bytes -> invalidate_suggestions), unless
+#   other documents with the same text (duplicate uploads)
+#   still use it
+#
+# The cache is an LRU bounded by entry count.
+# ---------------------------------------------------------
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+# Max cached suggestion sets
+SUGGESTION_CACHE_MAX_ENTRIES = int(os.environ.get("SUGGESTION_CACHE_MAX_ENTRIES", 256))
+
+
+def suggestion_key(text: str, model_id: str) -> Tuple[str, str]:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest(), model_id
+
+
+class SuggestionCache:
+    """
+    LRU of key -> (suggestions, metrics). Thread-safe.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        # doc_id -> key of its last lookup (for invalidation)
+        self._doc_keys: Dict[str, Tuple[str, str]] = {}
+        # key -> number of documents whose last lookup it was
+        self._key_docs: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _track(self, doc_id: str, key: Tuple[str, str]):
+        old = self._doc_keys.get(doc_id)
+        if old == key:
+            return
+        if old is not None:
+            self._release(old)
+        self._doc_keys[doc_id] = key
+        self._key_docs[key] = self._key_docs.get(key, 0) + 1
+
+    def _release(self, key: Tuple[str, str]) -> int:
+        remaining = self._key_docs.get(key, 1) - 1
+        if remaining > 0:
+            self._key_docs[key] = remaining
+        else:
+            self._key_docs.pop(key, None)
+        return remaining
+
+    def get(self, doc_id: str, key: Tuple[str, str]):
+        with self._lock:
+            self._track(doc_id, key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, doc_id: str, key: Tuple[str, str], suggestions: list, metrics: dict | None):
+        with self._lock:
+            self._track(doc_id, key)
+            self._entries[key] = (suggestions, metrics)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, doc_id: str):
+        with self._lock:
+            key = self._doc_keys.pop(doc_id, None)
+            if key is not None and self._release(key) == 0:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+            }
+
+
+SUGGESTION_CACHE = SuggestionCache(SUGGESTION_CACHE_MAX_ENTRIES)
+
+
+def invalidate_suggestions(doc_id: str):
+    """
+    Drop cached suggestions for a document (called when its
+    working PDF changes).
+    """
+    SUGGESTION_CACHE.invalidate(doc_id)
@@ -1,19 +1,29 @@
 from ..state.memory import DOC_TAGS
+from ..storage.storage import save_tags, delete_tag, load_tags
+
+
+def _tags(doc_id: str):
+    # Tags persist in the catalog; load them after a restart
+    if doc_id not in DOC_TAGS:
+        DOC_TAGS[doc_id] = load_tags(doc_id)
+    return DOC_TAGS[doc_id]
 
 
 def get_tags(doc_id: str):
-    return DOC_TAGS.get(doc_id, [])
+    return _tags(doc_id)
 
 
 def add_tag(doc_id: str, tag: str):
-    if doc_id not in DOC_TAGS:
-        DOC_TAGS[doc_id] = []
-    if tag not in DOC_TAGS[doc_id]:
-        DOC_TAGS[doc_id].append(tag)
-    return DOC_TAGS[doc_id]
+    tags = _tags(doc_id)
+    if tag not in tags:
+        save_tags(doc_id, [tag])
+        tags.append(tag)
+    return tags
 
 
 def remove_tag(doc_id: str, tag: str):
-    if doc_id in DOC_TAGS and tag in DOC_TAGS[doc_id]:
-        DOC_TAGS[doc_id].remove(tag)
-    return DOC_TAGS.get(doc_id, [])
\ No newline at end of file
+    tags = _tags(doc_id)
+    if tag in tags:
+        delete_tag(doc_id, tag)
+        tags.remove(tag)
+    return tags
\ No newline at end of file
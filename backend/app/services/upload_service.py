@@ -0,0 +1,197 @@
+# ---------------------------------------------------------
+# File: upload_service.py
+# Path: backend/app/services/upload_service.py
+# ---------------------------------------------------------
+# Registering an uploaded PDF as a document: text + layout
+# extraction and in-memory state. Shared by POST /upload,
+# the background "extract_text" job and bulk batches.
+#
+# The PDF is either bytes or the uploaded file on disk
+# (utils/uploads.py); a file is parsed from disk and becomes
+# the document's working PDF without being read into memory.
+#
+# Uploads of a file seen before (same SHA-256) skip the
+# extraction and share the earlier result (content_index.py).
+#
+# release_document() is the other end of the lifecycle: it
+# frees everything a document holds in memory and on disk
+# (POST /documents/{doc_id}/close, archiving).
+#
+# Images (PNG/JPEG/TIFF) are converted to a PDF with one
+# page per frame first; building the layout index OCRs those
+# pages (ocr_service.py), so the result is a normal document
+# with text and word boxes.
+# ---------------------------------------------------------
+
+import hashlib
+from pathlib import Path
+
+from ..storage.storage import save_original_pdf, log_action
+from ..state.memory import DOCUMENT_STORE, DOC_PDF_BYTES, DOC_ORIGINAL_NAME, DOC_WORKING_COPY
+from ..state.doc_locks import document_lock
+from ..utils.pdf_utils import image_to_pdf, is_image_file
+from ..utils.uploads import upload_path
+from .layout_index import build_layout, set_layout
+from .content_index import CONTENT_INDEX, UPLOAD_DEDUP
+from ..state.memory_helpers import (
+    set_original_name,
+    set_text,
+    set_pdf_bytes,
+    set_pdf_file,
+    set_options,
+    drop_document
+)
+from .suggestion_cache import invalidate_suggestions
+from .page_render_service import RENDER_CACHE
+
+
+def ingest_pdf(
+    doc_id: str,
+    filename: str,
+    source,
+    save_original: bool = False,
+    save_audit: bool = False,
+    sha256: str | None = None,
+) -> dict:
+    """
+    Extract text + layout index in a single pass and store
+    the document under doc_id. source is the PDF bytes or
+    the path of the uploaded file. Blocking (PyMuPDF).
+    """
+    if sha256 is None and isinstance(source, (bytes, bytearray)):
+        sha256 = hashlib.sha256(source).hexdigest()
+
+    entry = CONTENT_INDEX.get(sha256) if UPLOAD_DEDUP and sha256 else None
+    if entry is not None:
+        # Identical file: drop this copy, share the first one
+        if not isinstance(source, (bytes, bytearray)) and Path(source) != Path(entry.source):
+            Path(source).unlink(missing_ok=True)
+        source = entry.source
+        layout = entry.layout
+    else:
+        layout = build_layout(source)
+        if UPLOAD_DEDUP and sha256:
+            CONTENT_INDEX.put(sha256, source, layout)
+
+    extracted_text = layout.text
+
+    # Store original filename
+    set_original_name(doc_id, filename)
+
+    # Store extracted text
+    set_text(doc_id, extracted_text)
+
+    # Store PDF bytes (or keep the uploaded file as the working PDF)
+    if isinstance(source, (bytes, bytearray)):
+        set_pdf_bytes(doc_id, bytes(source))
+    else:
+        set_pdf_file(doc_id, source)
+
+    # Store layout index (words, offsets, boxes) for this revision
+    set_layout(doc_id, layout)
+
+    # Store checkbox options
+    set_options(doc_id, {
+        "save_original": save_original,
+        "save_audit": save_audit,
+        "save_versions": True,      # default ON
+        "save_redacted": True       # default ON
+    })
+
+    # Save original PDF (optional)
+    if save_original:
+        save_original_pdf(doc_id, filename, source)
+
+    # Log audit (optional)
+    if save_audit:
+        log_action(doc_id, "upload", {"filename": filename, "sha256": sha256})
+
+    return {
+        "doc_id": doc_id,
+        "filename": filename,
+        "sha256": sha256,
+        "deduplicated": entry is not None,
+        "text_length": len(extracted_text),
+        "pages": len(layout.pages),
+        "ocr": layout.ocr_stats,
+        "options": {
+            "save_original": save_original,
+            "save_audit": save_audit
+        }
+    }
+
+
+def ingest_image(
+    doc_id: str,
+    filename: str,
+    source,
+    save_original: bool = False,
+    save_audit: bool = False,
+    sha256: str | None = None,
+) -> dict:
+    """
+    Convert an uploaded image (bytes or path) to the document's
+    PDF and ingest that. The PDF is named after the image; the
+    image itself is not kept. Blocking (PIL + PyMuPDF + OCR).
+    """
+    if sha256 is None and isinstance(source, (bytes, bytearray)):
+        sha256 = hashlib.sha256(source).hexdigest()
+
+    entry = CONTENT_INDEX.get(sha256) if UPLOAD_DEDUP and sha256 else None
+    if entry is not None:
+        # Same image as before: its PDF already exists
+        pdf_path, frames = entry.source, None
+    else:
+        pdf_path = upload_path(doc_id)
+        frames = image_to_pdf(source if isinstance(source, (bytes, bytearray)) else str(source), str(pdf_path))
+
+    if not isinstance(source, (bytes, bytearray)):
+        Path(source).unlink(missing_ok=True)
+
+    result = ingest_pdf(doc_id, f"{Path(filename).stem}.pdf", pdf_path, save_original, save_audit, sha256)
+    result["source_image"] = {"filename": filename, "frames": frames or result["pages"]}
+    return result
+
+
+def ingest_upload(doc_id: str, filename: str, source, *args, **kwargs) -> dict:
+    """
+    ingest_image() or ingest_pdf(), by file extension.
+    """
+    if is_image_file(filename):
+        return ingest_image(doc_id, filename, source, *args, **kwargs)
+    return ingest_pdf(doc_id, filename, source, *args, **kwargs)
+
+
+def release_document(doc_id: str) -> bool:
+    """
+    Free an open document: in-memory state, spilled copies,
+    cached suggestions / renders, its incremental working copy
+    and its uploaded file (unless another document, e.g. a
+    duplicate upload, still reads from it). Stored originals,
+    versions and audit logs are not touched. Returns False
+    for unknown documents.
+    """
+    with document_lock(doc_id):
+        if doc_id not in DOC_PDF_BYTES and doc_id not in DOC_ORIGINAL_NAME:
+            return False
+
+        working = DOC_WORKING_COPY.get(doc_id)
+        uploads = {upload_path(doc_id)}
+        attached = DOCUMENT_STORE.attached_file(doc_id, "pdf_bytes")
+        if attached is not None and Path(attached[0]).parent == upload_path(doc_id).parent:
+            uploads.add(Path(attached[0]))  # a duplicate reads another upload's file
+
+        drop_document(doc_id)
+        invalidate_suggestions(doc_id)
+        RENDER_CACHE.drop(doc_id)
+
+        if working is not None:
+            working.path.unlink(missing_ok=True)
+        for path in uploads:
+            if not DOCUMENT_STORE.file_users(path):
+                path.unlink(missing_ok=True)
+        return True
+
+
+def release_documents(doc_ids) -> int:
+    return sum(release_document(doc_id) for doc_id in doc_ids)
@@ -0,0 +1,67 @@
+# ---------------------------------------------------------
+# File: doc_locks.py
+# Path: backend/app/state/doc_locks.py
+# ---------------------------------------------------------
+# Per-document write locks.
+#
+# A mutation (redaction, compaction) reads the working PDF
+# and layout index, changes them and commits a new revision.
+# Two mutations of the same document interleaving would
+# drop one of them (last writer wins), so every mutation
+# holds its document's lock (pdf_service.document_mutation).
+#
+# - different documents still change in parallel
+# - reads (/view, page images, suggestions) never take the
+#   lock: they see the old or the new revision, and the
+#   revision number tells them which
+# ---------------------------------------------------------
+
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+
+class DocumentLocks:
+    """
+    doc_id -> re-entrant lock (a mutation may call another
+    one on the same document, e.g. a job running a service).
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, threading.RLock] = {}
+        self._lock = threading.Lock()
+        self.contended = 0
+
+    def get(self, doc_id: str) -> threading.RLock:
+        with self._lock:
+            lock = self._locks.get(doc_id)
+            if lock is None:
+                lock = self._locks[doc_id] = threading.RLock()
+            return lock
+
+    def acquire(self, doc_id: str) -> threading.RLock:
+        lock = self.get(doc_id)
+        if not lock.acquire(blocking=False):
+            with self._lock:
+                self.contended += 1
+            lock.acquire()
+        return lock
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"documents": len(self._locks), "contended": self.contended}
+
+
+DOC_LOCKS = DocumentLocks()
+
+
+@contextmanager
+def document_lock(doc_id: str):
+    """
+    with document_lock(doc_id): ... (one writer per document)
+    """
+    lock = DOC_LOCKS.acquire(doc_id)
+    try:
+        yield
+    finally:
+        lock.release()
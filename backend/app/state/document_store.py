@@ -0,0 +1,411 @@
+# ---------------------------------------------------------
+# File: document_store.py
+# Path: backend/app/state/document_store.py
+# ---------------------------------------------------------
+# Memory-bounded store for the large per-document state
+# (PDF bytes, extracted text, layout index).
+#
+# - Documents are kept in LRU order with a byte budget.
+# - When the budget is exceeded, the coldest documents are
+#   spilled to disk and dropped from memory. Victims are
+#   picked under the store lock but written outside it; until
+#   a write is committed the value stays reachable.
+# - A spilled field is reloaded transparently (through a
+#   memory-mapped read) the next time it is accessed.
+# - A field can also be backed by an existing file owned by
+#   someone else (attach_file), e.g. the working copy of an
+#   incrementally saved PDF: it is read on first access and
+#   never written or deleted by the store.
+#
+# memory.py exposes one dict-like view per field
+# (DOC_PDF_BYTES, DOC_TEXT, ...) so existing code keeps
+# using plain mapping syntax.
+# ---------------------------------------------------------
+
+import mmap
+import os
+import pickle
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+_MISSING = object()
+
+
+def _encode(value):
+    """
+    Serialize a field for spilling: (kind, raw bytes).
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return "bin", bytes(value)
+    if isinstance(value, str):
+        return "txt", value.encode("utf-8")
+    return "pkl", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(kind: str, raw: bytes):
+    if kind == "bin":
+        return raw
+    if kind == "txt":
+        return raw.decode("utf-8")
+    return pickle.loads(raw)
+
+
+def _sizeof(value) -> int:
+    """
+    Approximate in-memory size used for the byte budget.
+    Objects can report their own size via approx_size().
+    """
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    approx = getattr(value, "approx_size", None)
+    if callable(approx):
+        return approx()
+    return 0
+
+
+class DocumentStore:
+    """
+    LRU document store with a byte budget and disk spill.
+    Thread-safe (routes may run work off the event loop).
+    """
+
+    def __init__(self, max_bytes: int, spill_dir: Path):
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir)
+
+        # Spilled files don't survive a restart (state is in memory)
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+
+        # doc_id -> {field: value}, least recently used first
+        self._hot: "OrderedDict[str, Dict[str, object]]" = OrderedDict()
+        # doc_id -> bytes counted against the budget
+        self._sizes: Dict[str, int] = {}
+        # doc_id -> {field: kind} for fields that have a valid copy on disk
+        self._on_disk: Dict[str, Dict[str, str]] = {}
+        # doc_id -> {field: value} evicted, being written to disk
+        self._spilling: Dict[str, Dict[str, object]] = {}
+        # (doc_id, field) -> attached file holding that copy
+        self._external: Dict[Tuple[str, str], Path] = {}
+        # (doc_id, field) -> size of the attached file when attached
+        self._external_sizes: Dict[Tuple[str, str], int] = {}
+
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -----------------------------------------
+    # Field access
+    # -----------------------------------------
+    def get(self, doc_id: str, field: str, default=None):
+        with self._lock:
+            fields = self._hot.get(doc_id)
+
+            if fields is not None and field in fields:
+                self.hits += 1
+                self._hot.move_to_end(doc_id)
+                return fields[field]
+
+            # Evicted but not written yet: still in memory
+            value = self._take_pending(doc_id, field)
+            if value is not _MISSING:
+                self.hits += 1
+            else:
+                kind = self._on_disk.get(doc_id, {}).get(field)
+                if kind is None:
+                    return default
+
+                self.misses += 1
+                value = _decode(kind, self._read(doc_id, field, kind))
+            victims = self._put(doc_id, field, value)
+
+        self._spill(victims)
+        return value
+
+    def set(self, doc_id: str, field: str, value):
+        with self._lock:
+            # Disk copy (if any) is stale now
+            self._forget_disk_copy(doc_id, field)
+            self._take_pending(doc_id, field)
+            victims = self._put(doc_id, field, value)
+
+        self._spill(victims)
+
+    def attach_file(self, doc_id: str, field: str, path: Path, kind: str = "bin"):
+        """
+        Make an existing file the current value of a field. The
+        in-memory copy is dropped; the file is read (mmap) on
+        the next access.
+        """
+        with self._lock:
+            fields = self._hot.get(doc_id)
+            if fields is not None and field in fields:
+                self._account(doc_id, -_sizeof(fields.pop(field)))
+
+            self._forget_disk_copy(doc_id, field)
+            self._take_pending(doc_id, field)
+            self._on_disk.setdefault(doc_id, {})[field] = kind
+            self._external[(doc_id, field)] = Path(path)
+            self._external_sizes[(doc_id, field)] = Path(path).stat().st_size
+
+    def attached_file(self, doc_id: str, field: str) -> Tuple[Path, int] | None:
+        """
+        (path, size) of the attached file currently backing a
+        field, or None. The value is the first `size` bytes of
+        the file (the owner may append to it later).
+        """
+        with self._lock:
+            path = self._external.get((doc_id, field))
+            if path is None:
+                return None
+            return path, self._external_sizes[(doc_id, field)]
+
+    def delete(self, doc_id: str, field: str):
+        with self._lock:
+            found = False
+
+            fields = self._hot.get(doc_id)
+            if fields is not None and field in fields:
+                self._account(doc_id, -_sizeof(fields.pop(field)))
+                found = True
+
+            if self._forget_disk_copy(doc_id, field):
+                found = True
+
+            if self._take_pending(doc_id, field) is not _MISSING:
+                found = True
+
+            if not found:
+                raise KeyError(doc_id)
+
+    def contains(self, doc_id: str, field: str) -> bool:
+        with self._lock:
+            return (
+                field in self._hot.get(doc_id, {})
+                or field in self._on_disk.get(doc_id, {})
+                or field in self._spilling.get(doc_id, {})
+            )
+
+    def doc_ids(self, field: str):
+        with self._lock:
+            ids = [d for d, f in self._hot.items() if field in f]
+            ids += [
+                d for d, f in self._on_disk.items()
+                if field in f and field not in self._hot.get(d, {})
+            ]
+            ids += [
+                d for d, f in self._spilling.items()
+                if field in f and field not in self._on_disk.get(d, {})
+            ]
+            return ids
+
+    def drop(self, doc_id: str):
+        """
+        Forget a document entirely (memory + disk).
+        """
+        with self._lock:
+            if doc_id in self._hot:
+                del self._hot[doc_id]
+                self.used_bytes -= self._sizes.pop(doc_id, 0)
+            self._on_disk.pop(doc_id, None)
+            self._spilling.pop(doc_id, None)
+            for key in [k for k in self._external if k[0] == doc_id]:
+                del self._external[key]
+                self._external_sizes.pop(key, None)
+            shutil.rmtree(self.spill_dir / doc_id, ignore_errors=True)
+
+    def file_users(self, path: Path) -> list:
+        """
+        Documents with a field attached to this file.
+        """
+        path = Path(path)
+        with self._lock:
+            return sorted({d for (d, _), p in self._external.items() if p == path})
+
+    def field(self, name: str) -> "FieldView":
+        return FieldView(self, name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_bytes": self.max_bytes,
+                "used_bytes": self.used_bytes,
+                "hot_documents": len(self._hot),
+                "spilled_documents": len([d for d in self._on_disk if d not in self._hot]),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+            }
+
+    # -----------------------------------------
+    # Internals (call with the lock held, except
+    # _spill() and _write())
+    # -----------------------------------------
+    def _put(self, doc_id: str, field: str, value) -> list:
+        """
+        Store a value in memory; returns the evicted fields
+        for _spill() (call it once the lock is released).
+        """
+        fields = self._hot.setdefault(doc_id, {})
+        old = fields.get(field)
+        fields[field] = value
+        self._hot.move_to_end(doc_id)
+
+        self._account(doc_id, _sizeof(value) - (_sizeof(old) if old is not None else 0))
+        return self._evict(keep=doc_id)
+
+    def _account(self, doc_id: str, delta: int):
+        self._sizes[doc_id] = self._sizes.get(doc_id, 0) + delta
+        self.used_bytes += delta
+
+    def _evict(self, keep: str) -> List[Tuple[str, str, object]]:
+        """
+        Drop least recently used documents from memory until
+        under budget and return their (doc_id, field, value)
+        still to be written. The document being written is
+        never evicted.
+        """
+        victims = []
+        while self.used_bytes > self.max_bytes:
+            victim = next((d for d in self._hot if d != keep), None)
+            if victim is None:
+                break
+
+            fields = self._hot.pop(victim)
+            on_disk = self._on_disk.get(victim, {})
+
+            for field, value in fields.items():
+                if field in on_disk:
+                    continue  # clean: disk copy still valid
+                self._spilling.setdefault(victim, {})[field] = value
+                victims.append((victim, field, value))
+
+            self.used_bytes -= self._sizes.pop(victim, 0)
+            self.evictions += 1
+        return victims
+
+    def _take_pending(self, doc_id: str, field: str):
+        pending = self._spilling.get(doc_id)
+        if pending is None or field not in pending:
+            return _MISSING
+        value = pending.pop(field)
+        if not pending:
+            del self._spilling[doc_id]
+        return value
+
+    def _spill(self, victims: List[Tuple[str, str, object]]):
+        """
+        Write evicted fields to disk (without the lock), then
+        commit each one unless it was read back, replaced or
+        dropped in the meantime.
+        """
+        for doc_id, field, value in victims:
+            kind, raw = _encode(value)
+            try:
+                tmp_path = self._write(doc_id, field, kind, raw)
+            except OSError:
+                with self._lock:
+                    # Still wanted: keep it in memory rather than lose it
+                    restored = self._take_pending(doc_id, field) is value
+                    if restored:
+                        self._hot.setdefault(doc_id, {})[field] = value
+                        self._account(doc_id, _sizeof(value))
+                if restored:
+                    raise
+                continue  # dropped meanwhile
+
+            with self._lock:
+                if self._spilling.get(doc_id, {}).get(field, _MISSING) is not value:
+                    tmp_path.unlink(missing_ok=True)
+                    continue
+                self._take_pending(doc_id, field)
+                os.replace(tmp_path, self._path(doc_id, field, kind))
+                self._on_disk.setdefault(doc_id, {})[field] = kind
+
+    def _forget_disk_copy(self, doc_id: str, field: str) -> bool:
+        """
+        Drop the disk copy of a field: spilled files are deleted,
+        attached files are only forgotten.
+        """
+        kind = self._on_disk.get(doc_id, {}).pop(field, None)
+        if kind is None:
+            return False
+        self._external_sizes.pop((doc_id, field), None)
+        if self._external.pop((doc_id, field), None) is None:
+            self._path(doc_id, field, kind).unlink(missing_ok=True)
+        return True
+
+    def _path(self, doc_id: str, field: str, kind: str) -> Path:
+        external = self._external.get((doc_id, field))
+        if external is not None:
+            return external
+        return self.spill_dir / doc_id / f"{field}.{kind}"
+
+    def _write(self, doc_id: str, field: str, kind: str, raw: bytes) -> Path:
+        """
+        Write a spill file under a unique temporary name; the
+        caller renames it into place (under the lock).
+        """
+        path = self.spill_dir / doc_id / f"{field}.{kind}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        return tmp_path
+
+    def _read(self, doc_id: str, field: str, kind: str) -> bytes:
+        path = self._path(doc_id, field, kind)
+        # An attached file may have grown since: its value is
+        # the size recorded when it was attached
+        size = self._external_sizes.get((doc_id, field))
+        with open(path, "rb") as f:
+            if size is None:
+                size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return m[:size]
+
+
+class FieldView(MutableMapping):
+    """
+    dict-like view of one field across all documents:
+        DOC_TEXT[doc_id], DOC_TEXT.get(doc_id), doc_id in DOC_TEXT
+    """
+
+    def __init__(self, store: DocumentStore, name: str):
+        self._store = store
+        self._name = name
+
+    def __getitem__(self, doc_id: str):
+        missing = object()
+        value = self._store.get(doc_id, self._name, missing)
+        if value is missing:
+            raise KeyError(doc_id)
+        return value
+
+    def __setitem__(self, doc_id: str, value):
+        self._store.set(doc_id, self._name, value)
+
+    def __delitem__(self, doc_id: str):
+        self._store.delete(doc_id, self._name)
+
+    def __contains__(self, doc_id) -> bool:
+        return self._store.contains(doc_id, self._name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.doc_ids(self._name))
+
+    def __len__(self) -> int:
+        return len(self._store.doc_ids(self._name))
@@ -4,9 +4,31 @@
 # ---------------------------------------------------------
 # This module stores all in-memory state for each document.
 # Everything is keyed by doc_id (UUID).
+#
+# The large per-document values (text, PDF bytes, layout)
+# live in a memory-bounded DocumentStore: cold documents
+# are spilled to disk and reloaded on access. The names
+# below are dict-like views, so callers use them as dicts.
 # ---------------------------------------------------------
 
-from typing import Dict, List, Tuple
+import os
+from pathlib import Path
+from typing import Dict, List, MutableMapping, Tuple
+
+from .document_store import DocumentStore
+
+
+# ---------------------------------------------------------
+# DOCUMENT STORE (byte budget + disk spill)
+# ---------------------------------------------------------
+
+# Budget for hot documents (default 512 MB)
+DOC_STORE_MAX_BYTES = int(os.environ.get("DOC_STORE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Where cold documents are spilled (cleared on startup)
+DOC_STORE_SPILL_DIR = Path(os.environ.get("DOC_STORE_SPILL_DIR", "storage/spill"))
+
+DOCUMENT_STORE = DocumentStore(DOC_STORE_MAX_BYTES, DOC_STORE_SPILL_DIR)
 
 
 # ---------------------------------------------------------
@@ -17,10 +39,24 @@ from typing import Dict, List, Tuple
 DOC_ORIGINAL_NAME: Dict[str, str] = {}
 
 # doc_id -> extracted text from the PDF (used for ML + PII + span redaction)
-DOC_TEXT: Dict[str, str] = {}
+DOC_TEXT: MutableMapping[str, str] = DOCUMENT_STORE.field("text")
 
 # doc_id -> current working PDF bytes (updated after each redaction)
-DOC_PDF_BYTES: Dict[str, bytes] = {}
+DOC_PDF_BYTES: MutableMapping[str, bytes] = DOCUMENT_STORE.field("pdf_bytes")
+
+# doc_id -> revision of the working PDF (0 at upload, +1 per update)
+DOC_REVISION: Dict[str, int] = {}
+
+# doc_id -> times the working PDF bytes were replaced, including
+# same-content rewrites (compaction); part of the PDF's ETag
+DOC_PDF_WRITES: Dict[str, int] = {}
+
+# doc_id -> page layout index (services/layout_index.DocumentLayout)
+DOC_LAYOUT: MutableMapping[str, object] = DOCUMENT_STORE.field("layout")
+
+# doc_id -> on-disk working file for incremental saves
+# (services/incremental_pdf.WorkingCopy)
+DOC_WORKING_COPY: Dict[str, object] = {}
 
 
 # ---------------------------------------------------------
@@ -7,9 +7,13 @@
 # ---------------------------------------------------------
 
 from .memory import (
+    DOCUMENT_STORE,
     DOC_ORIGINAL_NAME,
     DOC_TEXT,
     DOC_PDF_BYTES,
+    DOC_REVISION,
+    DOC_PDF_WRITES,
+    DOC_WORKING_COPY,
     DOC_OPTIONS,
     DOC_VERSIONS,
     DOC_TAGS,
@@ -46,6 +50,14 @@ def get_pdf_bytes(doc_id: str) -> bytes:
     return DOC_PDF_BYTES.get(doc_id)
 
 
+def get_revision(doc_id: str) -> int:
+    """
+    Get the revision of the working PDF.
+    # doc_id -> 0 at upload, +1 per update
+    """
+    return DOC_REVISION.get(doc_id, 0)
+
+
 def get_options(doc_id: str) -> dict:
     """
     Get user-selected checkbox options.
@@ -87,6 +99,14 @@ def set_pdf_bytes(doc_id: str, pdf_bytes: bytes):
     DOC_PDF_BYTES[doc_id] = pdf_bytes
 
 
+def set_pdf_file(doc_id: str, path):
+    """
+    Set the working PDF to a file on disk (read lazily on
+    first access instead of being held in memory).
+    """
+    DOCUMENT_STORE.attach_file(doc_id, "pdf_bytes", path)
+
+
 def set_options(doc_id: str, options: dict):
     """
     Set user-selected checkbox options.
@@ -103,6 +123,33 @@ def add_version(doc_id: str, version_filename: str):
     DOC_VERSIONS[doc_id].append(version_filename)
 
 
+def drop_document(doc_id: str):
+    """
+    Forget a document: its large state (text, PDF bytes,
+    layout, including any spilled copy) and every per-document
+    entry. Files it owns are removed by the caller
+    (upload_service.release_document).
+    """
+    DOCUMENT_STORE.drop(doc_id)
+    for state in (
+        DOC_ORIGINAL_NAME, DOC_REVISION, DOC_PDF_WRITES, DOC_WORKING_COPY,
+        DOC_OPTIONS, DOC_VERSIONS, DOC_TAGS, CHAT_HISTORY, TAGS,
+    ):
+        state.pop(doc_id, None)
+
+
+# ---------------------------------------------------------
+# DOCUMENT STORE STATS
+# ---------------------------------------------------------
+
+def get_store_stats() -> dict:
+    """
+    Hit/miss/eviction counters and memory usage of the
+    document store.
+    """
+    return DOCUMENT_STORE.stats()
+
+
 # ---------------------------------------------------------
 # TAGGING + CHAT HELPERS
 # ---------------------------------------------------------
@@ -0,0 +1,218 @@
+# ---------------------------------------------------------
+# File: audit_log.py
+# Path: backend/app/storage/audit_log.py
+# ---------------------------------------------------------
+# Append-only audit log (one JSON object per line).
+#
+# The old format (audit.json) rewrote the whole list on
+# every action, so logging got slower as a document's
+# history grew. Now:
+# - log_action() only enqueues the entry
+# - a background writer appends queued entries to
+#   <doc folder>/audit.jsonl in small batches, with one
+#   fsync per file per batch
+# - reads flush the queue first, so a caller always sees
+#   its own entries
+#
+# Existing audit.json files are migrated to audit.jsonl the
+# first time the log is read or written (the old file is
+# kept as audit.json.migrated).
+# ---------------------------------------------------------
+
+import json
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import List
+
+AUDIT_FILENAME = "audit.jsonl"
+LEGACY_AUDIT_FILENAME = "audit.json"
+
+# Max entries written per batch
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", 256))
+
+# fsync after each batch (durability vs. throughput)
+AUDIT_FSYNC = os.environ.get("AUDIT_FSYNC", "1") != "0"
+
+# Serializes appends and migrations of the log files
+_file_lock = threading.Lock()
+
+
+# ---------------------------------------------------------
+# Migration from audit.json
+# ---------------------------------------------------------
+def migrate_legacy_log(folder: Path) -> int:
+    """
+    Convert <folder>/audit.json to audit.jsonl. Entries already
+    in audit.jsonl are kept after the migrated ones.
+    Returns the number of migrated entries.
+    """
+    with _file_lock:
+        return _migrate(folder)
+
+
+def _migrate(folder: Path) -> int:
+    legacy = folder / LEGACY_AUDIT_FILENAME
+    if not legacy.exists():
+        return 0
+
+    try:
+        entries = json.loads(legacy.read_text() or "[]")
+    except ValueError as e:
+        print(f"[WARN] Unreadable audit log {legacy}: {e}")
+        return 0
+
+    target = folder / AUDIT_FILENAME
+    existing = target.read_bytes() if target.exists() else b""
+
+    tmp_path = target.with_name(target.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        for entry in entries:
+            f.write(_encode(entry))
+        f.write(existing)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target)
+
+    legacy.rename(folder / (LEGACY_AUDIT_FILENAME + ".migrated"))
+    return len(entries)
+
+
+# ---------------------------------------------------------
+# Background writer
+# ---------------------------------------------------------
+def _encode(entry: dict) -> bytes:
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class AuditWriter:
+    """
+    Single background thread that drains a queue of
+    (log path, entry) and appends them in batches.
+    """
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE, fsync: bool = AUDIT_FSYNC):
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+        self.written = 0
+        self.batches = 0
+
+    def append(self, path: Path, entry: dict):
+        self._ensure_started()
+        self._queue.put((Path(path), entry))
+
+    def flush(self):
+        """
+        Block until every queued entry is on disk.
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            # Whatever queued up while the last batch was being
+            # written goes into this one (no extra waiting)
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"[WARN] Audit log write failed: {e}")
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+
+            if stop:
+                return
+
+    def _write(self, batch):
+        by_path = {}
+        for path, entry in batch:
+            by_path.setdefault(path, []).append(_encode(entry))
+
+        with _file_lock:
+            for path, lines in by_path.items():
+                _migrate(path.parent)
+                with open(path, "ab") as f:
+                    f.write(b"".join(lines))
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+
+        self.written += len(batch)
+        self.batches += 1
+
+
+AUDIT_WRITER = AuditWriter()
+
+
+# ---------------------------------------------------------
+# Public helpers (used by storage.py)
+# ---------------------------------------------------------
+def append_entry(folder: Path, entry: dict):
+    AUDIT_WRITER.append(Path(folder) / AUDIT_FILENAME, entry)
+
+
+def read_entries(folder: Path) -> List[dict]:
+    """
+    All entries of a document's log, oldest first. A torn
+    last line (crash mid-write) is skipped.
+    """
+    folder = Path(folder)
+    AUDIT_WRITER.flush()
+    migrate_legacy_log(folder)
+
+    path = folder / AUDIT_FILENAME
+    if not path.exists():
+        return []
+
+    entries = []
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+def close_audit_log():
+    AUDIT_WRITER.flush()
+    AUDIT_WRITER.close()
@@ -0,0 +1,406 @@
+# ---------------------------------------------------------
+# File: catalog.py
+# Path: backend/app/storage/catalog.py
+# ---------------------------------------------------------
+# Embedded document catalog (SQLite).
+#
+# Facts that used to be rediscovered by walking
+# storage/documents/<doc_id>/ and parsing JSON:
+# - documents: name, created/modified time, sizes,
+#   version counter, archive the document went into
+# - versions: one row per saved version (number, path, size);
+#   versions kept in the chunk store (version_store.py) also
+#   hold their manifest and checksum
+# - chunks: reference count of every stored chunk
+# - tags: manual tags and labels per document
+# - activity: months in which an audited action happened
+#   (what monthly/yearly archiving selects on)
+#
+# Written by the storage.storage functions, one transaction
+# per operation. One connection shared by all threads
+# (WAL mode), serialized by a lock.
+# ---------------------------------------------------------
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, List, Tuple
+
+# (chunk sha256, chunk size) in file order
+Manifest = List[Tuple[str, int]]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id        TEXT PRIMARY KEY,
+    original_name TEXT,
+    created_at    REAL NOT NULL,
+    modified_at   REAL NOT NULL,
+    original_size INTEGER,
+    redacted_size INTEGER,
+    version_count INTEGER NOT NULL DEFAULT 0,
+    archive       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_documents_created ON documents(created_at);
+
+CREATE TABLE IF NOT EXISTS versions (
+    doc_id     TEXT NOT NULL REFERENCES documents(doc_id) ON DELETE CASCADE,
+    number     INTEGER NOT NULL,
+    path       TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (doc_id, number)
+);
+
+CREATE TABLE IF NOT EXISTS tags (
+    doc_id TEXT NOT NULL REFERENCES documents(doc_id) ON DELETE CASCADE,
+    kind   TEXT NOT NULL,  -- 'tag' | 'label'
+    value  TEXT NOT NULL,
+    PRIMARY KEY (doc_id, kind, value)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_value ON tags(kind, value);
+
+CREATE TABLE IF NOT EXISTS activity (
+    doc_id TEXT NOT NULL REFERENCES documents(doc_id) ON DELETE CASCADE,
+    year   INTEGER NOT NULL,
+    month  INTEGER NOT NULL,
+    PRIMARY KEY (doc_id, year, month)
+);
+CREATE INDEX IF NOT EXISTS idx_activity_period ON activity(year, month);
+
+CREATE TABLE IF NOT EXISTS chunks (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    refs INTEGER NOT NULL
+);
+"""
+
+# Columns added after the first release (name -> type)
+MIGRATIONS = {
+    "versions": {"sha256": "TEXT", "chunks": "TEXT", "incremental": "INTEGER"},
+}
+
+
+class Catalog:
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.is_new = not self.db_path.exists()
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        for table, columns in MIGRATIONS.items():
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for name, sql_type in columns.items():
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+
+    # -----------------------------------------
+    # Transactions
+    # -----------------------------------------
+    @contextmanager
+    def transaction(self):
+        """
+        BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error).
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _ensure(conn, doc_id: str, now: float):
+        conn.execute(
+            "INSERT OR IGNORE INTO documents (doc_id, created_at, modified_at) VALUES (?, ?, ?)",
+            (doc_id, now, now),
+        )
+
+    # -----------------------------------------
+    # Writes
+    # -----------------------------------------
+    def record_original(self, doc_id: str, original_name: str, size: int):
+        now = time.time()
+        with self.transaction() as conn:
+            self._ensure(conn, doc_id, now)
+            conn.execute(
+                "UPDATE documents SET original_name = ?, original_size = ?, modified_at = ? WHERE doc_id = ?",
+                (original_name, size, now, doc_id),
+            )
+
+    def record_redacted(self, doc_id: str, size: int):
+        now = time.time()
+        with self.transaction() as conn:
+            self._ensure(conn, doc_id, now)
+            conn.execute(
+                "UPDATE documents SET redacted_size = ?, modified_at = ? WHERE doc_id = ?",
+                (size, now, doc_id),
+            )
+
+    def add_version(
+        self,
+        doc_id: str,
+        size: int,
+        write: Callable[[int], Tuple[Path, Manifest | None]],
+        sha256: str | None = None,
+        incremental: bool = False,
+    ) -> Path:
+        """
+        Allocate the next version number, call write(number)
+        to store the content, and record it, all in one
+        transaction (a failed write leaves no row behind).
+        write() returns the version path and, for chunked
+        versions, the manifest; the chunks it references gain
+        one reference each. incremental marks content that
+        still has to be compacted before it is handed out.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            self._ensure(conn, doc_id, now)
+            (count,) = conn.execute(
+                "SELECT version_count FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+
+            number = count + 1
+            path, manifest = write(number)
+
+            if manifest is not None:
+                conn.executemany(
+                    "INSERT INTO chunks (hash, size, refs) VALUES (?, ?, 1) "
+                    "ON CONFLICT(hash) DO UPDATE SET refs = refs + 1",
+                    manifest,
+                )
+
+            conn.execute(
+                "INSERT INTO versions (doc_id, number, path, size, created_at, sha256, chunks, incremental) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (doc_id, number, str(path), size, now, sha256,
+                 json.dumps(manifest) if manifest is not None else None, int(incremental)),
+            )
+            conn.execute(
+                "UPDATE documents SET version_count = ?, modified_at = ? WHERE doc_id = ?",
+                (number, now, doc_id),
+            )
+        return path
+
+    def import_version(self, doc_id: str, number: int, path: Path, size: int, created_at: float):
+        """
+        Record an existing version file (catalog backfill).
+        """
+        with self.transaction() as conn:
+            self._ensure(conn, doc_id, created_at)
+            conn.execute(
+                "INSERT OR IGNORE INTO versions (doc_id, number, path, size, created_at) VALUES (?, ?, ?, ?, ?)",
+                (doc_id, number, str(path), size, created_at),
+            )
+            conn.execute(
+                "UPDATE documents SET version_count = MAX(version_count, ?), "
+                "created_at = MIN(created_at, ?) WHERE doc_id = ?",
+                (number, created_at, doc_id),
+            )
+
+    def record_activity(self, doc_id: str, when: float | None = None):
+        when = when or time.time()
+        tm = time.localtime(when)
+        with self.transaction() as conn:
+            self._ensure(conn, doc_id, when)
+            conn.execute(
+                "INSERT OR IGNORE INTO activity (doc_id, year, month) VALUES (?, ?, ?)",
+                (doc_id, tm.tm_year, tm.tm_mon),
+            )
+            conn.execute(
+                "UPDATE documents SET modified_at = MAX(modified_at, ?) WHERE doc_id = ?",
+                (when, doc_id),
+            )
+
+    def add_tags(self, doc_id: str, values: Iterable[str], kind: str = "tag"):
+        now = time.time()
+        with self.transaction() as conn:
+            self._ensure(conn, doc_id, now)
+            conn.executemany(
+                "INSERT OR IGNORE INTO tags (doc_id, kind, value) VALUES (?, ?, ?)",
+                [(doc_id, kind, v) for v in values],
+            )
+
+    def remove_tag(self, doc_id: str, value: str, kind: str = "tag"):
+        with self.transaction() as conn:
+            conn.execute(
+                "DELETE FROM tags WHERE doc_id = ? AND kind = ? AND value = ?",
+                (doc_id, kind, value),
+            )
+
+    def mark_archived(self, doc_ids: Iterable[str], archive: str):
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE documents SET archive = ? WHERE doc_id = ?",
+                [(archive, d) for d in doc_ids],
+            )
+
+    def release_versions(self, doc_ids: Iterable[str], delete: Callable[[str], None]):
+        """
+        Drop the chunk references held by the versions of these
+        documents (their manifests are cleared). Chunks nobody
+        references any more are removed, and delete(hash) is
+        called for each one while the lock is still held, so a
+        concurrent add_version can't reuse a chunk mid-delete.
+        """
+        doc_ids = list(doc_ids)
+        with self._lock:
+            with self.transaction() as conn:
+                released: dict = {}
+                for doc_id in doc_ids:
+                    rows = conn.execute(
+                        "SELECT chunks FROM versions WHERE doc_id = ? AND chunks IS NOT NULL", (doc_id,)
+                    ).fetchall()
+                    for (manifest,) in rows:
+                        for digest, _ in json.loads(manifest):
+                            released[digest] = released.get(digest, 0) + 1
+                    conn.execute("UPDATE versions SET chunks = NULL WHERE doc_id = ?", (doc_id,))
+
+                conn.executemany(
+                    "UPDATE chunks SET refs = refs - ? WHERE hash = ?",
+                    [(n, digest) for digest, n in released.items()],
+                )
+                dead = [row[0] for row in conn.execute("SELECT hash FROM chunks WHERE refs <= 0")]
+                conn.execute("DELETE FROM chunks WHERE refs <= 0")
+
+            for digest in dead:
+                delete(digest)
+
+    def remove_documents(self, doc_ids: Iterable[str]):
+        with self.transaction() as conn:
+            conn.executemany("DELETE FROM documents WHERE doc_id = ?", [(d,) for d in doc_ids])
+
+    # -----------------------------------------
+    # Queries
+    # -----------------------------------------
+    def active_documents(self, year: int, month: int = None) -> List[str]:
+        """
+        Unarchived documents with activity in a month / year.
+        """
+        sql = (
+            "SELECT DISTINCT a.doc_id FROM activity a JOIN documents d USING (doc_id) "
+            "WHERE d.archive IS NULL AND a.year = ?"
+        )
+        params = [year]
+        if month is not None:
+            sql += " AND a.month = ?"
+            params.append(month)
+        return [row[0] for row in self._query(sql, params)]
+
+    def get_tags(self, doc_id: str, kind: str = "tag") -> List[str]:
+        rows = self._query(
+            "SELECT value FROM tags WHERE doc_id = ? AND kind = ? ORDER BY rowid", (doc_id, kind)
+        )
+        return [row[0] for row in rows]
+
+    def get_versions(self, doc_id: str) -> List[dict]:
+        rows = self._query(
+            "SELECT number, path, size, created_at FROM versions WHERE doc_id = ? ORDER BY number",
+            (doc_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def get_version(self, doc_id: str, number: int) -> dict | None:
+        """
+        One version, with its manifest decoded (None for
+        versions stored as plain files).
+        """
+        rows = self._query(
+            "SELECT number, path, size, created_at, sha256, chunks, incremental FROM versions "
+            "WHERE doc_id = ? AND number = ?",
+            (doc_id, number),
+        )
+        if not rows:
+            return None
+        version = dict(rows[0])
+        version["chunks"] = json.loads(version["chunks"]) if version["chunks"] else None
+        return version
+
+    def dedup_stats(self, doc_id: str | None = None) -> dict:
+        """
+        Logical bytes (sum of chunked version sizes) against
+        bytes actually stored in the chunk store, for one
+        document or for everything.
+        """
+        if doc_id is None:
+            ((versions, logical),) = self._query(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM versions WHERE chunks IS NOT NULL"
+            )
+            ((chunk_count, stored),) = self._query("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chunks")
+        else:
+            rows = self._query(
+                "SELECT size, chunks FROM versions WHERE doc_id = ? AND chunks IS NOT NULL", (doc_id,)
+            )
+            unique = {}
+            for row in rows:
+                unique.update(json.loads(row["chunks"]))
+            versions = len(rows)
+            logical = sum(row["size"] for row in rows)
+            chunk_count = len(unique)
+            stored = sum(unique.values())
+
+        return {
+            "versions": versions,
+            "chunks": chunk_count,
+            "logical_bytes": logical,
+            "stored_bytes": stored,
+            "dedup_ratio": round(logical / stored, 2) if stored else None,
+        }
+
+    def get_document(self, doc_id: str) -> dict | None:
+        rows = self._query("SELECT * FROM documents WHERE doc_id = ?", (doc_id,))
+        return dict(rows[0]) if rows else None
+
+    def list_documents(
+        self,
+        tag: str = None,
+        label: str = None,
+        year: int = None,
+        month: int = None,
+        include_archived: bool = False,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[dict]:
+        sql = "SELECT d.* FROM documents d WHERE 1 = 1"
+        params: list = []
+
+        if not include_archived:
+            sql += " AND d.archive IS NULL"
+        if tag is not None:
+            sql += " AND EXISTS (SELECT 1 FROM tags t WHERE t.doc_id = d.doc_id AND t.kind = 'tag' AND t.value = ?)"
+            params.append(tag)
+        if label is not None:
+            sql += " AND EXISTS (SELECT 1 FROM tags t WHERE t.doc_id = d.doc_id AND t.kind = 'label' AND t.value = ?)"
+            params.append(label)
+        if year is not None:
+            sql += " AND EXISTS (SELECT 1 FROM activity a WHERE a.doc_id = d.doc_id AND a.year = ?"
+            params.append(year)
+            if month is not None:
+                sql += " AND a.month = ?"
+                params.append(month)
+            sql += ")"
+
+        sql += " ORDER BY d.created_at DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        return [dict(row) for row in self._query(sql, params)]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
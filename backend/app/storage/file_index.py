@@ -0,0 +1,164 @@
+# ---------------------------------------------------------
+# File: file_index.py
+# Path: backend/app/storage/file_index.py
+# ---------------------------------------------------------
+# Persistent index: downloadable filename -> path on disk
+# (originals, redacted outputs, versions, archives).
+#
+# /download/{filename} used to scan every document folder
+# per request. The storage functions now register each file
+# they write, and the route does a dict lookup.
+#
+# Persistence: an append-only JSONL log of
+#     {"name": ..., "path": ...}     (path null = removed)
+# replayed on startup, last record per name wins. The log
+# is rewritten (compacted) once most records are stale.
+# If the log doesn't exist yet, it is built from a scan of
+# the existing storage folders.
+# ---------------------------------------------------------
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Set, Tuple
+
+# Compact once the log has this many more records than live entries
+COMPACT_SLACK = 1000
+
+
+class FileIndex:
+    def __init__(self, log_path: Path):
+        self.log_path = Path(log_path)
+        self._lock = threading.Lock()
+
+        # filename -> path
+        self._paths: Dict[str, str] = {}
+        # folder -> filenames located in it (for folder removal)
+        self._by_folder: Dict[str, Set[str]] = {}
+        self._records = 0
+
+        self.exists = self.log_path.exists()
+        if self.exists:
+            self._replay()
+
+    # -----------------------------------------
+    # Lookups
+    # -----------------------------------------
+    def lookup(self, filename: str) -> Path | None:
+        """
+        Path of a downloadable file, or None. An entry whose
+        file has gone missing is dropped.
+        """
+        with self._lock:
+            path = self._paths.get(filename)
+        if path is None:
+            return None
+
+        path = Path(path)
+        if not path.is_file():
+            self.remove(filename)
+            return None
+        return path
+
+    def peek(self, filename: str) -> str | None:
+        """
+        Indexed path of a name, whether or not a file exists
+        there (versions in the chunk store have no file).
+        """
+        with self._lock:
+            return self._paths.get(filename)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    # -----------------------------------------
+    # Updates
+    # -----------------------------------------
+    def register(self, path) -> str:
+        """
+        Index a file under its name (a newer file with the same
+        name replaces the older entry).
+        """
+        path = Path(path)
+        with self._lock:
+            self._set(path.name, str(path))
+            self._append([(path.name, str(path))])
+        return path.name
+
+    def remove(self, filename: str):
+        with self._lock:
+            if filename in self._paths:
+                self._set(filename, None)
+                self._append([(filename, None)])
+
+    def remove_folder(self, folder):
+        """
+        Drop every entry located in a folder (e.g. a document
+        folder deleted after archiving).
+        """
+        folder = str(Path(folder))
+        with self._lock:
+            names = list(self._by_folder.get(folder, ()))
+            for name in names:
+                self._set(name, None)
+            self._append([(name, None) for name in names])
+
+    def rebuild(self, paths: Iterable[Path]):
+        """
+        Replace the whole index (and its log) with the given files.
+        """
+        with self._lock:
+            self._paths.clear()
+            self._by_folder.clear()
+            for path in paths:
+                self._set(path.name, str(path))
+            self._compact()
+            self.exists = True
+
+    # -----------------------------------------
+    # Internals (call with the lock held)
+    # -----------------------------------------
+    def _set(self, name: str, path: str | None):
+        old = self._paths.pop(name, None)
+        if old is not None:
+            self._by_folder.get(str(Path(old).parent), set()).discard(name)
+
+        if path is not None:
+            self._paths[name] = path
+            self._by_folder.setdefault(str(Path(path).parent), set()).add(name)
+
+    def _replay(self):
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line
+                self._set(record["name"], record.get("path"))
+                self._records += 1
+
+    def _append(self, records: Iterable[Tuple[str, str | None]]):
+        lines = [json.dumps({"name": n, "path": p}) + "\n" for n, p in records]
+        if not lines:
+            return
+
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._records += len(lines)
+
+        if self._records > 2 * len(self._paths) + COMPACT_SLACK:
+            self._compact()
+
+    def _compact(self):
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.log_path.with_name(self.log_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for name, path in self._paths.items():
+                f.write(json.dumps({"name": name, "path": path}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.log_path)
+        self._records = len(self._paths)
@@ -0,0 +1,93 @@
+# ---------------------------------------------------------
+# File: job_log.py
+# Path: backend/app/storage/job_log.py
+# ---------------------------------------------------------
+# Persistent job state (see services/jobs.py).
+#
+# Append-only JSONL log of job snapshots, replayed on
+# startup (last snapshot per job_id wins), so job status
+# and results survive a restart. Compacted once most
+# records are stale; only the newest JOB_HISTORY_MAX
+# finished jobs are kept.
+# ---------------------------------------------------------
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+# Finished jobs kept across compactions
+JOB_HISTORY_MAX = int(os.environ.get("JOB_HISTORY_MAX", 1000))
+
+# Compact once the log has this many more records than jobs
+COMPACT_SLACK = 1000
+
+FINISHED = ("done", "failed", "cancelled", "interrupted")
+
+
+class JobLog:
+    def __init__(self, log_path: Path):
+        self.log_path = Path(log_path)
+        self._lock = threading.Lock()
+        self._records = 0
+
+    def load(self) -> Dict[str, dict]:
+        """
+        Replay the log: job_id -> last snapshot.
+        """
+        jobs: Dict[str, dict] = {}
+        if not self.log_path.exists():
+            return jobs
+
+        with self._lock, open(self.log_path, "rb") as f:
+            for line in f:
+                try:
+                    job = json.loads(line)
+                except ValueError:
+                    continue  # torn last line
+                jobs[job["job_id"]] = job
+                self._records += 1
+        return jobs
+
+    def append(self, job: dict):
+        """
+        Persist one snapshot.
+        """
+        line = json.dumps(job, default=str) + "\n"
+        with self._lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._records += 1
+
+    def needs_compaction(self, live: int) -> bool:
+        return self._records > 2 * live + COMPACT_SLACK
+
+    def compact(self, jobs: List[dict]) -> List[str]:
+        """
+        Rewrite the log with the given jobs, dropping the
+        oldest finished ones beyond JOB_HISTORY_MAX.
+        Returns the ids of dropped jobs.
+        """
+        finished = sorted(
+            (j for j in jobs if j["status"] in FINISHED),
+            key=lambda j: j.get("finished_at") or 0,
+        )
+        dropped = finished[:max(0, len(finished) - JOB_HISTORY_MAX)]
+        dropped_ids = {j["job_id"] for j in dropped}
+        kept = [j for j in jobs if j["job_id"] not in dropped_ids]
+
+        with self._lock:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.log_path.with_name(self.log_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for job in kept:
+                    f.write(json.dumps(job, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.log_path)
+            self._records = len(kept)
+
+        return list(dropped_ids)
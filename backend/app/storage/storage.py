@@ -1,10 +1,23 @@
 import os
-import json
+import time
 import shutil
+import hashlib
 import calendar
+import zipfile
 from pathlib import Path
 from datetime import datetime
 
+from .audit_log import (
+    LEGACY_AUDIT_FILENAME,
+    append_entry,
+    migrate_legacy_log,
+    read_entries,
+)
+from .file_index import FileIndex
+from .catalog import Catalog
+from .version_store import ChunkStore, split_chunks
+from ..utils.pdf_utils import compact_pdf_bytes
+
 # -----------------------------------------
 # Base storage directory
 # -----------------------------------------
@@ -39,6 +52,100 @@ YEAR_ARCHIVE = ARCHIVE_ROOT / "years"
 MONTH_ARCHIVE.mkdir(exist_ok=True)
 YEAR_ARCHIVE.mkdir(exist_ok=True)
 
+# -----------------------------------------
+# Download index (filename -> path)
+# -----------------------------------------
+FILE_INDEX = FileIndex(BASE_DIR / "file_index.jsonl")
+
+
+def _downloadable_files():
+    """
+    Full scan of everything /download can serve. Only used
+    to build the index the first time.
+    """
+    for doc_folder in STORAGE_ROOT.iterdir():
+        if doc_folder.is_dir():
+            for file in doc_folder.iterdir():
+                if file.is_file() and file.suffix.lower() == ".pdf":
+                    yield file
+
+    for archive_dir in (MONTH_ARCHIVE, YEAR_ARCHIVE):
+        for file in archive_dir.iterdir():
+            if file.is_file() and file.suffix == ".zip":
+                yield file
+
+
+if not FILE_INDEX.exists:
+    FILE_INDEX.rebuild(_downloadable_files())
+
+
+# -----------------------------------------
+# Document catalog (SQLite, see catalog.py)
+# -----------------------------------------
+CATALOG = Catalog(BASE_DIR / "catalog.sqlite3")
+
+
+def _backfill_catalog():
+    """
+    Load facts about documents stored before the catalog
+    existed (one scan, first start only).
+    """
+    for doc_folder in STORAGE_ROOT.iterdir():
+        if not doc_folder.is_dir():
+            continue
+        doc_id = doc_folder.name
+
+        for file in doc_folder.iterdir():
+            if not file.is_file():
+                continue
+            stat = file.stat()
+            if file.name.startswith("original_") and file.suffix.lower() == ".pdf":
+                CATALOG.record_original(doc_id, file.name[len("original_"):], stat.st_size)
+            elif file.name.startswith("v") and file.stem[1:].isdigit() and file.suffix == ".pdf":
+                CATALOG.import_version(doc_id, int(file.stem[1:]), file, stat.st_size, stat.st_mtime)
+            elif file.stem.endswith("_redacted") and file.suffix.lower() == ".pdf":
+                CATALOG.record_redacted(doc_id, stat.st_size)
+
+        for entry in read_entries(doc_folder):
+            ts = datetime.strptime(entry["timestamp"], "%Y-%m-%d_%H-%M-%S")
+            CATALOG.record_activity(doc_id, ts.timestamp())
+
+
+if CATALOG.is_new:
+    _backfill_catalog()
+
+
+# -----------------------------------------
+# Version chunks (content-addressed, see version_store.py)
+# -----------------------------------------
+CHUNK_STORE = ChunkStore(BASE_DIR / "chunks")
+
+
+def find_download(filename: str):
+    """
+    Path of a downloadable file by name (constant time), or None.
+    """
+    return FILE_INDEX.lookup(filename)
+
+
+def open_download(filename: str):
+    """
+    Like find_download(), but also serves versions kept in
+    the chunk store: returns a Path, the rebuilt bytes, or
+    None.
+    """
+    path = FILE_INDEX.peek(filename)
+    if path is None:
+        return None
+    if Path(path).is_file():
+        return Path(path)
+
+    try:
+        return read_version(path)
+    except FileNotFoundError:
+        FILE_INDEX.remove(filename)
+        return None
+
 # -----------------------------------------
 # Helpers
 # -----------------------------------------
@@ -54,16 +161,22 @@ def timestamp():
 # -----------------------------------------
 # ORIGINAL PDF
 # -----------------------------------------
-def save_original_pdf(doc_id: str, filename: str, pdf_bytes: bytes) -> str:
+def save_original_pdf(doc_id: str, filename: str, pdf_bytes) -> str:
     """
-    Save the original uploaded PDF.
+    Save the original uploaded PDF (bytes, or the path of
+    the uploaded file, which is copied).
     """
     folder = ensure_doc_folder(doc_id)
     path = folder / f"original_{filename}"
 
-    with open(path, "wb") as f:
-        f.write(pdf_bytes)
+    if isinstance(pdf_bytes, (bytes, bytearray)):
+        with open(path, "wb") as f:
+            f.write(pdf_bytes)
+    else:
+        shutil.copyfile(pdf_bytes, path)
 
+    CATALOG.record_original(doc_id, filename, path.stat().st_size)
+    FILE_INDEX.register(path)
     return str(path)
 
 
@@ -90,35 +203,112 @@ def save_final_redacted(doc_id: str, original_filename: str, pdf_bytes: bytes) -
     with open(path, "wb") as f:
         f.write(pdf_bytes)
 
+    CATALOG.record_redacted(doc_id, len(pdf_bytes))
+    FILE_INDEX.register(path)
     return str(path)
 
 
 # -----------------------------------------
 # VERSION HISTORY (v001.pdf, v002.pdf, ...)
 # -----------------------------------------
-def save_version(doc_id: str, pdf_bytes: bytes) -> str:
+# Versions are not written as whole files any more: each one
+# is split into chunks stored once by hash (CHUNK_STORE) and
+# the catalog keeps its manifest. The version keeps its old
+# path (storage/documents/<doc_id>/vNNN.pdf) as its name;
+# read_version() rebuilds the bytes from it. Versions saved
+# as files before the chunk store existed are still read
+# from disk.
+#
+# Redactions snapshot the working PDF as it is, incremental
+# updates included (incremental=True): the working file only
+# grows between compactions, so a snapshot is the previous
+# version's manifest plus the appended tail
+# (append_version()), and neither a full rewrite nor a full
+# read is needed per redaction. Such versions still hold the
+# superseded (unredacted) objects; they are compacted
+# whenever they are read back.
+def save_version(doc_id: str, pdf_bytes: bytes, incremental: bool = False) -> str:
     """
     Save a versioned PDF: v001.pdf, v002.pdf, ...
+    The next number comes from the catalog's version counter.
+    Only chunks not already stored (by any version of any
+    document) are written.
+    """
+    path, _ = append_version(doc_id, [], pdf_bytes, hashlib.sha256(pdf_bytes).hexdigest(), incremental)
+    return path
+
+
+def append_version(doc_id: str, prefix: list, tail: bytes, sha256: str, incremental: bool = False):
+    """
+    Save a version made of the chunks of `prefix` (the
+    manifest of a stored version) followed by `tail`; only
+    the tail is chunked and written. sha256 is that of the
+    whole content. Returns (path, manifest).
     """
     folder = ensure_doc_folder(doc_id)
+    chunks = split_chunks(tail)
+    size = sum(length for _, length in prefix) + len(tail)
+    manifest = list(prefix)
 
-    existing = sorted(folder.glob("v*.pdf"))
-    if existing:
-        last = existing[-1].stem  # "v003"
-        last_num = int(last[1:])
-        next_num = last_num + 1
-    else:
-        next_num = 1
+    def write(number: int):
+        manifest.extend((CHUNK_STORE.put(chunk), len(chunk)) for chunk in chunks)
+        return folder / f"v{number:03d}.pdf", manifest
 
-    version_name = f"v{next_num:03d}.pdf"
-    path = folder / version_name
+    path = CATALOG.add_version(doc_id, size, write, sha256=sha256, incremental=incremental)
 
-    tmp_path = folder / (version_name + ".tmp")
-    with open(tmp_path, "wb") as f:
-        f.write(pdf_bytes)
-    os.replace(tmp_path, path)
+    FILE_INDEX.register(path)
+    return str(path), manifest
+
+
+def version_is_stored(path) -> bool:
+    """
+    Whether a chunked version still holds its chunks (not
+    released by archiving), i.e. can be used as a prefix.
+    """
+    parsed = _parse_version_path(path)
+    version = CATALOG.get_version(*parsed) if parsed is not None else None
+    return version is not None and version["chunks"] is not None
+
+
+def _parse_version_path(path):
+    """
+    (doc_id, number) from .../<doc_id>/vNNN.pdf, or None.
+    """
+    path = Path(path)
+    if path.suffix == ".pdf" and path.stem[:1] == "v" and path.stem[1:].isdigit():
+        return path.parent.name, int(path.stem[1:])
+    return None
+
+
+def load_version(doc_id: str, number: int) -> bytes:
+    version = CATALOG.get_version(doc_id, number)
+    if version is None:
+        raise FileNotFoundError(f"No version {number} for doc_id={doc_id}")
+
+    if version["chunks"] is None:
+        return Path(version["path"]).read_bytes()
+
+    digests = [digest for digest, _ in version["chunks"]]
+    data = CHUNK_STORE.read_version(digests, version["sha256"])
+    return compact_pdf_bytes(data) if version["incremental"] else data
+
+
+def read_version(path) -> bytes:
+    """
+    Bytes of a version given its path (as listed by the
+    history routes).
+    """
+    parsed = _parse_version_path(path)
+    if parsed is not None and CATALOG.get_version(*parsed) is not None:
+        return load_version(*parsed)
+    return Path(path).read_bytes()
 
-    return str(path)
+
+def version_dedup_stats(doc_id: str = None) -> dict:
+    """
+    Dedup ratio of the version store (one document or all).
+    """
+    return CATALOG.dedup_stats(doc_id)
 
 
 # -----------------------------------------
@@ -133,6 +323,13 @@ def load_pdf_bytes(doc_id: str) -> bytes:
     """
     folder = ensure_doc_folder(doc_id)
 
+    # Catalog knows the original name
+    doc = CATALOG.get_document(doc_id)
+    if doc and doc["original_name"]:
+        path = folder / f"original_{doc['original_name']}"
+        if path.exists():
+            return path.read_bytes()
+
     # Find original PDF
     for file in folder.iterdir():
         if file.name.startswith("original_") and file.suffix.lower() == ".pdf":
@@ -148,6 +345,32 @@ def save_pdf_version(doc_id: str, pdf_bytes: bytes) -> str:
     return save_version(doc_id, pdf_bytes)
 
 
+# -----------------------------------------
+# TAGS / LABELS + CATALOG QUERIES
+# -----------------------------------------
+def save_tags(doc_id: str, values, kind: str = "tag"):
+    """
+    Persist tags (kind="tag") or labels (kind="label").
+    """
+    CATALOG.add_tags(doc_id, list(values), kind)
+
+
+def delete_tag(doc_id: str, value: str, kind: str = "tag"):
+    CATALOG.remove_tag(doc_id, value, kind)
+
+
+def load_tags(doc_id: str, kind: str = "tag"):
+    return CATALOG.get_tags(doc_id, kind)
+
+
+def list_documents(**filters):
+    """
+    Catalog listing (tag, label, year, month, include_archived,
+    limit, offset), newest first.
+    """
+    return CATALOG.list_documents(**filters)
+
+
 def list_archives():
     """
     Return a list of all monthly and yearly archive ZIP files.
@@ -168,32 +391,18 @@ def list_archives():
 
 def get_audit_log(doc_id: str):
     """
-    Return audit log entries for a document, if stored on disk.
-    Adjust this to your actual audit storage format.
+    Return audit log entries for a document (oldest first).
     """
-    # Example: logs stored as JSONL per doc_id
-    log_file = AUDIT_FOLDER / f"{doc_id}.jsonl"
-    if not log_file.exists():
-        return []
-
-    entries = []
-    for line in log_file.read_text().splitlines():
-        try:
-            import json
-            entries.append(json.loads(line))
-        except Exception:
-            continue
-    return entries
+    return load_audit_log(doc_id)
 
 # -----------------------------------------
-# AUDIT LOGS
+# AUDIT LOGS (append-only JSONL, see audit_log.py)
 # -----------------------------------------
 def log_action(doc_id: str, action: str, details: dict):
     """
-    Append an audit log entry.
+    Append an audit log entry (written in the background).
     """
     folder = ensure_doc_folder(doc_id)
-    log_path = folder / "audit.json"
 
     entry = {
         "timestamp": timestamp(),
@@ -201,143 +410,262 @@ def log_action(doc_id: str, action: str, details: dict):
         "details": details
     }
 
-    if log_path.exists():
-        logs = json.loads(log_path.read_text())
-    else:
-        logs = []
-
-    logs.append(entry)
-    log_path.write_text(json.dumps(logs, indent=2))
+    append_entry(folder, entry)
+    CATALOG.record_activity(doc_id)
 
 
 def load_audit_log(doc_id: str):
     folder = ensure_doc_folder(doc_id)
-    log_path = folder / "audit.json"
+    return read_entries(folder)
 
-    if not log_path.exists():
-        return []
 
-    return json.loads(log_path.read_text())
+def migrate_audit_logs() -> int:
+    """
+    Convert every remaining audit.json to audit.jsonl.
+    Returns the number of migrated documents.
+    """
+    migrated = 0
+    for doc_folder in STORAGE_ROOT.iterdir():
+        if doc_folder.is_dir() and (doc_folder / LEGACY_AUDIT_FILENAME).exists():
+            migrate_legacy_log(doc_folder)
+            migrated += 1
+    return migrated
 
 
 # ---------------------------------------------------
-# Create a monthly archive ZIP
+# Archiving (one metadata scan, streamed ZIP)
 # ---------------------------------------------------
-def archive_month(year: int, month: int):
+# Documents are selected with one catalog query (months
+# with audited actions), their files are streamed straight
+# into the ZIP (no temp copies), and the selected folders
+# are removed once the ZIP is complete.
+#
+# PDFs are stored without re-compressing (their content
+# streams are already Flate-compressed, so deflating them
+# again costs CPU for ~no gain); other files are deflated.
+
+# Read/write size when streaming files into the ZIP
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+
+# Set ARCHIVE_COMPRESS_PDF=1 to deflate PDFs anyway
+ARCHIVE_COMPRESS_PDF = os.environ.get("ARCHIVE_COMPRESS_PDF", "0") == "1"
+
+
+def select_archive_documents(year: int, month: int = None):
     """
-    Create a ZIP file containing all documents from the given month.
-    After creating the ZIP, delete the original monthly data.
+    Document folders with any audited action in the given
+    month (or year): an indexed catalog query.
     """
-    month_name = calendar.month_name[month]
-    zip_name = f"{month_name}{year}.zip"
-    zip_path = MONTH_ARCHIVE / zip_name
+    selected = []
 
-    # Temporary folder to collect files
-    temp_folder = ARCHIVE_ROOT / f"temp_month_{year}_{month}"
-    temp_folder.mkdir(exist_ok=True)
+    for doc_id in CATALOG.active_documents(year, month):
+        doc_folder = STORAGE_ROOT / doc_id
+        if doc_folder.is_dir():
+            selected.append(doc_folder)
 
-    # Copy all doc folders that match the month/year
-    for doc_folder in STORAGE_ROOT.iterdir():
-        if not doc_folder.is_dir() or doc_folder.name == "archives":
-            continue
+    return selected
 
-        # Check audit log for timestamps
-        audit_path = doc_folder / "audit.json"
-        if not audit_path.exists():
-            continue
 
-        logs = json.loads(audit_path.read_text())
-        if not logs:
+def _archive_entries(folder: Path):
+    """
+    (arcname, size, mtime, open_chunks) for everything of one
+    document: its files, plus the versions that only exist in
+    the chunk store (rebuilt chunk by chunk while zipping).
+    """
+    entries = []
+
+    for file in sorted(folder.rglob("*")):
+        if file.is_file():
+            entries.append(file_zip_entry(file, f"{folder.name}/{file.relative_to(folder).as_posix()}"))
+
+    for version in CATALOG.get_versions(folder.name):
+        stored = CATALOG.get_version(folder.name, version["number"])
+        if stored is None or stored["chunks"] is None:
             continue
+        digests = [digest for digest, _ in stored["chunks"]]
+        if stored["incremental"]:
+            # Compacted while zipping (size: upper bound)
+            open_chunks = lambda number=version["number"]: iter([load_version(folder.name, number)])
+        else:
+            open_chunks = lambda digests=digests: CHUNK_STORE.iter_version(digests)
+        entries.append((
+            f"{folder.name}/{Path(version['path']).name}",
+            version["size"],
+            version["created_at"],
+            open_chunks,
+        ))
 
-        # Check if any action happened in this month
-        for entry in logs:
-            ts = datetime.strptime(entry["timestamp"], "%Y-%m-%d_%H-%M-%S")
-            if ts.year == year and ts.month == month:
-                shutil.copytree(doc_folder, temp_folder / doc_folder.name)
-                break
+    return entries
 
-    # Create ZIP
-    shutil.make_archive(str(zip_path.with_suffix("")), "zip", temp_folder)
 
-    # Cleanup temp folder
-    shutil.rmtree(temp_folder)
+def _file_chunks(file: Path):
+    with open(file, "rb") as src:
+        while True:
+            block = src.read(ARCHIVE_CHUNK_SIZE)
+            if not block:
+                return
+            yield block
 
-    # Cleanup original data
-    cleanup_after_archive(year=year, month=month)
 
-    return str(zip_path)
+def write_archive(zip_path: Path, folders, progress=None) -> int:
+    """
+    Stream every file of the given folders into zip_path
+    (as <doc_id>/<file>), chunk-stored versions included.
+    Written to a .tmp file and renamed when complete (removed
+    if anything fails, including a progress callback that
+    raises to cancel). progress(files_done, files_total,
+    bytes_done, bytes_total) is called after each file.
+    Returns the number of archived files.
+    """
+    entries = [entry for folder in folders for entry in _archive_entries(folder)]
+    total_bytes = sum(size for _, size, _, _ in entries)
 
+    tmp_path = zip_path.with_name(zip_path.name + ".tmp")
+    try:
+        _write_zip(tmp_path, entries, total_bytes, progress)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
-# ---------------------------------------------------
-# Create a yearly archive ZIP
-# ---------------------------------------------------
-def archive_year(year: int):
+    os.replace(tmp_path, zip_path)
+    return len(entries)
+
+
+def _zip_info(arcname: str, size: int, mtime: float) -> zipfile.ZipInfo:
+    zinfo = zipfile.ZipInfo(arcname, date_time=time.localtime(mtime)[:6])
+    zinfo.file_size = size
+
+    if arcname.lower().endswith(".pdf") and not ARCHIVE_COMPRESS_PDF:
+        zinfo.compress_type = zipfile.ZIP_STORED
+    else:
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+    return zinfo
+
+
+def _write_zip(tmp_path: Path, entries, total_bytes: int, progress=None):
+    done_bytes = 0
+    with zipfile.ZipFile(tmp_path, "w", allowZip64=True) as zf:
+        for i, (arcname, size, mtime, open_chunks) in enumerate(entries, start=1):
+            zinfo = _zip_info(arcname, size, mtime)
+            with zf.open(zinfo, "w", force_zip64=size > zipfile.ZIP64_LIMIT) as dst:
+                for block in open_chunks():
+                    dst.write(block)
+
+            done_bytes += size
+            if progress:
+                progress(i, len(entries), done_bytes, total_bytes)
+
+
+class _ZipSink:
     """
-    Create a ZIP file containing all documents from the given year.
-    After creating the ZIP, delete the original yearly data.
+    Write-only target for a ZIP that is sent while it is
+    being written (no seek: zipfile uses data descriptors).
     """
-    zip_name = f"{year}.zip"
-    zip_path = YEAR_ARCHIVE / zip_name
 
-    temp_folder = ARCHIVE_ROOT / f"temp_year_{year}"
-    temp_folder.mkdir(exist_ok=True)
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
 
-    for doc_folder in STORAGE_ROOT.iterdir():
-        if not doc_folder.is_dir() or doc_folder.name == "archives":
-            continue
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
 
-        audit_path = doc_folder / "audit.json"
-        if not audit_path.exists():
-            continue
+    def tell(self) -> int:
+        return self._pos
 
-        logs = json.loads(audit_path.read_text())
-        if not logs:
-            continue
+    def flush(self):
+        pass
 
-        for entry in logs:
-            ts = datetime.strptime(entry["timestamp"], "%Y-%m-%d_%H-%M-%S")
-            if ts.year == year:
-                shutil.copytree(doc_folder, temp_folder / doc_folder.name)
-                break
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
 
-    shutil.make_archive(str(zip_path.with_suffix("")), "zip", temp_folder)
-    shutil.rmtree(temp_folder)
 
-    cleanup_after_archive(year=year)
+def stream_zip(entries):
+    """
+    Generate a ZIP of (arcname, size, mtime, open_chunks)
+    entries piece by piece, e.g. for a StreamingResponse.
+    Memory use is bounded by one chunk, not the archive.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", allowZip64=True) as zf:
+        for arcname, size, mtime, open_chunks in entries:
+            zinfo = _zip_info(arcname, size, mtime)
+            with zf.open(zinfo, "w", force_zip64=size > zipfile.ZIP64_LIMIT) as dst:
+                for block in open_chunks():
+                    dst.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+    yield sink.drain()
+
+
+def file_zip_entry(path: Path, arcname: str):
+    """
+    stream_zip()/write_archive() entry for a file on disk.
+    """
+    stat = path.stat()
+    return arcname, stat.st_size, stat.st_mtime, lambda: _file_chunks(path)
+
+
+def _archive(zip_path: Path, year: int, month: int = None, progress=None, on_removed=None) -> str:
+    folders = select_archive_documents(year, month)
+    write_archive(zip_path, folders, progress)
+    FILE_INDEX.register(zip_path)
+
+    # Remove the archived documents (already selected, no second scan)
+    doc_ids = [f.name for f in folders]
+    CATALOG.release_versions(doc_ids, CHUNK_STORE.delete)
+    CATALOG.mark_archived(doc_ids, zip_path.name)
+    for doc_folder in folders:
+        shutil.rmtree(doc_folder, ignore_errors=True)
+        FILE_INDEX.remove_folder(doc_folder)
+
+    # Let the caller release what is still open for them
+    if on_removed is not None:
+        on_removed(doc_ids)
 
     return str(zip_path)
 
 
 # ---------------------------------------------------
-# Cleanup after archive
+# Create a monthly archive ZIP
 # ---------------------------------------------------
-def cleanup_after_archive(year: int, month: int = None):
+def archive_month(year: int, month: int, progress=None, on_removed=None):
     """
-    Delete all doc folders that belong to the given month/year.
+    Create a ZIP file containing all documents from the given month.
+    After creating the ZIP, delete the original monthly data.
+    on_removed(doc_ids) is called with the archived documents.
     """
-    for doc_folder in STORAGE_ROOT.iterdir():
-        if not doc_folder.is_dir() or doc_folder.name == "archives":
-            continue
+    month_name = calendar.month_name[month]
+    zip_name = f"{month_name}{year}.zip"
+    return _archive(MONTH_ARCHIVE / zip_name, year, month, progress, on_removed)
 
-        audit_path = doc_folder / "audit.json"
-        if not audit_path.exists():
-            continue
 
-        logs = json.loads(audit_path.read_text())
-        if not logs:
-            continue
+# ---------------------------------------------------
+# Create a yearly archive ZIP
+# ---------------------------------------------------
+def archive_year(year: int, progress=None, on_removed=None):
+    """
+    Create a ZIP file containing all documents from the given year.
+    After creating the ZIP, delete the original yearly data.
+    on_removed(doc_ids) is called with the archived documents.
+    """
+    zip_name = f"{year}.zip"
+    return _archive(YEAR_ARCHIVE / zip_name, year, progress=progress, on_removed=on_removed)
 
-        for entry in logs:
-            ts = datetime.strptime(entry["timestamp"], "%Y-%m-%d_%H-%M-%S")
 
-            if month is not None:
-                # Monthly cleanup
-                if ts.year == year and ts.month == month:
-                    shutil.rmtree(doc_folder)
-                    break
-            else:
-                # Yearly cleanup
-                if ts.year == year:
-                    shutil.rmtree(doc_folder)
-                    break
\ No newline at end of file
+# ---------------------------------------------------
+# Cleanup after archive
+# ---------------------------------------------------
+def cleanup_after_archive(year: int, month: int = None):
+    """
+    Delete all doc folders that belong to the given month/year.
+    """
+    for doc_folder in select_archive_documents(year, month):
+        shutil.rmtree(doc_folder)
+        FILE_INDEX.remove_folder(doc_folder)
+        CATALOG.release_versions([doc_folder.name], CHUNK_STORE.delete)
+        CATALOG.remove_documents([doc_folder.name])
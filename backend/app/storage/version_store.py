@@ -0,0 +1,113 @@
+# ---------------------------------------------------------
+# File: version_store.py
+# Path: backend/app/storage/version_store.py
+# ---------------------------------------------------------
+# Content-addressed chunk store for version history.
+#
+# Consecutive versions of a document differ in a few PDF
+# objects (the redacted pages); everything else serializes
+# to the same bytes. Versions are therefore split into
+# chunks at PDF object boundaries ("endobj"), with cut
+# points chosen from the content itself, and each chunk is
+# stored once under its SHA-256:
+#
+#     storage/chunks/ab/abcdef...
+#
+# A version is just its list of chunk hashes (the manifest,
+# kept in the catalog), and is rebuilt on the fly. Chunk
+# reference counts live in the catalog too.
+# ---------------------------------------------------------
+
+import hashlib
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Iterator, List
+
+# Chunk size bounds (bytes)
+CHUNK_MIN = int(os.environ.get("VERSION_CHUNK_MIN", 16 * 1024))
+CHUNK_MAX = int(os.environ.get("VERSION_CHUNK_MAX", 1024 * 1024))
+
+# A chunk ends after an object whose checksum has these low
+# bits clear (average ~64 objects per chunk once CHUNK_MIN
+# is reached)
+CUT_MASK = 0x3F
+
+_OBJECT_END = re.compile(rb"endobj\s*")
+
+
+def split_chunks(data: bytes) -> List[bytes]:
+    """
+    Content-defined chunks aligned to PDF object ends. The
+    same run of objects always yields the same chunks, so an
+    edited object only changes the chunk containing it.
+    Chunks never exceed CHUNK_MAX (big objects such as
+    images are cut into fixed pieces from their start).
+    """
+    view = memoryview(data)
+    chunks = []
+    start = 0
+    last_end = 0
+
+    def emit(end):
+        nonlocal start
+        while end - start > CHUNK_MAX:
+            chunks.append(bytes(view[start:start + CHUNK_MAX]))
+            start += CHUNK_MAX
+        if end > start:
+            chunks.append(bytes(view[start:end]))
+            start = end
+
+    for match in _OBJECT_END.finditer(data):
+        end = match.end()
+        obj_crc = zlib.crc32(view[last_end:end])
+        last_end = end
+
+        if end - start >= CHUNK_MIN and (obj_crc & CUT_MASK) == 0:
+            emit(end)
+        elif end - start >= CHUNK_MAX:
+            emit(end)
+
+    emit(len(data))
+    return chunks
+
+
+class ChunkStore:
+    """
+    Chunks on disk, named by their SHA-256.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, chunk: bytes) -> str:
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(chunk)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        return self._path(digest).read_bytes()
+
+    def delete(self, digest: str):
+        self._path(digest).unlink(missing_ok=True)
+
+    def iter_version(self, digests: List[str]) -> Iterator[bytes]:
+        for digest in digests:
+            yield self.get(digest)
+
+    def read_version(self, digests: List[str], sha256: str | None = None) -> bytes:
+        data = b"".join(self.iter_version(digests))
+        if sha256 is not None and hashlib.sha256(data).hexdigest() != sha256:
+            raise IOError("Version content does not match its checksum")
+        return data
@@ -0,0 +1,144 @@
+# ---------------------------------------------------------
+# File: executors.py
+# Path: backend/app/utils/executors.py
+# ---------------------------------------------------------
+# Execution layer for blocking work.
+#
+# Routes are async, but PDF processing (PyMuPDF), NER
+# (spaCy) and LLM calls (requests) are synchronous. Running
+# them inline stalls the event loop for every other request.
+# Routes hand that work to a bounded pool instead:
+#
+#     result = await run_blocking("pdf", redact_box, doc_id, ...)
+#
+# One pool per kind of work, each configurable through the
+# environment as "<mode>:<workers>", for example:
+#     EXECUTOR_PDF=thread:4
+#     EXECUTOR_NER=process:2
+#     EXECUTOR_LLM=thread:8
+#     EXECUTOR_SHARD=process:8
+#     EXECUTOR_OCR=process:8
+#     EXECUTOR_JOB=thread:4
+#
+# Modes:
+# - thread:  shared memory, fine for code that reads/writes
+#            the in-memory document state
+# - process: true parallelism for pure functions only
+#            (arguments/results must be picklable)
+# - inline:  run on the event loop (old behaviour, debugging)
+# ---------------------------------------------------------
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Tuple
+
+
+# Default mode + worker count per kind of work
+DEFAULT_EXECUTORS: Dict[str, Tuple[str, int]] = {
+    "pdf": ("thread", 4),   # PyMuPDF open / search / apply / save
+    "ner": ("thread", 2),   # spaCy + regex suggestions
+    "llm": ("thread", 8),   # blocking HTTP calls to the LLM
+    "io": ("thread", 2),    # archiving and other disk-heavy work
+    "job": ("thread", 4),   # background jobs (services/jobs.py)
+    "bulk": ("thread", 4),  # per-document work of bulk batches
+    "shard": ("process", os.cpu_count() or 2),  # page shards of large PDFs
+    "ocr": ("process", os.cpu_count() or 2),    # Tesseract on scanned pages
+}
+
+MODES = ("thread", "process", "inline")
+
+_lock = threading.Lock()
+_config: Dict[str, Tuple[str, int]] = {}
+_pools: Dict[str, Executor] = {}
+
+
+def _parse(value: str, default: Tuple[str, int]) -> Tuple[str, int]:
+    mode, _, workers = value.partition(":")
+    mode = mode.strip() or default[0]
+    if mode not in MODES:
+        raise ValueError(f"Unknown executor mode: {mode}")
+    return mode, int(workers) if workers else default[1]
+
+
+def _load_config():
+    for name, default in DEFAULT_EXECUTORS.items():
+        env = os.environ.get(f"EXECUTOR_{name.upper()}")
+        _config[name] = _parse(env, default) if env else default
+
+
+_load_config()
+
+
+def configure_executor(name: str, mode: str, workers: int | None = None):
+    """
+    Change the mode/size of one pool at runtime. The previous
+    pool (if any) finishes its queued work in the background.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown executor mode: {mode}")
+
+    with _lock:
+        current = _config.get(name, ("thread", 2))
+        _config[name] = (mode, workers or current[1])
+        old = _pools.pop(name, None)
+
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def get_executor(name: str) -> Executor | None:
+    """
+    Return the pool for a kind of work (created on first use),
+    or None when that kind runs inline.
+    """
+    with _lock:
+        if name not in _config:
+            raise KeyError(f"Unknown executor: {name}")
+
+        mode, workers = _config[name]
+        if mode == "inline":
+            return None
+
+        pool = _pools.get(name)
+        if pool is None:
+            if mode == "process":
+                pool = ProcessPoolExecutor(max_workers=workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-worker")
+            _pools[name] = pool
+        return pool
+
+
+def executor_workers(name: str) -> int:
+    """
+    Configured worker count for a kind of work (1 when inline).
+    """
+    with _lock:
+        mode, workers = _config[name]
+    return 1 if mode == "inline" else workers
+
+
+async def run_blocking(name: str, fn, *args, **kwargs):
+    """
+    Run a blocking function on the named pool and await it.
+    Exceptions (including HTTPException) propagate unchanged.
+    """
+    pool = get_executor(name)
+    if pool is None:
+        return fn(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_executors(wait: bool = True):
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.shutdown(wait=wait)
+
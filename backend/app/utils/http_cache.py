@@ -0,0 +1,133 @@
+# ---------------------------------------------------------
+# File: http_cache.py
+# Path: backend/app/utils/http_cache.py
+# ---------------------------------------------------------
+# Conditional and partial responses for documents (/view,
+# /save, page images):
+# - every response carries a strong ETag
+# - If-None-Match with the current ETag -> 304, no body
+# - "Range: bytes=..." -> 206 with that slice (one range;
+#   multi-range requests get the whole document), 416 when
+#   it lies past the end; If-Range falls back to 200 when
+#   the document changed
+# - documents on disk are streamed from an open file handle
+#   (exactly `size` bytes) instead of being read into memory;
+#   callers may pass a handle they opened together with the
+#   ETag (incremental_pdf.export_pdf_source), so both always
+#   describe the same file
+# ---------------------------------------------------------
+
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+# Read size when streaming a file
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """
+    If-None-Match comparison (weak, so W/"x" matches "x").
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def _byte_range(header: str | None, size: int) -> Tuple[int, int] | None:
+    """
+    [start, stop) for a single "bytes=" range; None to send
+    the whole document. Raises ValueError when unsatisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    first, dash, last = header[len("bytes="):].strip().partition("-")
+    valid = (
+        dash
+        and (first.isdigit() or not first)
+        and (last.isdigit() or not last)
+        and (first or last)
+        and not (first and last and int(last) < int(first))
+    )
+    if not valid:
+        return None  # malformed: ignore the header
+
+    if not first:
+        # Suffix: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - length, 0), size
+
+    start = int(first)
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(int(last) + 1, size) if last else size
+
+
+def _stream_file(handle, start: int, stop: int) -> Iterator[bytes]:
+    try:
+        handle.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = handle.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def document_response(
+    request: Request,
+    source,
+    etag: str,
+    media_type: str = "application/pdf",
+    headers: dict | None = None,
+) -> Response:
+    """
+    source: bytes, or (path or open binary file, size) for a
+    file on disk whose first `size` bytes are the document.
+    A file passed in open is closed once the response is done.
+    """
+    headers = {**(headers or {}), "ETag": etag, "Accept-Ranges": "bytes"}
+
+    in_memory = isinstance(source, (bytes, bytearray))
+    handle = None if in_memory or isinstance(source[0], (str, Path)) else source[0]
+    size = len(source) if in_memory else source[1]
+
+    def done(response: Response) -> Response:
+        if handle is not None:
+            handle.close()
+        return response
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return done(Response(status_code=304, headers=headers))
+
+    status = 200
+    start, stop = 0, size
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range.strip() == etag:
+        try:
+            found = _byte_range(request.headers.get("range"), size)
+        except ValueError:
+            return done(Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"}))
+        if found is not None:
+            status = 206
+            start, stop = found
+            headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+
+    if in_memory:
+        return Response(content=bytes(source[start:stop]), status_code=status, media_type=media_type, headers=headers)
+
+    # Open now (if not already): later rewrites (os.replace) don't affect us
+    if handle is None:
+        handle = open(Path(source[0]), "rb")
+    headers["Content-Length"] = str(stop - start)
+    return StreamingResponse(_stream_file(handle, start, stop), status_code=status, media_type=media_type, headers=headers)
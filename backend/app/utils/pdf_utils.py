@@ -1,8 +1,18 @@
+import io
+import os
+from pathlib import Path
+
 import fitz  # PyMuPDF
-from PIL import Image
-import pytesseract
+from PIL import Image, ImageOps, ImageSequence
 from typing import Tuple
 
+# Image uploads converted to PDF (image_to_pdf)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff")
+
+# Resolution assumed for images without a usable DPI
+# (phone photos say 72 or nothing); matches the OCR default
+IMAGE_DEFAULT_DPI = int(os.environ.get("IMAGE_DEFAULT_DPI", os.environ.get("OCR_DPI", 300)))
+
 
 # ---------------------------------------------------------
 # Extract text from PDF
@@ -84,12 +94,84 @@ def redact_box_in_pdf(
 # ---------------------------------------------------------
 # Image → PDF conversion
 # ---------------------------------------------------------
-def image_to_pdf(image_path: str, pdf_path: str):
+def is_image_file(filename: str) -> bool:
+    return Path(filename).suffix.lower() in IMAGE_EXTENSIONS
+
+
+def _frame_dpi(frame: Image.Image) -> float:
+    dpi = frame.info.get("dpi")
+    try:
+        value = float(dpi[0]) if dpi else 0.0
+    except (TypeError, ValueError, IndexError):
+        value = 0.0
+    return value if value >= 100 else IMAGE_DEFAULT_DPI
+
+
+def _frame_stream(image: Image.Image, frame: Image.Image) -> Tuple[bytes, Tuple[int, int]]:
     """
-    Convert PNG/JPG to PDF so we can use the same redaction and viewer pipelines.
+    Encoded image data + pixel size for one frame. Upright
+    JPEGs are embedded as-is; everything else is rotated per
+    EXIF and stored losslessly (PNG).
     """
-    img = Image.open(image_path).convert("RGB")
-    img.save(pdf_path, "PDF", resolution=100.0)
+    if image.format == "JPEG" and image.getexif().get(0x0112, 1) == 1:
+        image.fp.seek(0)
+        return image.fp.read(), frame.size
+
+    frame = ImageOps.exif_transpose(frame)
+    if frame.mode == "LA":
+        frame = frame.convert("L")
+    elif frame.mode not in ("1", "L", "RGB"):
+        frame = frame.convert("RGB")
+
+    buffer = io.BytesIO()
+    frame.save(buffer, "PNG")
+    return buffer.getvalue(), frame.size
+
+
+def image_to_pdf(image, pdf_path: str) -> int:
+    """
+    Convert PNG/JPG/TIFF (bytes or a path) to PDF so we can use
+    the same redaction and viewer pipelines. One page per frame
+    (multi-page TIFF); frames are decoded one at a time, so only
+    the current frame is ever held uncompressed. Page size
+    follows the image DPI. Returns the number of pages.
+    """
+    if isinstance(image, (bytes, bytearray)):
+        image = io.BytesIO(image)
+
+    doc = fitz.open()
+    try:
+        with Image.open(image) as img:
+            for frame in ImageSequence.Iterator(img):
+                stream, (width, height) = _frame_stream(img, frame)
+                scale = 72.0 / _frame_dpi(frame)
+
+                page = doc.new_page(width=width * scale, height=height * scale)
+                page.insert_image(page.rect, stream=stream)
+                del stream
+
+        if not len(doc):
+            raise ValueError("Image has no frames")
+        doc.save(pdf_path, garbage=3, deflate=True)
+        return len(doc)
+    finally:
+        doc.close()
+
+
+# ---------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------
+def compact_pdf_bytes(pdf_bytes: bytes) -> bytes:
+    """
+    Full rewrite without superseded or unused objects, i.e.
+    without the earlier object versions an incremental update
+    leaves in the file.
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        return doc.tobytes(garbage=1)
+    finally:
+        doc.close()
 
 
 # ---------------------------------------------------------
@@ -99,6 +181,8 @@ def ocr_image(image_path: str) -> str:
     """
     Extract text from image using Tesseract OCR.
     """
+    import pytesseract
+
     img = Image.open(image_path)
     text = pytesseract.image_to_string(img)
     return text
\ No newline at end of file
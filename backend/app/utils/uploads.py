@@ -0,0 +1,213 @@
+# ---------------------------------------------------------
+# File: uploads.py
+# Path: backend/app/utils/uploads.py
+# ---------------------------------------------------------
+# Streaming upload handling.
+#
+# Size limits are enforced on the request body itself, as it
+# arrives (UploadLimitMiddleware): a Content-Length above the
+# limit is refused with 413 before anything is read, and a
+# body that grows past it (chunked, or a wrong length) is cut
+# off at that point. By the time an endpoint runs, Starlette
+# has parsed the multipart body into UploadFiles (first MB in
+# memory, the rest in an anonymous temporary file).
+#
+# spool_upload() then reads each UploadFile in chunks, once:
+# - the SHA-256 is computed on the fly
+# - UPLOAD_MAX_BYTES is checked per file (413), e.g. for
+#   one file of a /bulk request
+# - small uploads stay in memory; once an upload grows past
+#   UPLOAD_SPOOL_MEMORY it is moved to a file in UPLOAD_DIR
+#   and the rest is streamed there
+# That is one disk copy of a large upload: Starlette's
+# temporary file has no name, so it can't be moved or
+# opened by path.
+#
+# A spooled file is then handed to the document as-is
+# (keep_as): PyMuPDF opens it from disk and the document
+# store reads it lazily, so no full in-memory copy is made
+# unless something needs the bytes.
+# ---------------------------------------------------------
+
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+from .executors import run_blocking
+
+# Largest accepted upload (bytes)
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", 200 * 1024 * 1024))
+
+# Uploads up to this size are kept in memory
+UPLOAD_SPOOL_MEMORY = int(os.environ.get("UPLOAD_SPOOL_MEMORY", 16 * 1024 * 1024))
+
+# Largest accepted /bulk request, all files together (bytes)
+BULK_MAX_BYTES = int(os.environ.get("BULK_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+
+# Multipart framing + form fields on top of the file itself
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+# Request body limits by path (UploadLimitMiddleware)
+UPLOAD_REQUEST_LIMITS = {
+    "/upload": UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD,
+    "/bulk": BULK_MAX_BYTES,
+}
+
+# Read size per chunk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Uploaded files back in-memory documents, which don't
+# survive a restart either
+UPLOAD_DIR = Path(os.environ.get("UPLOAD_DIR", "storage/uploads"))
+shutil.rmtree(UPLOAD_DIR, ignore_errors=True)
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class SpooledUpload:
+    """
+    One received upload: in memory (data) or in a file
+    (path), plus its size and SHA-256.
+    """
+
+    def __init__(self, filename: str, max_memory: int = UPLOAD_SPOOL_MEMORY):
+        self.filename = filename
+        self.size = 0
+        self.sha256 = None
+        self.path: Path | None = None
+
+        self._max_memory = max_memory
+        self._hash = hashlib.sha256()
+        self._buffer = bytearray()
+        self._file = None
+
+    @property
+    def on_disk(self) -> bool:
+        return self.path is not None
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        self._hash.update(chunk)
+
+        if self._file is None and len(self._buffer) + len(chunk) > self._max_memory:
+            # Roll over to disk
+            self.path = UPLOAD_DIR / f"{uuid.uuid4()}.part"
+            self._file = open(self.path, "wb")
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer.extend(chunk)
+
+    def finish(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.sha256 = self._hash.hexdigest()
+
+    def keep_as(self, path: Path) -> bytes | Path:
+        """
+        Content for the consumer: the file (moved to `path`)
+        for spooled uploads, the bytes otherwise.
+        """
+        if self.path is None:
+            return bytes(self._buffer)
+        shutil.move(self.path, path)
+        self.path = Path(path)
+        return self.path
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+            self.path = None
+        self._buffer = bytearray()
+
+
+async def spool_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    """
+    Receive an upload chunk by chunk (413 past max_bytes,
+    400 when empty).
+    """
+    upload = SpooledUpload(file.filename or "document.pdf")
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if upload.size + len(chunk) > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File exceeds the upload limit of {max_bytes} bytes",
+                )
+            if upload.on_disk:
+                await run_blocking("io", upload.write, chunk)
+            else:
+                upload.write(chunk)
+    except BaseException:
+        upload.discard()
+        raise
+
+    upload.finish()
+    if upload.size == 0:
+        upload.discard()
+        raise HTTPException(status_code=400, detail="Empty file")
+    return upload
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Request body exceeds the upload limit of {limit} bytes")
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware enforcing UPLOAD_REQUEST_LIMITS on the
+    raw request body: 413 up front from Content-Length, or
+    as soon as the received bytes pass the limit (raised from
+    receive(), which FastAPI passes through while parsing the
+    form).
+    """
+
+    def __init__(self, app, limits: dict = None):
+        self.app = app
+        self.limits = UPLOAD_REQUEST_LIMITS if limits is None else limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            error = _too_large(limit)
+            response = JSONResponse({"detail": error.detail}, status_code=413, headers={"Connection": "close"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise _too_large(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def upload_path(doc_id: str, suffix: str = ".pdf") -> Path:
+    """
+    Where the uploaded file of a document is kept (images
+    until they are converted to the document's PDF).
+    """
+    return UPLOAD_DIR / f"{doc_id}{suffix}"
@@ -0,0 +1,100 @@
+# ============================================================
+# BENCHMARK: audit logging, 10k actions on one document
+# ============================================================
+# Compares the previous log_action (read + rewrite the whole
+# audit.json per action) with the append-only JSONL writer:
+# - caller-side latency per action (p50 / p99)
+# - total time until every entry is durable on disk
+# - read-back time via load_audit_log
+#
+# The legacy writer is quadratic, so it runs on fewer actions
+# by default (LEGACY_ACTIONS) and is extrapolated.
+#
+# Run from backend/:
+#     python -m benchmarks.bench_audit_log
+# ============================================================
+
+import json
+import math
+import os
+import statistics
+import tempfile
+import time
+
+# storage.py creates its folders relative to the working dir
+os.chdir(tempfile.mkdtemp(prefix="bench_audit_"))
+
+from app.storage import storage  # noqa: E402
+from app.storage.audit_log import AUDIT_WRITER  # noqa: E402
+
+
+ACTIONS = 10_000
+LEGACY_ACTIONS = 2_000
+
+
+def legacy_log_action(doc_id, action, details):
+    # log_action as it was before audit.jsonl
+    folder = storage.ensure_doc_folder(doc_id)
+    log_path = folder / "audit.json"
+
+    entry = {"timestamp": storage.timestamp(), "action": action, "details": details}
+
+    if log_path.exists():
+        logs = json.loads(log_path.read_text())
+    else:
+        logs = []
+
+    logs.append(entry)
+    log_path.write_text(json.dumps(logs, indent=2))
+
+
+def details(i):
+    return {"target_text": f"term {i}", "hits": i % 7}
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def run(name, log, doc_id, n, flush=None):
+    latencies = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        s = time.perf_counter()
+        log(doc_id, "text_redaction", details(i))
+        latencies.append(time.perf_counter() - s)
+    if flush:
+        flush()
+    total = time.perf_counter() - t0
+
+    print(
+        f"{name:<8} {n:>6} actions  total {total:8.2f}s  "
+        f"p50 {statistics.median(latencies) * 1e6:8.1f}us  "
+        f"p99 {percentile(latencies, 99) * 1e6:8.1f}us"
+    )
+    return total
+
+
+def main():
+    print(f"working dir: {os.getcwd()}")
+
+    legacy_total = run("legacy", legacy_log_action, "legacy-doc", LEGACY_ACTIONS)
+    # O(n^2): time grows with the square of the action count
+    print(f"legacy   extrapolated to {ACTIONS}: ~{legacy_total * (ACTIONS / LEGACY_ACTIONS) ** 2:.0f}s")
+
+    run("jsonl", storage.log_action, "jsonl-doc", ACTIONS, flush=AUDIT_WRITER.flush)
+    print(f"jsonl    batches: {AUDIT_WRITER.batches} (avg {AUDIT_WRITER.written / max(AUDIT_WRITER.batches, 1):.1f} entries/fsync)")
+
+    t0 = time.perf_counter()
+    entries = storage.load_audit_log("jsonl-doc")
+    print(f"read     {len(entries)} entries in {time.perf_counter() - t0:.3f}s")
+
+    # Migration of the legacy file
+    t0 = time.perf_counter()
+    migrated = storage.load_audit_log("legacy-doc")
+    print(f"migrate  {len(migrated)} entries in {time.perf_counter() - t0:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# ============================================================
+# BENCHMARK: /view latency while /redact/auto runs
+# ============================================================
+# Measures p50/p99 latency of GET /view/{doc_id} while a
+# background client keeps uploading + auto-redacting a large
+# synthetic document, with blocking work run inline on the
+# event loop vs. on the executor pools.
+#
+# Run from backend/:
+#     python -m benchmarks.bench_concurrency
+#
+# If the spaCy redaction model isn't available, the load
+# falls back to /redact/multiple with 300 terms (same PDF
+# work, no NER).
+# ============================================================
+
+import asyncio
+import math
+import statistics
+import time
+
+import httpx
+
+from app.main import app
+from app.services import redaction_suggestion_service
+from app.utils.executors import configure_executor
+from benchmarks.synthetic import make_pdf, make_terms
+
+
+PAGES = 60
+DURATION_S = 15
+THINK_S = 0.005
+
+
+async def upload(client, pdf_bytes):
+    res = await client.post("/upload", files={"file": ("bench.pdf", pdf_bytes, "application/pdf")})
+    return res.json()["doc_id"]
+
+
+async def background_load(client, pdf_bytes, terms, stop):
+    use_auto = redaction_suggestion_service.nlp is not None
+    rounds = 0
+
+    while not stop.is_set():
+        doc_id = await upload(client, pdf_bytes)
+        if use_auto:
+            await client.post("/redact/auto", json={"doc_id": doc_id})
+        else:
+            spans = [{"text": t, "start": 0, "end": len(t)} for t in terms]
+            await client.post("/redact/multiple", json={"doc_id": doc_id, "spans": spans})
+        rounds += 1
+
+        # In-process transport: yield so /view requests get a turn
+        await asyncio.sleep(0)
+
+    return rounds
+
+
+async def measure(mode):
+    for name in ("pdf", "ner"):
+        configure_executor(name, mode)
+
+    terms = make_terms(300)
+    pdf_bytes = make_pdf(PAGES, terms)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        view_doc = await upload(client, make_pdf(5, []))
+
+        stop = asyncio.Event()
+        load = asyncio.create_task(background_load(client, pdf_bytes, terms, stop))
+        await asyncio.sleep(0.2)
+
+        latencies = []
+        deadline = time.perf_counter() + DURATION_S
+        while time.perf_counter() < deadline:
+            # Latency counts from when the viewer wants the page,
+            # so time spent waiting for a blocked loop is included
+            t0 = time.perf_counter()
+            await asyncio.sleep(THINK_S)
+            await client.get(f"/view/{view_doc}")
+            latencies.append((time.perf_counter() - t0 - THINK_S) * 1000)
+
+        stop.set()
+        rounds = await load
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[math.ceil(len(latencies) * 0.99) - 1]
+    print(f"{mode:>8} {len(latencies):>8} {p50:>10.1f} {p99:>10.1f} {latencies[-1]:>10.1f} {rounds:>8}")
+
+
+def main():
+    if redaction_suggestion_service.nlp is None:
+        print("[INFO] Redaction model not loaded: load uses /redact/multiple\n")
+
+    print(f"{'mode':>8} {'views':>8} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10} {'rounds':>8}")
+    for mode in ("inline", "thread"):
+        asyncio.run(measure(mode))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# ============================================================
+# BENCHMARK: per-redaction cost, full rewrite vs. incremental
+# ============================================================
+# For documents of growing size (pages carrying a ~1 MB
+# incompressible image, like a scan), applies single-box
+# redactions and measures per operation:
+# - full:        open from bytes + apply + doc.tobytes()
+#                (what every redaction did before)
+# - incremental: apply_page_redactions() on the working
+#                copy (saveIncr + tail append)
+# plus the cost of one compaction at each size.
+#
+# Second table: the full cycle of one text redaction in the
+# UI with default options (save_versions on), i.e. redaction +
+# saved version + viewer reload:
+# - reload:  version of the whole working file, then GET /view
+#            (export_pdf_source(): compaction + PDF download),
+#            what every redaction used to do
+# - pages:   apply_text_redaction() as is (version of the
+#            appended tail only), then GET /view/{doc}/pages and
+#            the touched page image, like the viewer does now
+# with the bytes the version store actually wrote for the
+# OPS versions (the first one stores the whole document).
+#
+# Run from backend/:
+#     python -m benchmarks.bench_incremental
+# ============================================================
+
+import os
+import statistics
+import tempfile
+import time
+
+# storage/working is created relative to the working dir
+os.chdir(tempfile.mkdtemp(prefix="bench_incr_"))
+
+import fitz  # noqa: E402
+
+from app.services import incremental_pdf  # noqa: E402
+from app.services.page_render_service import page_info, render_page  # noqa: E402
+from app.services.pdf_service import update_pdf_bytes  # noqa: E402
+from app.services.redaction_service import apply_text_redaction  # noqa: E402
+from app.services.layout_index import get_layout  # noqa: E402
+from app.services.upload_service import ingest_pdf  # noqa: E402
+from app.state.memory import DOC_PDF_BYTES, DOC_REVISION, DOC_TEXT  # noqa: E402
+from app.storage.storage import save_version, version_dedup_stats, read_version  # noqa: E402
+
+
+SIZES_PAGES = [4, 16, 64]
+OPS = 10
+IMAGE_SIDE = 600  # 600x600 RGB ~ 1 MB
+
+
+def make_scanned_pdf(pages):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        for line in range(8):
+            page.insert_text((50, 60 + 18 * line), f"Client: Acme Labs {i}-{line} LOT-{i:06d}", fontsize=9)
+        pix = fitz.Pixmap(fitz.csRGB, IMAGE_SIDE, IMAGE_SIDE, os.urandom(IMAGE_SIDE * IMAGE_SIDE * 3), 0)
+        page.insert_image(fitz.Rect(50, 250, 550, 750), pixmap=pix)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def box(i):
+    # One text line, above the image
+    y = 50 + 18 * (i % 8)
+    return fitz.Rect(45, y, 400, y + 14)
+
+
+def full_rewrite(pdf_bytes, page, rect):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    doc[page].add_redact_annot(rect, fill=(0, 0, 0))
+    doc[page].apply_redactions()
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _lot_span(doc_id, i, pages):
+    # One "LOT-..." occurrence per operation, on page i % pages
+    token = f"LOT-{i % pages:06d}"
+    start = DOC_TEXT[doc_id].find(token)
+    return start, start + len(token)
+
+
+def bench_versions(pages, pdf_bytes):
+    """
+    (ms per redact -> version -> view cycle, MB stored for all
+    versions) for the old reload path and the page path.
+    """
+    results = {}
+    for mode in ("reload", "pages"):
+        doc_id = f"bench-{mode}-{pages}"
+        ingest_pdf(doc_id, "bench.pdf", pdf_bytes)
+
+        times = []
+        for i in range(OPS):
+            start, end = _lot_span(doc_id, i, pages)
+            t0 = time.perf_counter()
+            if mode == "pages":
+                apply_text_redaction(doc_id, start, end)
+                versions = [p["version"] for p in page_info(doc_id)["pages"]]
+                render_page(doc_id, i % pages, 1.5)
+            else:
+                layout = get_layout(doc_id)
+                incremental_pdf.apply_page_redactions(doc_id, layout.span_rects(start, end), len(layout.pages))
+                working = incremental_pdf.DOC_WORKING_COPY[doc_id]
+                save_version(doc_id, working.path.read_bytes(), incremental=True)
+                _, source = incremental_pdf.export_pdf_source(doc_id)
+                if isinstance(source, tuple):
+                    with source[0] as f:
+                        f.read()
+            times.append(time.perf_counter() - t0)
+            if mode == "pages":
+                assert versions[i % pages] > 0, "touched page kept its version"
+            else:
+                DOC_TEXT[doc_id] = DOC_TEXT[doc_id][:start] + "█" * (end - start) + DOC_TEXT[doc_id][end:]
+
+        stats = version_dedup_stats(doc_id)
+        results[mode] = (statistics.median(times) * 1000, stats["stored_bytes"] / 1e6)
+
+    # Snapshot versions come back compacted: one xref section,
+    # nothing redacted left
+    last = read_version(f"storage/documents/bench-pages-{pages}/v{OPS:03d}.pdf")
+    doc = fitz.open(stream=last, filetype="pdf")
+    assert last.count(b"startxref") == 1, "version read back with incremental updates"
+    redacted = len(range(0, OPS, pages))  # page-0 operations
+    assert doc[0].get_text().count("LOT-000000") == 8 - redacted, "redacted text in a version"
+    doc.close()
+    return results
+
+
+def main():
+    compact_defaults = incremental_pdf.PDF_COMPACT_EVERY, incremental_pdf.PDF_COMPACT_RATIO
+    incremental_pdf.PDF_COMPACT_EVERY = OPS + 1
+    incremental_pdf.PDF_COMPACT_RATIO = 10.0
+    samples = {}
+
+    print(f"{'pages':>5} {'size MB':>8} | {'full ms':>8} {'full MB/op':>10} | {'incr ms':>8} {'incr KB/op':>10} | {'compact ms':>10}")
+
+    for pages in SIZES_PAGES:
+        pdf_bytes = make_scanned_pdf(pages)
+
+        # Full rewrite per operation
+        data = pdf_bytes
+        full_times = []
+        for i in range(OPS):
+            t0 = time.perf_counter()
+            data = full_rewrite(data, i % pages, box(i))
+            full_times.append(time.perf_counter() - t0)
+
+        # Incremental updates on the working copy
+        doc_id = f"bench-{pages}"
+        DOC_PDF_BYTES[doc_id] = pdf_bytes
+        DOC_REVISION[doc_id] = 0
+        update_pdf_bytes(doc_id, pdf_bytes)
+
+        incr_times, written = [], []
+        for i in range(OPS):
+            t0 = time.perf_counter()
+            written.append(incremental_pdf.apply_page_redactions(doc_id, {i % pages: [box(i)]}, pages))
+            incr_times.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        incremental_pdf.compact(doc_id)
+        compact_ms = (time.perf_counter() - t0) * 1000
+
+        print(
+            f"{pages:>5} {len(pdf_bytes) / 1e6:>8.1f} | "
+            f"{statistics.median(full_times) * 1000:>8.1f} {len(data) / 1e6:>10.1f} | "
+            f"{statistics.median(incr_times) * 1000:>8.1f} {statistics.median(written) / 1e3:>10.1f} | "
+            f"{compact_ms:>10.1f}"
+        )
+        samples[pages] = pdf_bytes
+
+    # Default options from here on
+    incremental_pdf.PDF_COMPACT_EVERY, incremental_pdf.PDF_COMPACT_RATIO = compact_defaults
+    print()
+    print(f"{'pages':>5} | {'reload ms':>9} {'stored MB':>9} | {'pages ms':>8} {'stored MB':>9}")
+    for pages, pdf_bytes in samples.items():
+        results = bench_versions(pages, pdf_bytes)
+        print(
+            f"{pages:>5} | {results['reload'][0]:>9.1f} {results['reload'][1]:>9.1f} | "
+            f"{results['pages'][0]:>8.1f} {results['pages'][1]:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
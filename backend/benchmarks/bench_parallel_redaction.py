@@ -0,0 +1,122 @@
+# ============================================================
+# BENCHMARK: serial vs page-sharded redaction
+# ============================================================
+# Applies the same blackout rectangles to 10/100/1000-page
+# synthetic documents serially and in page shards, checks
+# that every page's text and the document structure (page
+# labels, outline, metadata, XMP, embedded files, form
+# fields, links) are identical, and times both. The merged
+# output must not be noticeably bigger than the serial one
+# (resources shared across shards stored once, not per shard).
+#
+# "+struct" rows carry all of that structure (plus a link
+# from the first to the last page, across shards); sharding
+# must fall back to serial for them instead of losing it.
+#
+# Run from backend/:
+#     python -m benchmarks.bench_parallel_redaction
+# ============================================================
+
+import time
+
+import fitz  # PyMuPDF
+
+from app.services.layout_index import build_layout
+from app.services.parallel_redaction import redact_pages_serial, redact_pages_sharded
+from app.services.redaction_engine import find_term_rects
+from app.utils.executors import executor_workers, shutdown_executors
+from benchmarks.synthetic import make_pdf, make_terms
+
+
+# Sharded output may be at most this much bigger than serial
+SIZE_TOLERANCE = 1.1
+
+
+def page_texts(pdf_bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    texts = [page.get_text() for page in doc]
+    doc.close()
+    return texts
+
+
+def add_structure(pdf_bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    last = len(doc) - 1
+    doc.set_page_labels([{"startpage": 0, "prefix": "CoA-", "style": "D", "firstpagenum": 1}])
+    doc.set_toc([[1, "First", 1], [1, "Last", last + 1]])
+    doc.set_metadata({"title": "Synthetic CoA batch"})
+    doc.set_xml_metadata('<x:xmpmeta xmlns:x="adobe:ns:meta/"/>')
+    doc.embfile_add("notes.txt", b"lab notes")
+    doc[0].insert_link({"kind": fitz.LINK_GOTO, "from": fitz.Rect(400, 20, 560, 40), "page": last})
+
+    widget = fitz.Widget()
+    widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+    widget.field_name = "reviewer"
+    widget.field_value = "QA"
+    widget.rect = fitz.Rect(400, 780, 560, 800)
+    doc[last].add_widget(widget)
+
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def structure(pdf_bytes):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    summary = {
+        "labels": [page.get_label() for page in doc],
+        "toc": doc.get_toc(),
+        "title": doc.metadata.get("title"),
+        "xmp": doc.get_xml_metadata(),
+        "embedded": doc.embfile_names(),
+        "fields": [(page.number, w.field_name, w.field_value) for page in doc for w in page.widgets()],
+        "links": [(page.number, link.get("page")) for page in doc for link in page.get_links()],
+    }
+    doc.close()
+    return summary
+
+
+def main():
+    workers = executor_workers("shard")
+    terms = make_terms(50)
+
+    print(f"shard workers: {workers}\n")
+    print(
+        f"{'pages':>13} {'hits':>7} {'serial s':>10} {'sharded s':>10} {'speedup':>8} "
+        f"{'serial MB':>10} {'sharded MB':>10} {'identical':>10} {'structure':>10}"
+    )
+
+    cases = [(pages, False) for pages in (10, 100, 1000)] + [(100, True), (1000, True)]
+    for pages, structured in cases:
+        pdf_bytes = make_pdf(pages, terms)
+        if structured:
+            pdf_bytes = add_structure(pdf_bytes)
+        layout = build_layout(pdf_bytes)
+        page_rects, hits = find_term_rects(layout, terms)
+        plain = {p: [tuple(r) for r in rects] for p, rects in page_rects.items()}
+
+        t0 = time.perf_counter()
+        serial = redact_pages_serial(pdf_bytes, plain)
+        serial_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        sharded = redact_pages_sharded(pdf_bytes, plain, workers)
+        sharded_s = time.perf_counter() - t0
+
+        identical = page_texts(serial) == page_texts(sharded)
+        same_structure = structure(serial) == structure(sharded) == structure(pdf_bytes)
+        assert len(sharded) <= len(serial) * SIZE_TOLERANCE, (
+            f"sharded output {len(sharded)} bytes vs serial {len(serial)}: shared resources duplicated"
+        )
+        label = f"{pages}{' +struct' if structured else ''}"
+        print(
+            f"{label:>13} {sum(hits):>7} {serial_s:>10.3f} {sharded_s:>10.3f} "
+            f"{serial_s / sharded_s:>7.1f}x {len(serial) / 1e6:>10.2f} {len(sharded) / 1e6:>10.2f} "
+            f"{str(identical):>10} {str(same_structure):>10}"
+        )
+
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# ============================================================
+# BENCHMARK: PII detection throughput (MB/s)
+# ============================================================
+# Compares the previous detector (one re.finditer per
+# pattern) with the compiled single-pass detector on large
+# CoA-like texts, including long digit runs.
+#
+# Run from backend/:
+#     python -m benchmarks.bench_pii
+# ============================================================
+
+import random
+import re
+import time
+
+from app.services.pii_service import detect_pii
+
+
+# Patterns as they were before the single-pass detector
+LEGACY_PATTERNS = {
+    "EMAIL": r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
+    "PHONE": r"\+?\d[\d\-\s]{7,}\d",
+    "CREDIT_CARD": r"\b(?:\d[ -]*?){13,16}\b",
+    "SSN": r"\b\d{3}-\d{2}-\d{4}\b",
+    "DATE": r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b",
+    "ADDRESS": r"\b\d+\s+[A-Za-z0-9'\.\-]+\s+(Street|St|Road|Rd|Avenue|Ave|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b",
+    "LICENSE": r"\b(?:DL|Driver.?s License|License No\.?)[:\s]*[A-Za-z0-9\-]{5,}\b",
+    "PASSPORT": r"\b[A-Z]{1,2}\d{6,9}\b",
+    "HEALTH_CARD": r"\b\d{4}\s?\d{3}\s?\d{3}\b",
+    "POSTAL_CODE": r"\b[A-Za-z]\d[A-Za-z]\s?\d[A-Za-z]\d\b",
+}
+
+
+# (text, expected (label, value) pairs): PII next to other
+# numbers must still be found
+REGRESSION_CASES = [
+    ("Phone: 416-555-1234\n12 34 56 78 mg", [("PHONE", "416-555-1234")]),
+    ("Call 416-555-1234\n2024 5 10 15", [("PHONE", "416-555-1234")]),
+    ("Phone: +1 416-555-0000", [("PHONE", "+1 416-555-0000")]),
+    ("Raw: 12345678901234567890123", []),
+]
+
+
+def check_regressions():
+    for text, expected in REGRESSION_CASES:
+        found = [(s["label"], s["text"]) for s in detect_pii(text)]
+        if found != expected:
+            raise AssertionError(f"detect_pii({text!r}) = {found}, expected {expected}")
+    print(f"regression cases: {len(REGRESSION_CASES)} ok")
+
+
+def legacy_detect(text):
+    found = []
+    for label, pattern in LEGACY_PATTERNS.items():
+        for match in re.finditer(pattern, text):
+            found.append((match.start(), match.end(), label))
+    return found
+
+
+def make_text(size_mb, seed=3):
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    target = int(size_mb * 1024 * 1024)
+
+    while size < target:
+        kind = rng.randrange(8)
+        if kind == 0:
+            line = f"Client email: lab{rng.randrange(10**4)}@example.com"
+        elif kind == 1:
+            line = f"Phone: +1 416-555-{rng.randrange(10**4):04d}"
+        elif kind == 2:
+            line = f"Received 0{rng.randrange(1, 9)}/1{rng.randrange(0, 9)}/2025 at 12 Main St"
+        elif kind == 3:
+            # Long digit runs (instrument readouts, barcodes)
+            line = "Raw: " + "".join(str(rng.randrange(10)) for _ in range(rng.randrange(20, 80)))
+        else:
+            line = f"THC {rng.random():.3f} mg/g  CBD {rng.random():.3f} mg/g  Batch {rng.randrange(10**6)}"
+        lines.append(line)
+        size += len(line) + 1
+
+    return "\n".join(lines)
+
+
+def main():
+    check_regressions()
+
+    print(f"{'MB':>5} {'legacy MB/s':>12} {'single MB/s':>12} {'legacy hits':>12} {'single hits':>12}")
+
+    for size_mb in (1, 4, 16):
+        text = make_text(size_mb)
+        mb = len(text) / (1024 * 1024)
+
+        t0 = time.perf_counter()
+        legacy = legacy_detect(text)
+        legacy_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        single = detect_pii(text)
+        single_s = time.perf_counter() - t0
+
+        print(
+            f"{size_mb:>5} {mb / legacy_s:>12.2f} {mb / single_s:>12.2f} "
+            f"{len(legacy):>12} {len(single):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
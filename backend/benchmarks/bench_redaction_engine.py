@@ -0,0 +1,88 @@
+# ============================================================
+# BENCHMARK: multi-term redaction (legacy vs single pass)
+# ============================================================
+# - legacy: search_for() + apply_redactions() per term per page
+# - engine: layout index + find_term_rects() (one matcher pass)
+#           + incremental_pdf.apply_page_redactions(), which is
+#           what redact_multiple does
+#
+# Run from backend/:
+#     python -m benchmarks.bench_redaction_engine
+# ============================================================
+
+import os
+import tempfile
+import time
+import uuid
+
+# storage/working is created relative to the working dir
+os.chdir(tempfile.mkdtemp(prefix="bench_engine_"))
+
+import fitz  # noqa: E402
+
+from app.services import incremental_pdf  # noqa: E402
+from app.services.layout_index import build_layout  # noqa: E402
+from app.services.pdf_service import update_pdf_bytes  # noqa: E402
+from app.services.redaction_engine import find_term_rects, unique_terms  # noqa: E402
+from app.state.memory import DOC_PDF_BYTES, DOC_REVISION  # noqa: E402
+from benchmarks.synthetic import make_pdf, make_terms  # noqa: E402
+
+
+def legacy_redact(doc, terms):
+    """The previous redact_multiple loop: search + apply per term per page."""
+    hits = 0
+    for term in terms:
+        for page in doc:
+            matches = page.search_for(term)
+            for rect in matches:
+                page.add_redact_annot(rect, fill=(0, 0, 0))
+                hits += 1
+            if matches:
+                page.apply_redactions()
+    return hits
+
+
+def engine_redact(pdf_bytes, terms):
+    doc_id = f"bench-{uuid.uuid4().hex}"
+    DOC_PDF_BYTES[doc_id] = pdf_bytes
+    DOC_REVISION[doc_id] = 0
+    update_pdf_bytes(doc_id, pdf_bytes)
+
+    t0 = time.perf_counter()
+    layout = build_layout(pdf_bytes)
+    page_rects, hits = find_term_rects(layout, unique_terms(terms))
+    incremental_pdf.apply_page_redactions(doc_id, page_rects, len(layout.pages))
+    return time.perf_counter() - t0, sum(hits)
+
+
+def run_once(pdf_bytes, terms, engine):
+    if engine:
+        return engine_redact(pdf_bytes, terms)
+
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    t0 = time.perf_counter()
+    hits = legacy_redact(doc, terms)
+    elapsed = time.perf_counter() - t0
+    doc.close()
+    return elapsed, hits
+
+
+def main():
+    print(f"{'pages':>6} {'terms':>6} {'legacy s':>10} {'engine s':>10} {'speedup':>8} {'hits':>12}")
+
+    for pages in (10, 60):
+        for term_count in (10, 100, 300):
+            terms = make_terms(term_count)
+            pdf_bytes = make_pdf(pages, terms)
+
+            legacy_s, legacy_hits = run_once(pdf_bytes, terms, engine=False)
+            engine_s, engine_hits = run_once(pdf_bytes, terms, engine=True)
+
+            print(
+                f"{pages:>6} {term_count:>6} {legacy_s:>10.3f} {engine_s:>10.3f} "
+                f"{legacy_s / engine_s:>7.1f}x {legacy_hits:>5}/{engine_hits:<6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# ============================================================
+# SYNTHETIC DOCUMENTS FOR BENCHMARKS
+# ============================================================
+
+import random
+
+import fitz  # PyMuPDF
+
+
+FIELDS = [
+    "Client", "Producer", "Lot", "Batch", "Sample ID", "Address",
+    "Received", "Issued", "Analyst", "Email", "Phone", "License",
+]
+
+
+def make_terms(count, seed=7):
+    """Return `count` distinct sensitive-looking terms."""
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < count:
+        kind = rng.randrange(3)
+        if kind == 0:
+            terms.add(f"LOT-{rng.randrange(10**6):06d}")
+        elif kind == 1:
+            terms.add(f"client{rng.randrange(10**5)}@example.com")
+        else:
+            terms.add(f"{rng.choice(['Acme', 'Green', 'North', 'Blue'])} Labs {rng.randrange(10**4)}")
+    return sorted(terms)
+
+
+def make_pdf(pages, terms, lines_per_page=40, seed=11):
+    """
+    Build a PDF with `pages` pages of CoA-like "Field: value"
+    lines. Roughly one line in four carries one of `terms`.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+
+    for _ in range(pages):
+        page = doc.new_page()
+        y = 60
+        for _ in range(lines_per_page):
+            field = rng.choice(FIELDS)
+            if terms and rng.random() < 0.25:
+                value = rng.choice(terms)
+            else:
+                value = f"{rng.randrange(10**6)} mg/g result within limits"
+            page.insert_text((50, y), f"{field}: {value}", fontsize=9)
+            y += 18
+
+    data = doc.tobytes()
+    doc.close()
+    return data
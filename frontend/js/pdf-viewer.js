@@ -14,11 +14,27 @@ window.highlightRects = {};
 
 window.pdfScale = 1.5;
 
+// Pages redacted since the PDF was loaded:
+// pageImages[pageNumber] = page version rendered by the backend
+window.pageImages = {};
+window.pageVersions = [];
+
+// ---- Page versions from backend ----
+async function fetchPageVersions(docId) {
+  const res = await fetch(`${window.API}/view/${docId}/pages`);
+  if (!res.ok) throw new Error("Failed to load page info");
+  const data = await res.json();
+  return data.pages.map(p => p.version);
+}
+
 // ---- Load PDF from backend ----
 async function loadPdf(docId) {
   try {
     const url = `${window.API}/view/${docId}`;
     window.pdfDoc = await pdfjsLib.getDocument({ url }).promise;
+    window.pdfDocId = docId;
+    window.pageImages = {};
+    window.pageVersions = await fetchPageVersions(docId);
 
     window.totalPages = window.pdfDoc.numPages;
     window.currentPageNumber = 1;
@@ -34,6 +50,46 @@ async function loadPdf(docId) {
   }
 }
 
+// ---- Refresh after a redaction ----
+// Only the pages whose version changed are re-fetched, as images
+// rendered by the backend; the PDF itself is not downloaded again.
+async function refreshPdf(docId) {
+  if (!window.pdfDoc || window.pdfDocId !== docId) {
+    return loadPdf(docId);
+  }
+
+  try {
+    const versions = await fetchPageVersions(docId);
+    if (versions.length !== window.totalPages) {
+      return loadPdf(docId);
+    }
+
+    versions.forEach((version, index) => {
+      if (version !== window.pageVersions[index]) {
+        window.pageImages[index + 1] = version;
+      }
+    });
+
+    await renderPage(window.currentPageNumber);
+  } catch (err) {
+    console.error("Error refreshing PDF:", err);
+    await loadPdf(docId);
+  }
+}
+
+// ---- Load a backend-rendered page image ----
+function loadPageImage(docId, pageNumber, version) {
+  const url = `${window.API}/view/${docId}/page/${pageNumber - 1}`
+    + `?zoom=${window.pdfScale}&v=${version}`;
+
+  return new Promise((resolve, reject) => {
+    const img = new Image();
+    img.onload = () => resolve(img);
+    img.onerror = () => reject(new Error("Failed to load page image"));
+    img.src = url;
+  });
+}
+
 // ---- Render a single page ----
 async function renderPage(pageNumber) {
   if (!window.pdfDoc) return;
@@ -59,7 +115,14 @@ async function renderPage(pageNumber) {
 
   // Clear offscreen and render page
   window.offscreenCtx.clearRect(0, 0, viewport.width, viewport.height);
-  await page.render(renderContext).promise;
+
+  const version = window.pageImages[pageNumber];
+  if (version !== undefined) {
+    const img = await loadPageImage(window.pdfDocId, pageNumber, version);
+    window.offscreenCtx.drawImage(img, 0, 0, viewport.width, viewport.height);
+  } else {
+    await page.render(renderContext).promise;
+  }
 
   // Clear visible canvas and draw from offscreen
   window.ctx.clearRect(0, 0, viewport.width, viewport.height);
@@ -177,6 +240,7 @@ async function prevPage() {
 
 // Expose functions globally
 window.loadPdf = loadPdf;
+window.refreshPdf = refreshPdf;
 window.renderPage = renderPage;
 window.nextPage = nextPage;
 window.prevPage = prevPage;
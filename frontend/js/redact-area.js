@@ -99,7 +99,7 @@ async function sendRedactionBox(nx1, ny1, nx2, ny2) {
     statusEl.innerText = "Area redaction applied.";
 
     // Refresh UI
-    await window.loadPdf(window.currentDocId);
+    await window.refreshPdf(window.currentDocId);
     await window.loadVersionHistory(window.currentDocId);
     await window.loadAuditLog(window.currentDocId);
 
@@ -211,7 +211,7 @@ async function sendRedactionBox(nx1, ny1, nx2, ny2) {
     statusEl.innerText = "Area redaction applied.";
 
     // Reload PDF to show the black box
-    await window.loadPdf(window.currentDocId);
+    await window.refreshPdf(window.currentDocId);
 
     if (window.loadVersionHistory) {
       await window.loadVersionHistory(window.currentDocId);
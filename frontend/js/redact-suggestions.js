@@ -306,7 +306,7 @@ async function redactSelectedSpans(spans) {
     const data = await res.json();
     toast.success(`Applied ${data.applied || data.total_hits || spans.length} redactions`);
 
-    await window.loadPdf(window.currentDocId);
+    await window.refreshPdf(window.currentDocId);
 
     if (window.loadVersionHistory) {
       await window.loadVersionHistory(window.currentDocId);
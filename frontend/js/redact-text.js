@@ -44,7 +44,7 @@ async function redactText() {
     statusEl.innerText = "Redaction applied successfully.";
 
     // Reload PDF to show updated redactions
-    await window.loadPdf(window.currentDocId);
+    await window.refreshPdf(window.currentDocId);
 
     // === HISTORY PANEL INTEGRATION ===
     if (window.loadVersionHistory) {